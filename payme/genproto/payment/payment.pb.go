@@ -22,6 +22,58 @@ const (
 	_ = protoimpl.EnforceVersion(protoimpl.MaxVersion - 20)
 )
 
+type SyncStudentResult_Outcome int32
+
+const (
+	SyncStudentResult_OUTCOME_UNSPECIFIED SyncStudentResult_Outcome = 0
+	SyncStudentResult_CREATED             SyncStudentResult_Outcome = 1
+	SyncStudentResult_UPDATED             SyncStudentResult_Outcome = 2
+	SyncStudentResult_REJECTED            SyncStudentResult_Outcome = 3
+)
+
+// Enum value maps for SyncStudentResult_Outcome.
+var (
+	SyncStudentResult_Outcome_name = map[int32]string{
+		0: "OUTCOME_UNSPECIFIED",
+		1: "CREATED",
+		2: "UPDATED",
+		3: "REJECTED",
+	}
+	SyncStudentResult_Outcome_value = map[string]int32{
+		"OUTCOME_UNSPECIFIED": 0,
+		"CREATED":             1,
+		"UPDATED":             2,
+		"REJECTED":            3,
+	}
+)
+
+func (x SyncStudentResult_Outcome) Enum() *SyncStudentResult_Outcome {
+	p := new(SyncStudentResult_Outcome)
+	*p = x
+	return p
+}
+
+func (x SyncStudentResult_Outcome) String() string {
+	return protoimpl.X.EnumStringOf(x.Descriptor(), protoreflect.EnumNumber(x))
+}
+
+func (SyncStudentResult_Outcome) Descriptor() protoreflect.EnumDescriptor {
+	return file_payment_proto_enumTypes[0].Descriptor()
+}
+
+func (SyncStudentResult_Outcome) Type() protoreflect.EnumType {
+	return &file_payment_proto_enumTypes[0]
+}
+
+func (x SyncStudentResult_Outcome) Number() protoreflect.EnumNumber {
+	return protoreflect.EnumNumber(x)
+}
+
+// Deprecated: Use SyncStudentResult_Outcome.Descriptor instead.
+func (SyncStudentResult_Outcome) EnumDescriptor() ([]byte, []int) {
+	return file_payment_proto_rawDescGZIP(), []int{29, 0}
+}
+
 type Branch struct {
 	state         protoimpl.MessageState `protogen:"open.v1"`
 	Id            string                 `protobuf:"bytes,1,opt,name=id,proto3" json:"id,omitempty"`
@@ -328,6 +380,7 @@ func (x *ByAccountIdRequest) GetAccountId() string {
 
 type ListRequest struct {
 	state         protoimpl.MessageState `protogen:"open.v1"`
+	BranchId      string                 `protobuf:"bytes,1,opt,name=branch_id,json=branchId,proto3" json:"branch_id,omitempty"` // Bo'sh bo'lsa - barcha o'quvchilar (ListStudents)
 	unknownFields protoimpl.UnknownFields
 	sizeCache     protoimpl.SizeCache
 }
@@ -362,6 +415,13 @@ func (*ListRequest) Descriptor() ([]byte, []int) {
 	return file_payment_proto_rawDescGZIP(), []int{4}
 }
 
+func (x *ListRequest) GetBranchId() string {
+	if x != nil {
+		return x.BranchId
+	}
+	return ""
+}
+
 type CreateBranchRequest struct {
 	state         protoimpl.MessageState `protogen:"open.v1"`
 	Name          string                 `protobuf:"bytes,1,opt,name=name,proto3" json:"name,omitempty"`
@@ -1766,6 +1826,136 @@ func (x *GetStatementResponse) GetTransactions() []*StatementTransaction {
 	return nil
 }
 
+// SyncStudents oqimi: bot varaqdan o'qilgan har bir qatorni yuboradi
+type SyncStudentRow struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	RowRef        int64                  `protobuf:"varint,1,opt,name=row_ref,json=rowRef,proto3" json:"row_ref,omitempty"` // Mijoz tomonidagi qator identifikatori (javobda qaytariladi)
+	Student       *Student               `protobuf:"bytes,2,opt,name=student,proto3" json:"student,omitempty"`              // id bo'sh bo'lsa - yangi o'quvchi yaratiladi
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *SyncStudentRow) Reset() {
+	*x = SyncStudentRow{}
+	mi := &file_payment_proto_msgTypes[28]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *SyncStudentRow) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*SyncStudentRow) ProtoMessage() {}
+
+func (x *SyncStudentRow) ProtoReflect() protoreflect.Message {
+	mi := &file_payment_proto_msgTypes[28]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use SyncStudentRow.ProtoReflect.Descriptor instead.
+func (*SyncStudentRow) Descriptor() ([]byte, []int) {
+	return file_payment_proto_rawDescGZIP(), []int{28}
+}
+
+func (x *SyncStudentRow) GetRowRef() int64 {
+	if x != nil {
+		return x.RowRef
+	}
+	return 0
+}
+
+func (x *SyncStudentRow) GetStudent() *Student {
+	if x != nil {
+		return x.Student
+	}
+	return nil
+}
+
+// Har bir qator natijasi (server qator kelishi bilan qaytaradi)
+type SyncStudentResult struct {
+	state         protoimpl.MessageState    `protogen:"open.v1"`
+	RowRef        int64                     `protobuf:"varint,1,opt,name=row_ref,json=rowRef,proto3" json:"row_ref,omitempty"`
+	Outcome       SyncStudentResult_Outcome `protobuf:"varint,2,opt,name=outcome,proto3,enum=school.SyncStudentResult_Outcome" json:"outcome,omitempty"`
+	Id            string                    `protobuf:"bytes,3,opt,name=id,proto3" json:"id,omitempty"`
+	AccountId     string                    `protobuf:"bytes,4,opt,name=account_id,json=accountId,proto3" json:"account_id,omitempty"`
+	Reason        string                    `protobuf:"bytes,5,opt,name=reason,proto3" json:"reason,omitempty"` // REJECTED bo'lsa - sababi
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *SyncStudentResult) Reset() {
+	*x = SyncStudentResult{}
+	mi := &file_payment_proto_msgTypes[29]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *SyncStudentResult) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*SyncStudentResult) ProtoMessage() {}
+
+func (x *SyncStudentResult) ProtoReflect() protoreflect.Message {
+	mi := &file_payment_proto_msgTypes[29]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use SyncStudentResult.ProtoReflect.Descriptor instead.
+func (*SyncStudentResult) Descriptor() ([]byte, []int) {
+	return file_payment_proto_rawDescGZIP(), []int{29}
+}
+
+func (x *SyncStudentResult) GetRowRef() int64 {
+	if x != nil {
+		return x.RowRef
+	}
+	return 0
+}
+
+func (x *SyncStudentResult) GetOutcome() SyncStudentResult_Outcome {
+	if x != nil {
+		return x.Outcome
+	}
+	return SyncStudentResult_OUTCOME_UNSPECIFIED
+}
+
+func (x *SyncStudentResult) GetId() string {
+	if x != nil {
+		return x.Id
+	}
+	return ""
+}
+
+func (x *SyncStudentResult) GetAccountId() string {
+	if x != nil {
+		return x.AccountId
+	}
+	return ""
+}
+
+func (x *SyncStudentResult) GetReason() string {
+	if x != nil {
+		return x.Reason
+	}
+	return ""
+}
+
 var File_payment_proto protoreflect.FileDescriptor
 
 const file_payment_proto_rawDesc = "" +
@@ -1801,8 +1991,9 @@ const file_payment_proto_rawDesc = "" +
 	"\x02id\x18\x01 \x01(\tR\x02id\"3\n" +
 	"\x12ByAccountIdRequest\x12\x1d\n" +
 	"\n" +
-	"account_id\x18\x01 \x01(\tR\taccountId\"\r\n" +
-	"\vListRequest\"\xc8\x01\n" +
+	"account_id\x18\x01 \x01(\tR\taccountId\"*\n" +
+	"\vListRequest\x12\x1b\n" +
+	"\tbranch_id\x18\x01 \x01(\tR\bbranchId\"\xc8\x01\n" +
 	"\x13CreateBranchRequest\x12\x12\n" +
 	"\x04name\x18\x01 \x01(\tR\x04name\x12\x1f\n" +
 	"\vmonthly_fee\x18\x02 \x01(\x03R\n" +
@@ -1917,14 +2108,29 @@ const file_payment_proto_rawDesc = "" +
 	"\treceivers\x18\v \x03(\v2\x10.school.ReceiverR\treceiversB\t\n" +
 	"\a_reason\"X\n" +
 	"\x14GetStatementResponse\x12@\n" +
-	"\ftransactions\x18\x01 \x03(\v2\x1c.school.StatementTransactionR\ftransactions2\xa3\x04\n" +
+	"\ftransactions\x18\x01 \x03(\v2\x1c.school.StatementTransactionR\ftransactions\"T\n" +
+	"\x0eSyncStudentRow\x12\x17\n" +
+	"\arow_ref\x18\x01 \x01(\x03R\x06rowRef\x12)\n" +
+	"\astudent\x18\x02 \x01(\v2\x0f.school.StudentR\astudent\"\xfc\x01\n" +
+	"\x11SyncStudentResult\x12\x17\n" +
+	"\arow_ref\x18\x01 \x01(\x03R\x06rowRef\x12;\n" +
+	"\aoutcome\x18\x02 \x01(\x0e2!.school.SyncStudentResult.OutcomeR\aoutcome\x12\x0e\n" +
+	"\x02id\x18\x03 \x01(\tR\x02id\x12\x1d\n" +
+	"\n" +
+	"account_id\x18\x04 \x01(\tR\taccountId\x12\x16\n" +
+	"\x06reason\x18\x05 \x01(\tR\x06reason\"J\n" +
+	"\aOutcome\x12\x17\n" +
+	"\x13OUTCOME_UNSPECIFIED\x10\x00\x12\v\n" +
+	"\aCREATED\x10\x01\x12\v\n" +
+	"\aUPDATED\x10\x02\x12\f\n" +
+	"\bREJECTED\x10\x032\xa3\x04\n" +
 	"\x0ePaymentService\x12j\n" +
 	"\x17CheckPerformTransaction\x12&.school.CheckPerformTransactionRequest\x1a'.school.CheckPerformTransactionResponse\x12X\n" +
 	"\x11CreateTransaction\x12 .school.CreateTransactionRequest\x1a!.school.CreateTransactionResponse\x12T\n" +
 	"\x12PerformTransaction\x12\x1a.school.TransactionRequest\x1a\".school.PerformTransactionResponse\x12X\n" +
 	"\x11CancelTransaction\x12 .school.CancelTransactionRequest\x1a!.school.CancelTransactionResponse\x12P\n" +
 	"\x10CheckTransaction\x12\x1a.school.TransactionRequest\x1a .school.CheckTransactionResponse\x12I\n" +
-	"\fGetStatement\x12\x1b.school.GetStatementRequest\x1a\x1c.school.GetStatementResponse2\x87\a\n" +
+	"\fGetStatement\x12\x1b.school.GetStatementRequest\x1a\x1c.school.GetStatementResponse2\xce\a\n" +
 	"\x11ManagementService\x12;\n" +
 	"\fCreateBranch\x12\x1b.school.CreateBranchRequest\x1a\x0e.school.Branch\x120\n" +
 	"\tGetBranch\x12\x13.school.ByIdRequest\x1a\x0e.school.Branch\x12D\n" +
@@ -1938,7 +2144,8 @@ const file_payment_proto_rawDesc = "" +
 	"\x18DeleteStudentByAccountId\x12\x1a.school.ByAccountIdRequest\x1a\x16.google.protobuf.Empty\x12^\n" +
 	"\x13CreateStudentsBatch\x12\".school.CreateStudentsBatchRequest\x1a#.school.CreateStudentsBatchResponse\x12Q\n" +
 	"\x13UpdateStudentsBatch\x12\".school.UpdateStudentsBatchRequest\x1a\x16.google.protobuf.Empty\x12Q\n" +
-	"\x13DeleteStudentsBatch\x12\".school.DeleteStudentsBatchRequest\x1a\x16.google.protobuf.EmptyB\x18Z\x16payme/genproto/paymentb\x06proto3"
+	"\x13DeleteStudentsBatch\x12\".school.DeleteStudentsBatchRequest\x1a\x16.google.protobuf.Empty\x12E\n" +
+	"\fSyncStudents\x12\x16.school.SyncStudentRow\x1a\x19.school.SyncStudentResult(\x010\x01B\x18Z\x16payme/genproto/paymentb\x06proto3"
 
 var (
 	file_payment_proto_rawDescOnce sync.Once
@@ -1952,94 +2159,102 @@ func file_payment_proto_rawDescGZIP() []byte {
 	return file_payment_proto_rawDescData
 }
 
-var file_payment_proto_msgTypes = make([]protoimpl.MessageInfo, 28)
+var file_payment_proto_enumTypes = make([]protoimpl.EnumInfo, 1)
+var file_payment_proto_msgTypes = make([]protoimpl.MessageInfo, 30)
 var file_payment_proto_goTypes = []any{
-	(*Branch)(nil),                          // 0: school.Branch
-	(*Student)(nil),                         // 1: school.Student
-	(*ByIdRequest)(nil),                     // 2: school.ByIdRequest
-	(*ByAccountIdRequest)(nil),              // 3: school.ByAccountIdRequest
-	(*ListRequest)(nil),                     // 4: school.ListRequest
-	(*CreateBranchRequest)(nil),             // 5: school.CreateBranchRequest
-	(*ListBranchesResponse)(nil),            // 6: school.ListBranchesResponse
-	(*CreateStudentRequest)(nil),            // 7: school.CreateStudentRequest
-	(*ListStudentsResponse)(nil),            // 8: school.ListStudentsResponse
-	(*CreateStudentsBatchRequest)(nil),      // 9: school.CreateStudentsBatchRequest
-	(*CreateStudentsBatchResponse)(nil),     // 10: school.CreateStudentsBatchResponse
-	(*UpdateStudentsBatchRequest)(nil),      // 11: school.UpdateStudentsBatchRequest
-	(*DeleteStudentsBatchRequest)(nil),      // 12: school.DeleteStudentsBatchRequest
-	(*Account)(nil),                         // 13: school.Account
-	(*CheckPerformTransactionRequest)(nil),  // 14: school.CheckPerformTransactionRequest
-	(*StudentAdditionalInfo)(nil),           // 15: school.StudentAdditionalInfo
-	(*CheckPerformTransactionResponse)(nil), // 16: school.CheckPerformTransactionResponse
-	(*CreateTransactionRequest)(nil),        // 17: school.CreateTransactionRequest
-	(*Receiver)(nil),                        // 18: school.Receiver
-	(*CreateTransactionResponse)(nil),       // 19: school.CreateTransactionResponse
-	(*TransactionRequest)(nil),              // 20: school.TransactionRequest
-	(*PerformTransactionResponse)(nil),      // 21: school.PerformTransactionResponse
-	(*CancelTransactionRequest)(nil),        // 22: school.CancelTransactionRequest
-	(*CancelTransactionResponse)(nil),       // 23: school.CancelTransactionResponse
-	(*CheckTransactionResponse)(nil),        // 24: school.CheckTransactionResponse
-	(*GetStatementRequest)(nil),             // 25: school.GetStatementRequest
-	(*StatementTransaction)(nil),            // 26: school.StatementTransaction
-	(*GetStatementResponse)(nil),            // 27: school.GetStatementResponse
-	(*emptypb.Empty)(nil),                   // 28: google.protobuf.Empty
+	(SyncStudentResult_Outcome)(0),          // 0: school.SyncStudentResult.Outcome
+	(*Branch)(nil),                          // 1: school.Branch
+	(*Student)(nil),                         // 2: school.Student
+	(*ByIdRequest)(nil),                     // 3: school.ByIdRequest
+	(*ByAccountIdRequest)(nil),              // 4: school.ByAccountIdRequest
+	(*ListRequest)(nil),                     // 5: school.ListRequest
+	(*CreateBranchRequest)(nil),             // 6: school.CreateBranchRequest
+	(*ListBranchesResponse)(nil),            // 7: school.ListBranchesResponse
+	(*CreateStudentRequest)(nil),            // 8: school.CreateStudentRequest
+	(*ListStudentsResponse)(nil),            // 9: school.ListStudentsResponse
+	(*CreateStudentsBatchRequest)(nil),      // 10: school.CreateStudentsBatchRequest
+	(*CreateStudentsBatchResponse)(nil),     // 11: school.CreateStudentsBatchResponse
+	(*UpdateStudentsBatchRequest)(nil),      // 12: school.UpdateStudentsBatchRequest
+	(*DeleteStudentsBatchRequest)(nil),      // 13: school.DeleteStudentsBatchRequest
+	(*Account)(nil),                         // 14: school.Account
+	(*CheckPerformTransactionRequest)(nil),  // 15: school.CheckPerformTransactionRequest
+	(*StudentAdditionalInfo)(nil),           // 16: school.StudentAdditionalInfo
+	(*CheckPerformTransactionResponse)(nil), // 17: school.CheckPerformTransactionResponse
+	(*CreateTransactionRequest)(nil),        // 18: school.CreateTransactionRequest
+	(*Receiver)(nil),                        // 19: school.Receiver
+	(*CreateTransactionResponse)(nil),       // 20: school.CreateTransactionResponse
+	(*TransactionRequest)(nil),              // 21: school.TransactionRequest
+	(*PerformTransactionResponse)(nil),      // 22: school.PerformTransactionResponse
+	(*CancelTransactionRequest)(nil),        // 23: school.CancelTransactionRequest
+	(*CancelTransactionResponse)(nil),       // 24: school.CancelTransactionResponse
+	(*CheckTransactionResponse)(nil),        // 25: school.CheckTransactionResponse
+	(*GetStatementRequest)(nil),             // 26: school.GetStatementRequest
+	(*StatementTransaction)(nil),            // 27: school.StatementTransaction
+	(*GetStatementResponse)(nil),            // 28: school.GetStatementResponse
+	(*SyncStudentRow)(nil),                  // 29: school.SyncStudentRow
+	(*SyncStudentResult)(nil),               // 30: school.SyncStudentResult
+	(*emptypb.Empty)(nil),                   // 31: google.protobuf.Empty
 }
 var file_payment_proto_depIdxs = []int32{
-	0,  // 0: school.ListBranchesResponse.branches:type_name -> school.Branch
-	1,  // 1: school.ListStudentsResponse.students:type_name -> school.Student
-	7,  // 2: school.CreateStudentsBatchRequest.students:type_name -> school.CreateStudentRequest
-	1,  // 3: school.CreateStudentsBatchResponse.students:type_name -> school.Student
-	1,  // 4: school.UpdateStudentsBatchRequest.students:type_name -> school.Student
-	13, // 5: school.CheckPerformTransactionRequest.account:type_name -> school.Account
-	15, // 6: school.CheckPerformTransactionResponse.additional:type_name -> school.StudentAdditionalInfo
-	13, // 7: school.CreateTransactionRequest.account:type_name -> school.Account
-	18, // 8: school.CreateTransactionResponse.receivers:type_name -> school.Receiver
-	13, // 9: school.StatementTransaction.account:type_name -> school.Account
-	18, // 10: school.StatementTransaction.receivers:type_name -> school.Receiver
-	26, // 11: school.GetStatementResponse.transactions:type_name -> school.StatementTransaction
-	14, // 12: school.PaymentService.CheckPerformTransaction:input_type -> school.CheckPerformTransactionRequest
-	17, // 13: school.PaymentService.CreateTransaction:input_type -> school.CreateTransactionRequest
-	20, // 14: school.PaymentService.PerformTransaction:input_type -> school.TransactionRequest
-	22, // 15: school.PaymentService.CancelTransaction:input_type -> school.CancelTransactionRequest
-	20, // 16: school.PaymentService.CheckTransaction:input_type -> school.TransactionRequest
-	25, // 17: school.PaymentService.GetStatement:input_type -> school.GetStatementRequest
-	5,  // 18: school.ManagementService.CreateBranch:input_type -> school.CreateBranchRequest
-	2,  // 19: school.ManagementService.GetBranch:input_type -> school.ByIdRequest
-	28, // 20: school.ManagementService.ListBranches:input_type -> google.protobuf.Empty
-	0,  // 21: school.ManagementService.UpdateBranch:input_type -> school.Branch
-	2,  // 22: school.ManagementService.DeleteBranch:input_type -> school.ByIdRequest
-	7,  // 23: school.ManagementService.CreateStudent:input_type -> school.CreateStudentRequest
-	3,  // 24: school.ManagementService.GetStudentByAccountId:input_type -> school.ByAccountIdRequest
-	4,  // 25: school.ManagementService.ListStudents:input_type -> school.ListRequest
-	1,  // 26: school.ManagementService.UpdateStudent:input_type -> school.Student
-	3,  // 27: school.ManagementService.DeleteStudentByAccountId:input_type -> school.ByAccountIdRequest
-	9,  // 28: school.ManagementService.CreateStudentsBatch:input_type -> school.CreateStudentsBatchRequest
-	11, // 29: school.ManagementService.UpdateStudentsBatch:input_type -> school.UpdateStudentsBatchRequest
-	12, // 30: school.ManagementService.DeleteStudentsBatch:input_type -> school.DeleteStudentsBatchRequest
-	16, // 31: school.PaymentService.CheckPerformTransaction:output_type -> school.CheckPerformTransactionResponse
-	19, // 32: school.PaymentService.CreateTransaction:output_type -> school.CreateTransactionResponse
-	21, // 33: school.PaymentService.PerformTransaction:output_type -> school.PerformTransactionResponse
-	23, // 34: school.PaymentService.CancelTransaction:output_type -> school.CancelTransactionResponse
-	24, // 35: school.PaymentService.CheckTransaction:output_type -> school.CheckTransactionResponse
-	27, // 36: school.PaymentService.GetStatement:output_type -> school.GetStatementResponse
-	0,  // 37: school.ManagementService.CreateBranch:output_type -> school.Branch
-	0,  // 38: school.ManagementService.GetBranch:output_type -> school.Branch
-	6,  // 39: school.ManagementService.ListBranches:output_type -> school.ListBranchesResponse
-	0,  // 40: school.ManagementService.UpdateBranch:output_type -> school.Branch
-	28, // 41: school.ManagementService.DeleteBranch:output_type -> google.protobuf.Empty
-	1,  // 42: school.ManagementService.CreateStudent:output_type -> school.Student
-	1,  // 43: school.ManagementService.GetStudentByAccountId:output_type -> school.Student
-	8,  // 44: school.ManagementService.ListStudents:output_type -> school.ListStudentsResponse
-	1,  // 45: school.ManagementService.UpdateStudent:output_type -> school.Student
-	28, // 46: school.ManagementService.DeleteStudentByAccountId:output_type -> google.protobuf.Empty
-	10, // 47: school.ManagementService.CreateStudentsBatch:output_type -> school.CreateStudentsBatchResponse
-	28, // 48: school.ManagementService.UpdateStudentsBatch:output_type -> google.protobuf.Empty
-	28, // 49: school.ManagementService.DeleteStudentsBatch:output_type -> google.protobuf.Empty
-	31, // [31:50] is the sub-list for method output_type
-	12, // [12:31] is the sub-list for method input_type
-	12, // [12:12] is the sub-list for extension type_name
-	12, // [12:12] is the sub-list for extension extendee
-	0,  // [0:12] is the sub-list for field type_name
+	1,  // 0: school.ListBranchesResponse.branches:type_name -> school.Branch
+	2,  // 1: school.ListStudentsResponse.students:type_name -> school.Student
+	8,  // 2: school.CreateStudentsBatchRequest.students:type_name -> school.CreateStudentRequest
+	2,  // 3: school.CreateStudentsBatchResponse.students:type_name -> school.Student
+	2,  // 4: school.UpdateStudentsBatchRequest.students:type_name -> school.Student
+	14, // 5: school.CheckPerformTransactionRequest.account:type_name -> school.Account
+	16, // 6: school.CheckPerformTransactionResponse.additional:type_name -> school.StudentAdditionalInfo
+	14, // 7: school.CreateTransactionRequest.account:type_name -> school.Account
+	19, // 8: school.CreateTransactionResponse.receivers:type_name -> school.Receiver
+	14, // 9: school.StatementTransaction.account:type_name -> school.Account
+	19, // 10: school.StatementTransaction.receivers:type_name -> school.Receiver
+	27, // 11: school.GetStatementResponse.transactions:type_name -> school.StatementTransaction
+	2,  // 12: school.SyncStudentRow.student:type_name -> school.Student
+	0,  // 13: school.SyncStudentResult.outcome:type_name -> school.SyncStudentResult.Outcome
+	15, // 14: school.PaymentService.CheckPerformTransaction:input_type -> school.CheckPerformTransactionRequest
+	18, // 15: school.PaymentService.CreateTransaction:input_type -> school.CreateTransactionRequest
+	21, // 16: school.PaymentService.PerformTransaction:input_type -> school.TransactionRequest
+	23, // 17: school.PaymentService.CancelTransaction:input_type -> school.CancelTransactionRequest
+	21, // 18: school.PaymentService.CheckTransaction:input_type -> school.TransactionRequest
+	26, // 19: school.PaymentService.GetStatement:input_type -> school.GetStatementRequest
+	6,  // 20: school.ManagementService.CreateBranch:input_type -> school.CreateBranchRequest
+	3,  // 21: school.ManagementService.GetBranch:input_type -> school.ByIdRequest
+	31, // 22: school.ManagementService.ListBranches:input_type -> google.protobuf.Empty
+	1,  // 23: school.ManagementService.UpdateBranch:input_type -> school.Branch
+	3,  // 24: school.ManagementService.DeleteBranch:input_type -> school.ByIdRequest
+	8,  // 25: school.ManagementService.CreateStudent:input_type -> school.CreateStudentRequest
+	4,  // 26: school.ManagementService.GetStudentByAccountId:input_type -> school.ByAccountIdRequest
+	5,  // 27: school.ManagementService.ListStudents:input_type -> school.ListRequest
+	2,  // 28: school.ManagementService.UpdateStudent:input_type -> school.Student
+	4,  // 29: school.ManagementService.DeleteStudentByAccountId:input_type -> school.ByAccountIdRequest
+	10, // 30: school.ManagementService.CreateStudentsBatch:input_type -> school.CreateStudentsBatchRequest
+	12, // 31: school.ManagementService.UpdateStudentsBatch:input_type -> school.UpdateStudentsBatchRequest
+	13, // 32: school.ManagementService.DeleteStudentsBatch:input_type -> school.DeleteStudentsBatchRequest
+	29, // 33: school.ManagementService.SyncStudents:input_type -> school.SyncStudentRow
+	17, // 34: school.PaymentService.CheckPerformTransaction:output_type -> school.CheckPerformTransactionResponse
+	20, // 35: school.PaymentService.CreateTransaction:output_type -> school.CreateTransactionResponse
+	22, // 36: school.PaymentService.PerformTransaction:output_type -> school.PerformTransactionResponse
+	24, // 37: school.PaymentService.CancelTransaction:output_type -> school.CancelTransactionResponse
+	25, // 38: school.PaymentService.CheckTransaction:output_type -> school.CheckTransactionResponse
+	28, // 39: school.PaymentService.GetStatement:output_type -> school.GetStatementResponse
+	1,  // 40: school.ManagementService.CreateBranch:output_type -> school.Branch
+	1,  // 41: school.ManagementService.GetBranch:output_type -> school.Branch
+	7,  // 42: school.ManagementService.ListBranches:output_type -> school.ListBranchesResponse
+	1,  // 43: school.ManagementService.UpdateBranch:output_type -> school.Branch
+	31, // 44: school.ManagementService.DeleteBranch:output_type -> google.protobuf.Empty
+	2,  // 45: school.ManagementService.CreateStudent:output_type -> school.Student
+	2,  // 46: school.ManagementService.GetStudentByAccountId:output_type -> school.Student
+	9,  // 47: school.ManagementService.ListStudents:output_type -> school.ListStudentsResponse
+	2,  // 48: school.ManagementService.UpdateStudent:output_type -> school.Student
+	31, // 49: school.ManagementService.DeleteStudentByAccountId:output_type -> google.protobuf.Empty
+	11, // 50: school.ManagementService.CreateStudentsBatch:output_type -> school.CreateStudentsBatchResponse
+	31, // 51: school.ManagementService.UpdateStudentsBatch:output_type -> google.protobuf.Empty
+	31, // 52: school.ManagementService.DeleteStudentsBatch:output_type -> google.protobuf.Empty
+	30, // 53: school.ManagementService.SyncStudents:output_type -> school.SyncStudentResult
+	34, // [34:54] is the sub-list for method output_type
+	14, // [14:34] is the sub-list for method input_type
+	14, // [14:14] is the sub-list for extension type_name
+	14, // [14:14] is the sub-list for extension extendee
+	0,  // [0:14] is the sub-list for field type_name
 }
 
 func init() { file_payment_proto_init() }
@@ -2054,13 +2269,14 @@ func file_payment_proto_init() {
 		File: protoimpl.DescBuilder{
 			GoPackagePath: reflect.TypeOf(x{}).PkgPath(),
 			RawDescriptor: unsafe.Slice(unsafe.StringData(file_payment_proto_rawDesc), len(file_payment_proto_rawDesc)),
-			NumEnums:      0,
-			NumMessages:   28,
+			NumEnums:      1,
+			NumMessages:   30,
 			NumExtensions: 0,
 			NumServices:   2,
 		},
 		GoTypes:           file_payment_proto_goTypes,
 		DependencyIndexes: file_payment_proto_depIdxs,
+		EnumInfos:         file_payment_proto_enumTypes,
 		MessageInfos:      file_payment_proto_msgTypes,
 	}.Build()
 	File_payment_proto = out.File
@@ -325,6 +325,7 @@ const (
 	ManagementService_CreateStudentsBatch_FullMethodName      = "/school.ManagementService/CreateStudentsBatch"
 	ManagementService_UpdateStudentsBatch_FullMethodName      = "/school.ManagementService/UpdateStudentsBatch"
 	ManagementService_DeleteStudentsBatch_FullMethodName      = "/school.ManagementService/DeleteStudentsBatch"
+	ManagementService_SyncStudents_FullMethodName             = "/school.ManagementService/SyncStudents"
 )
 
 // ManagementServiceClient is the client API for ManagementService service.
@@ -344,6 +345,7 @@ type ManagementServiceClient interface {
 	CreateStudentsBatch(ctx context.Context, in *CreateStudentsBatchRequest, opts ...grpc.CallOption) (*CreateStudentsBatchResponse, error)
 	UpdateStudentsBatch(ctx context.Context, in *UpdateStudentsBatchRequest, opts ...grpc.CallOption) (*emptypb.Empty, error)
 	DeleteStudentsBatch(ctx context.Context, in *DeleteStudentsBatchRequest, opts ...grpc.CallOption) (*emptypb.Empty, error)
+	SyncStudents(ctx context.Context, opts ...grpc.CallOption) (grpc.BidiStreamingClient[SyncStudentRow, SyncStudentResult], error)
 }
 
 type managementServiceClient struct {
@@ -484,6 +486,19 @@ func (c *managementServiceClient) DeleteStudentsBatch(ctx context.Context, in *D
 	return out, nil
 }
 
+func (c *managementServiceClient) SyncStudents(ctx context.Context, opts ...grpc.CallOption) (grpc.BidiStreamingClient[SyncStudentRow, SyncStudentResult], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &ManagementService_ServiceDesc.Streams[0], ManagementService_SyncStudents_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[SyncStudentRow, SyncStudentResult]{ClientStream: stream}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type ManagementService_SyncStudentsClient = grpc.BidiStreamingClient[SyncStudentRow, SyncStudentResult]
+
 // ManagementServiceServer is the server API for ManagementService service.
 // All implementations must embed UnimplementedManagementServiceServer
 // for forward compatibility.
@@ -501,6 +516,7 @@ type ManagementServiceServer interface {
 	CreateStudentsBatch(context.Context, *CreateStudentsBatchRequest) (*CreateStudentsBatchResponse, error)
 	UpdateStudentsBatch(context.Context, *UpdateStudentsBatchRequest) (*emptypb.Empty, error)
 	DeleteStudentsBatch(context.Context, *DeleteStudentsBatchRequest) (*emptypb.Empty, error)
+	SyncStudents(grpc.BidiStreamingServer[SyncStudentRow, SyncStudentResult]) error
 	mustEmbedUnimplementedManagementServiceServer()
 }
 
@@ -550,6 +566,9 @@ func (UnimplementedManagementServiceServer) UpdateStudentsBatch(context.Context,
 func (UnimplementedManagementServiceServer) DeleteStudentsBatch(context.Context, *DeleteStudentsBatchRequest) (*emptypb.Empty, error) {
 	return nil, status.Error(codes.Unimplemented, "method DeleteStudentsBatch not implemented")
 }
+func (UnimplementedManagementServiceServer) SyncStudents(grpc.BidiStreamingServer[SyncStudentRow, SyncStudentResult]) error {
+	return status.Error(codes.Unimplemented, "method SyncStudents not implemented")
+}
 func (UnimplementedManagementServiceServer) mustEmbedUnimplementedManagementServiceServer() {}
 func (UnimplementedManagementServiceServer) testEmbeddedByValue()                           {}
 
@@ -805,6 +824,13 @@ func _ManagementService_DeleteStudentsBatch_Handler(srv interface{}, ctx context
 	return interceptor(ctx, in, info, handler)
 }
 
+func _ManagementService_SyncStudents_Handler(srv interface{}, stream grpc.ServerStream) error {
+	return srv.(ManagementServiceServer).SyncStudents(&grpc.GenericServerStream[SyncStudentRow, SyncStudentResult]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type ManagementService_SyncStudentsServer = grpc.BidiStreamingServer[SyncStudentRow, SyncStudentResult]
+
 // ManagementService_ServiceDesc is the grpc.ServiceDesc for ManagementService service.
 // It's only intended for direct use with grpc.RegisterService,
 // and not to be introspected or modified (even as a copy)
@@ -865,6 +891,13 @@ var ManagementService_ServiceDesc = grpc.ServiceDesc{
 			Handler:    _ManagementService_DeleteStudentsBatch_Handler,
 		},
 	},
-	Streams:  []grpc.StreamDesc{},
+	Streams: []grpc.StreamDesc{
+		{
+			StreamName:    "SyncStudents",
+			Handler:       _ManagementService_SyncStudents_Handler,
+			ServerStreams: true,
+			ClientStreams: true,
+		},
+	},
 	Metadata: "payment.proto",
 }
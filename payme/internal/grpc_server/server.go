@@ -2,12 +2,17 @@ package grpc_server
 
 import (
 	"context"
+	"errors"
+	"fmt"
+	"io"
+	"log"
 	"payme/genproto/payment"
 	"payme/internal/models"
 	"payme/internal/service"
 	"payme/pkg/utils"
 
 	"github.com/google/uuid"
+	"github.com/jackc/pgx/v5/pgconn"
 	"google.golang.org/grpc/codes"
 	"google.golang.org/grpc/status"
 	"google.golang.org/protobuf/types/known/emptypb"
@@ -27,6 +32,12 @@ func NewGRPCServer(paymentService service.PaymentService, managementService serv
 	}
 }
 
+// isForeignKeyViolation o'chirilayotgan yozuvga boshqa jadval bog'langanini bildiradi (SQLSTATE 23503)
+func isForeignKeyViolation(err error) bool {
+	var pgErr *pgconn.PgError
+	return errors.As(err, &pgErr) && pgErr.Code == "23503"
+}
+
 func convertRPCErrorToGRPC(err error) error {
 	if rpcErr, ok := err.(utils.RPCError); ok {
 		var code codes.Code
@@ -320,8 +331,18 @@ func (s *grpcServer) GetStudentByAccountId(ctx context.Context, req *payment.ByA
 	}, nil
 }
 
-func (s *grpcServer) ListStudents(ctx context.Context, _ *payment.ListRequest) (*payment.ListStudentsResponse, error) {
-	students, err := s.managementService.ListStudents(ctx)
+func (s *grpcServer) ListStudents(ctx context.Context, req *payment.ListRequest) (*payment.ListStudentsResponse, error) {
+	var students []models.Student
+	var err error
+	if req.GetBranchId() != "" {
+		branchUUID, parseErr := uuid.Parse(req.GetBranchId())
+		if parseErr != nil {
+			return nil, status.Errorf(codes.InvalidArgument, "Invalid Branch UUID format: %v", parseErr)
+		}
+		students, err = s.managementService.ListStudentsByBranch(ctx, branchUUID)
+	} else {
+		students, err = s.managementService.ListStudents(ctx)
+	}
 	if err != nil {
 		return nil, status.Errorf(codes.Internal, "Internal server error: %v", err)
 	}
@@ -501,8 +522,238 @@ func (s *grpcServer) DeleteStudentsBatch(ctx context.Context, req *payment.Delet
 
 	err := s.managementService.DeleteStudentsBatch(ctx, req.AccountIds)
 	if err != nil {
+		// O'quvchiga tranzaksiyalar bog'langan - bu server nosozligi emas, mijoz
+		// paketni bo'lib, qaysi hisob raqamlari xalaqit berayotganini aniqlaydi
+		if isForeignKeyViolation(err) {
+			return nil, status.Errorf(codes.FailedPrecondition, "Failed to delete students in batch: %v", err)
+		}
 		return nil, status.Errorf(codes.Internal, "Failed to delete students in batch: %v", err)
 	}
 
 	return &emptypb.Empty{}, nil
-}
\ No newline at end of file
+}
+
+// syncStudentsBatchSize - SyncStudents oqimida bitta tranzaksiyaga yig'iladigan maksimal qatorlar soni
+const syncStudentsBatchSize = 200
+
+// SyncStudents - Sheets sinxronizatsiyasi uchun ikki tomonlama oqim.
+// Mijoz qatorlarni o'qish davomida yuboradi; server ularni tayyor bo'lganicha
+// partiyalarga yig'ib bazaga yozadi va har bir qator uchun natija qaytaradi.
+// Bitta qatordagi xato butun oqimni to'xtatmaydi - u REJECTED sifatida qaytariladi.
+func (s *grpcServer) SyncStudents(stream payment.ManagementService_SyncStudentsServer) error {
+	ctx := stream.Context()
+	rows := make(chan *payment.SyncStudentRow, syncStudentsBatchSize)
+	recvErr := make(chan error, 1)
+
+	// Qabul qilish alohida goroutine'da: baza bilan ishlayotganda mijoz
+	// keyingi qatorlarni yuborishda davom etadi.
+	go func() {
+		defer close(rows)
+		for {
+			row, err := stream.Recv()
+			if err == io.EOF {
+				return
+			}
+			if err != nil {
+				recvErr <- err
+				return
+			}
+			select {
+			case rows <- row:
+			case <-ctx.Done():
+				return
+			}
+		}
+	}()
+
+	for {
+		first, ok := <-rows
+		if !ok {
+			break
+		}
+		batch := []*payment.SyncStudentRow{first}
+	drain:
+		for len(batch) < syncStudentsBatchSize {
+			select {
+			case row, ok := <-rows:
+				if !ok {
+					break drain
+				}
+				batch = append(batch, row)
+			default:
+				break drain
+			}
+		}
+
+		for _, result := range s.syncStudentsBatch(ctx, batch) {
+			if err := stream.Send(result); err != nil {
+				return err
+			}
+		}
+	}
+
+	select {
+	case err := <-recvErr:
+		return err
+	default:
+		return nil
+	}
+}
+
+func (s *grpcServer) syncStudentsBatch(ctx context.Context, batch []*payment.SyncStudentRow) []*payment.SyncStudentResult {
+	results := make([]*payment.SyncStudentResult, 0, len(batch))
+	reject := func(row *payment.SyncStudentRow, reason string) {
+		results = append(results, &payment.SyncStudentResult{
+			RowRef:  row.RowRef,
+			Outcome: payment.SyncStudentResult_REJECTED,
+			Reason:  reason,
+		})
+	}
+
+	var toCreate, toUpdate []*models.Student
+	var createRows, updateRows []*payment.SyncStudentRow
+	for _, row := range batch {
+		grpcStudent := row.GetStudent()
+		if grpcStudent == nil {
+			reject(row, "student maydoni bo'sh")
+			continue
+		}
+		branchUUID, err := uuid.Parse(grpcStudent.BranchId)
+		if err != nil {
+			reject(row, fmt.Sprintf("Invalid Branch UUID format: %v", err))
+			continue
+		}
+
+		var accID *string
+		if grpcStudent.AccountId != "" {
+			val := grpcStudent.AccountId
+			accID = &val
+		}
+
+		student := &models.Student{
+			AccountID:       accID,
+			BranchID:        branchUUID,
+			ParentName:      grpcStudent.ParentName,
+			DiscountPercent: grpcStudent.DiscountPercent,
+			FullName:        &grpcStudent.FullName,
+			GroupName:       &grpcStudent.GroupName,
+			Phone:           &grpcStudent.Phone,
+			ContractNumber:  &grpcStudent.ContractNumber,
+		}
+
+		if grpcStudent.Id == "" {
+			toCreate = append(toCreate, student)
+			createRows = append(createRows, row)
+			continue
+		}
+
+		studentUUID, err := uuid.Parse(grpcStudent.Id)
+		if err != nil {
+			reject(row, fmt.Sprintf("Invalid Student UUID format: %v", err))
+			continue
+		}
+		student.ID = studentUUID
+		student.Status = grpcStudent.Status
+		toUpdate = append(toUpdate, student)
+		updateRows = append(updateRows, row)
+	}
+
+	updated := func(row *payment.SyncStudentRow) {
+		results = append(results, &payment.SyncStudentResult{
+			RowRef:    row.RowRef,
+			Outcome:   payment.SyncStudentResult_UPDATED,
+			Id:        row.Student.Id,
+			AccountId: row.Student.AccountId,
+		})
+	}
+
+	// Partiya bitta tranzaksiyada yoziladi: bitta yomon qator butun partiyani bekor
+	// qiladi. Shunda qatorlar birma-bir qayta yuboriladi va faqat o'zi yozilmagan
+	// qator REJECTED bo'ladi.
+	if len(toUpdate) > 0 {
+		if err := s.managementService.UpdateStudentsBatch(ctx, toUpdate); err == nil {
+			for _, row := range updateRows {
+				updated(row)
+			}
+		} else {
+			log.Printf("OGOHLANTIRISH: SyncStudents update partiyasi (%d ta) xato bilan tugadi, qatorlar birma-bir yuboriladi: %v", len(toUpdate), err)
+			for i, row := range updateRows {
+				if ctx.Err() != nil {
+					reject(row, fmt.Sprintf("Failed to update student: %v", ctx.Err()))
+					continue
+				}
+				if err := s.managementService.UpdateStudentsBatch(ctx, toUpdate[i:i+1]); err != nil {
+					reject(row, fmt.Sprintf("Failed to update student: %v", err))
+					continue
+				}
+				updated(row)
+			}
+		}
+	}
+
+	if len(toCreate) > 0 {
+		// CreateStudentsBatch bo'sh account_id'larni o'zi generatsiya qilib
+		// modelga yozadi, shuning uchun natijalar account_id orqali bog'lanadi.
+		// Takrorlangan account_id birma-bir rejimda ham bitta qatorga biriktiriladi
+		linked := make(map[uuid.UUID]bool, len(toCreate))
+		createdStudents, err := s.managementService.CreateStudentsBatch(ctx, toCreate)
+		if err == nil {
+			results = append(results, linkCreatedStudents(createRows, toCreate, createdStudents, linked)...)
+			return results
+		}
+
+		log.Printf("OGOHLANTIRISH: SyncStudents create partiyasi (%d ta) xato bilan tugadi, qatorlar birma-bir yuboriladi: %v", len(toCreate), err)
+		for i, row := range createRows {
+			if ctx.Err() != nil {
+				reject(row, fmt.Sprintf("Failed to create student: %v", ctx.Err()))
+				continue
+			}
+			// Partiya commit'dan keyin yiqilgan bo'lsa ham takror yaratilmaydi:
+			// account_id allaqachon modelda, CreateStudentsBatch esa mavjud
+			// o'quvchini qaytaradi
+			created, err := s.managementService.CreateStudentsBatch(ctx, toCreate[i:i+1])
+			if err != nil {
+				reject(row, fmt.Sprintf("Failed to create student: %v", err))
+				continue
+			}
+			results = append(results, linkCreatedStudents(createRows[i:i+1], toCreate[i:i+1], created, linked)...)
+		}
+	}
+
+	return results
+}
+
+// linkCreatedStudents yaratilgan o'quvchilarni account_id orqali qatorlarga bog'laydi.
+func linkCreatedStudents(rows []*payment.SyncStudentRow, students []*models.Student, createdStudents []*models.Student, linked map[uuid.UUID]bool) []*payment.SyncStudentResult {
+	createdByAccount := make(map[string]*models.Student, len(createdStudents))
+	for _, created := range createdStudents {
+		if created.AccountID != nil {
+			createdByAccount[*created.AccountID] = created
+		}
+	}
+
+	results := make([]*payment.SyncStudentResult, 0, len(rows))
+	for i, row := range rows {
+		var created *models.Student
+		if students[i].AccountID != nil {
+			created = createdByAccount[*students[i].AccountID]
+		}
+		// Bir partiyada takrorlangan account_id faqat birinchi qatorga biriktiriladi
+		if created == nil || linked[created.ID] {
+			results = append(results, &payment.SyncStudentResult{
+				RowRef:  row.RowRef,
+				Outcome: payment.SyncStudentResult_REJECTED,
+				Reason:  "o'quvchi yaratilmadi (account_id takrorlangan bo'lishi mumkin)",
+			})
+			continue
+		}
+		linked[created.ID] = true
+		results = append(results, &payment.SyncStudentResult{
+			RowRef:    row.RowRef,
+			Outcome:   payment.SyncStudentResult_CREATED,
+			Id:        created.ID.String(),
+			AccountId: *created.AccountID,
+		})
+	}
+	return results
+}
@@ -17,6 +17,7 @@ type StudentRepository interface {
 	Create(ctx context.Context, student *models.Student) (*models.Student, error)
 	GetByAccountID(ctx context.Context, accountID string) (*models.Student, error)
 	GetAll(ctx context.Context) ([]models.Student, error)
+	GetByBranchID(ctx context.Context, branchID uuid.UUID) ([]models.Student, error)
 	Update(ctx context.Context, student *models.Student) (*models.Student, error)
 	DeleteByAccountID(ctx context.Context, accountID string) error
 	CreateStudentsBatch(ctx context.Context, tx pgx.Tx, students []*models.Student) (int64, error)
@@ -171,9 +172,19 @@ func (r *pgStudentRepository) GetByAccountID(ctx context.Context, accountID stri
 	return &student, nil
 }
 
+const selectStudents = `SELECT id, account_id, branch_id, parent_name, discount_percent, balance, full_name, group_name, phone, contract_number, status, created_at, updated_at FROM students`
+
 func (r *pgStudentRepository) GetAll(ctx context.Context) ([]models.Student, error) {
-	query := `SELECT id, account_id, branch_id, parent_name, discount_percent, balance, full_name, group_name, phone, contract_number, status, created_at, updated_at FROM students`
-	rows, err := r.db.Query(ctx, query)
+	return r.queryStudents(ctx, selectStudents)
+}
+
+// GetByBranchID - bitta filial o'quvchilari (bot'ning tanlangan varaq/filial sinxronizatsiyasi uchun)
+func (r *pgStudentRepository) GetByBranchID(ctx context.Context, branchID uuid.UUID) ([]models.Student, error) {
+	return r.queryStudents(ctx, selectStudents+` WHERE branch_id = $1`, branchID)
+}
+
+func (r *pgStudentRepository) queryStudents(ctx context.Context, query string, args ...any) ([]models.Student, error) {
+	rows, err := r.db.Query(ctx, query, args...)
 	if err != nil {
 		return nil, fmt.Errorf("error getting all students: %w", err)
 	}
@@ -24,6 +24,7 @@ type ManagementService interface {
 	CreateStudent(ctx context.Context, student *models.Student) (*models.Student, error)
 	GetStudentByAccountId(ctx context.Context, accountId string) (*models.Student, error)
 	ListStudents(ctx context.Context) ([]models.Student, error)
+	ListStudentsByBranch(ctx context.Context, branchID uuid.UUID) ([]models.Student, error)
 	UpdateStudent(ctx context.Context, student *models.Student) (*models.Student, error)
 	DeleteStudentByAccountId(ctx context.Context, accountId string) error
 
@@ -97,6 +98,9 @@ func (s *managementService) GetStudentByAccountId(ctx context.Context, accountId
 func (s *managementService) ListStudents(ctx context.Context) ([]models.Student, error) {
 	return s.studentRepo.GetAll(ctx)
 }
+func (s *managementService) ListStudentsByBranch(ctx context.Context, branchID uuid.UUID) ([]models.Student, error) {
+	return s.studentRepo.GetByBranchID(ctx, branchID)
+}
 func (s *managementService) UpdateStudent(ctx context.Context, student *models.Student) (*models.Student, error) {
 	return s.studentRepo.Update(ctx, student)
 }
@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS idx_students_branch_id ON students (branch_id);
\ No newline at end of file
@@ -0,0 +1,171 @@
+# benchmarks/aio_runtime.py
+"""
+Oqimli va asyncio (grpc.aio) ish rejimlarini bir vaqtdagi admin va to'lov
+xabarnomalari yuklamasi ostida solishtirish.
+
+Har bir rejimda:
+  xabarnomalar - notify_load.run_load: BotAdminService'ga berilgan tezlikda
+                 NotifyPaymentSuccess, Telegram esa soxta (kechikishli) Bot API
+  adminlar     - --admins ta oqim to'xtovsiz "🎓 O'quvchilar" dashboard'i uchun
+                 ListBranches + ListStudents so'raydi (soxta ManagementService,
+                 har bir RPC --mgmt-latency kechikadi)
+
+Rejimlar:
+  oqimli  - 10 oqimli grpc.server, Bot.send_message, ro'yxatlar ketma-ket
+  asyncio - grpc.aio server + httpx, ro'yxatlar aio_client orqali parallel
+
+Ishlatish:
+    python -m benchmarks.aio_runtime [--rate 80] [--duration 10] [--tg-latency 0.2] \\
+        [--admins 4] [--mgmt-latency 0.1] [--json]
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+from benchmarks import notify_load
+from config import settings
+from generated import payment_pb2, payment_pb2_grpc
+
+
+class _FakeManagement(payment_pb2_grpc.ManagementServiceServicer):
+    def __init__(self, latency, branches=5, students=2000):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._branches = payment_pb2.ListBranchesResponse(branches=[
+            payment_pb2.Branch(id=f"b{i}", name=f"Filial {i}") for i in range(branches)
+        ])
+        self._students = payment_pb2.ListStudentsResponse(students=[
+            payment_pb2.Student(id=f"s{i}", account_id=f"YM{i:06d}", branch_id=f"b{i % branches}", status=i % 7 != 0)
+            for i in range(students)
+        ])
+
+    def _respond(self, response):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return response
+
+    def ListBranches(self, request, context):
+        return self._respond(self._branches)
+
+    def ListStudents(self, request, context):
+        return self._respond(self._students)
+
+
+def _start_management(latency):
+    servicer = _FakeManagement(latency)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=64))
+    payment_pb2_grpc.add_ManagementServiceServicer_to_server(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, servicer, f"127.0.0.1:{port}"
+
+
+def _dashboard_sequential():
+    from grpc_client import client as grpc_client
+    _, branch_error = grpc_client.list_branches()
+    _, student_error = grpc_client.list_students()
+    return branch_error or student_error
+
+
+def _dashboard_concurrent():
+    from grpc_client import aio_client
+    (_, branch_error), (_, student_error) = aio_client.fetch_branches_and_students()
+    return branch_error or student_error
+
+
+def _admin_load(admins, render, stop_event):
+    """Har bir admin oqimi to'xtovsiz dashboard so'raydi; kechikishlar (ms) va xatolar qaytariladi."""
+    timings, errors = [], []
+    lock = threading.Lock()
+
+    def admin():
+        while not stop_event.is_set():
+            started_at = time.perf_counter()
+            error = render()
+            elapsed = (time.perf_counter() - started_at) * 1000
+            with lock:
+                (errors if error else timings).append(error or elapsed)
+
+    threads = [threading.Thread(target=admin, daemon=True) for _ in range(admins)]
+    for thread in threads:
+        thread.start()
+    return threads, timings, errors
+
+
+def run_mode(mode, args):
+    settings.grpc_server_async = mode == "asyncio"
+    render = _dashboard_concurrent if mode == "asyncio" else _dashboard_sequential
+
+    fake_api = notify_load.FakeTelegramAPI(latency=args.tg_latency).start()
+    server, target = notify_load._start_local_server(fake_api.port)
+    stop_event = threading.Event()
+    threads, admin_ms, admin_errors = _admin_load(args.admins, render, stop_event)
+    try:
+        results, wall_time = notify_load.run_load(
+            target, args.rate, args.duration, args.concurrency, notify_load.DEFAULT_DEADLINE, warmup=5,
+        )
+    finally:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+    try:
+        notify = notify_load.build_report(results, fake_api, wall_time, drain_timeout=notify_load.DEFAULT_DEADLINE)
+    finally:
+        server.stop(grace=1)
+        fake_api.stop()
+
+    admin_ms.sort()
+    return {
+        "mode": mode,
+        "notify": notify,
+        "admin": {
+            "renders": len(admin_ms),
+            "errors": len(admin_errors),
+            "per_second": round(len(admin_ms) / wall_time, 1),
+            "p50": round(notify_load.percentile(admin_ms, 50) or 0, 1),
+            "p99": round(notify_load.percentile(admin_ms, 99) or 0, 1),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Oqimli va asyncio rejimlarini solishtirish")
+    parser.add_argument("--rate", type=float, default=80.0, help="xabarnomalar/soniya")
+    parser.add_argument("--duration", type=float, default=10.0, help="soniya")
+    parser.add_argument("--concurrency", type=int, default=200, help="bir vaqtdagi maksimal xabarnomalar")
+    parser.add_argument("--tg-latency", type=float, default=0.2, help="soxta Telegram API kechikishi (soniya)")
+    parser.add_argument("--admins", type=int, default=settings.telegram_workers, help="parallel adminlar (dispetcher oqimlari)")
+    parser.add_argument("--mgmt-latency", type=float, default=0.1, help="har bir ManagementService RPC kechikishi (soniya)")
+    parser.add_argument("--json", action="store_true", help="natijani JSON ko'rinishida chiqarish")
+    args = parser.parse_args()
+
+    management, servicer, settings.grpc_go_server_address = _start_management(args.mgmt_latency)
+    try:
+        reports = [run_mode(mode, args) for mode in ("oqimli", "asyncio")]
+    finally:
+        management.stop(grace=None)
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False))
+        return
+
+    print(f"Xabarnomalar {args.rate:.0f}/s x {args.duration:.0f}s (Telegram {args.tg_latency * 1000:.0f}ms), "
+          f"{args.admins} ta admin (RPC {args.mgmt_latency * 1000:.0f}ms)")
+    print(f"{'Rejim':<8} {'xabar/s':>8} {'yetkazildi':>11} {'xatolar':>8} {'RPC p50':>9} {'RPC p99':>9} "
+          f"{'dashboard/s':>12} {'dash p50':>9} {'dash p99':>9}")
+    for r in reports:
+        n, a = r["notify"], r["admin"]
+        failed = sum(count for code, count in n["grpc_codes"].items() if code != "OK")
+        print(f"{r['mode']:<8} {n['throughput_rps']:8.1f} {n['delivered']:>5}/{n['requests']:<5} {failed:8d} "
+              f"{n['rpc_ms']['p50'] or 0:9.1f} {n['rpc_ms']['p99'] or 0:9.1f} "
+              f"{a['per_second']:12.1f} {a['p50']:9.1f} {a['p99']:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bot_persistence.py
+"""
+SQLitePersistence (bot/persistence.py) va PTB PicklePersistence solishtirmasi.
+
+--users ta admin bir vaqtda o'quvchi qo'shish suhbatiga o'xshash 6 qadamli
+suhbatni boshlaydi; xabarlar navbat bilan (har bir admindan bittadan) keladi,
+shuning uchun bir paytda yuzlab suhbat ochiq turadi. Har bir qadam user_data'ga
+bitta kalit qo'shadi, birinchi qadam esa filiallar ro'yxatini saqlaydi.
+
+O'lchanadi: Dispatcher.process_update kechikishi (mediana, p99) va jami vaqt.
+SQLite uchun oxirida flush() (qolgan navbatni yozish) vaqti ham qo'shiladi.
+
+Ishlatish:
+    python -m benchmarks.bot_persistence [--users 500] [--branches 20]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import warnings
+from queue import Queue
+
+from telegram import Bot, Message, Update
+from telegram.ext import ConversationHandler, Dispatcher, Filters, MessageHandler, PicklePersistence
+
+from bot.persistence import SQLitePersistence
+from database import db
+
+STEPS = ["branch", "parent", "full_name", "group", "phone", "discount"]
+
+
+def _conversation(branches):
+    def start(update, context):
+        context.user_data["branches_list"] = [{"id": f"b{i}", "name": f"Filial {i}"} for i in range(branches)]
+        return 0
+
+    def step(update, context):
+        state = len(context.user_data) - 1
+        context.user_data[STEPS[state]] = update.message.text
+        if state + 1 == len(STEPS):
+            context.user_data.clear()
+            return ConversationHandler.END
+        return state + 1
+
+    return ConversationHandler(
+        entry_points=[MessageHandler(Filters.regex("^start$"), start)],
+        states={i: [MessageHandler(Filters.text, step)] for i in range(len(STEPS))},
+        fallbacks=[],
+        name="bench",
+        persistent=True,
+    )
+
+
+def _updates(bot, users):
+    """Har bir qadamda har bir admindan bitta xabar."""
+    update_id = 0
+    for text in ["start"] + [f"qiymat {i}" for i in range(len(STEPS))]:
+        for user_id in range(1, users + 1):
+            update_id += 1
+            message = Message.de_json({
+                "message_id": update_id, "date": int(time.time()), "text": text,
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "Admin"},
+            }, bot)
+            yield Update(update_id, message=message)
+
+
+def _run(persistence, users, branches):
+    bot = Bot("123:benchmark")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        dispatcher = Dispatcher(bot, Queue(), persistence=persistence, use_context=True, workers=0)
+    dispatcher.add_handler(_conversation(branches))
+    updates = list(_updates(bot, users))
+
+    timings = []
+    started_at = time.perf_counter()
+    for update in updates:
+        update_started_at = time.perf_counter()
+        dispatcher.process_update(update)
+        timings.append((time.perf_counter() - update_started_at) * 1000)
+    flush_started_at = time.perf_counter()
+    persistence.flush()
+    flush_ms = (time.perf_counter() - flush_started_at) * 1000
+    total_ms = (time.perf_counter() - started_at) * 1000
+    timings.sort()
+    return {
+        "updates": len(updates),
+        "median": statistics.median(timings),
+        "p99": timings[int(len(timings) * 0.99)],
+        "flush": flush_ms,
+        "total": total_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite va pickle persistence solishtirmasi")
+    parser.add_argument("--users", type=int, default=500, help="bir vaqtda ochiq suhbatlar soni")
+    parser.add_argument("--branches", type=int, default=20, help="user_data'dagi filiallar ro'yxati uzunligi")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    db.DB_NAME = os.path.join(workdir, "bench.db")
+    db.init_db()
+
+    results = {
+        "PicklePersistence": _run(
+            PicklePersistence(os.path.join(workdir, "bot.pickle"), store_chat_data=False, store_bot_data=False),
+            args.users, args.branches,
+        ),
+        "SQLitePersistence": _run(SQLitePersistence(), args.users, args.branches),
+    }
+
+    print(f"{args.users} ta bir vaqtdagi suhbat, {results['SQLitePersistence']['updates']} ta yangilanish")
+    print(f"{'':20} {'mediana':>10} {'p99':>10} {'flush':>10} {'jami':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:20} {result['median']:8.3f}ms {result['p99']:8.3f}ms "
+            f"{result['flush']:8.1f}ms {result['total'] / 1000:9.2f}s"
+        )
+    pickle_total = results["PicklePersistence"]["total"]
+    sqlite_total = results["SQLitePersistence"]["total"]
+    print(f"SQLitePersistence {pickle_total / sqlite_total:.1f}x tezroq")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/import_time.py
+"""
+Modullarni import qilish vaqtini o'lchaydi (har biri alohida, "sovuq" jarayonda).
+
+Ishlatish:
+    python -m benchmarks.import_time [--runs 5]
+
+Natijada bot.handlers va grpc_server.server import vaqti hamda og'ir
+kutubxonalar (gspread, google.oauth2) shu paytda yuklanganmi-yo'qmi ko'rsatiladi.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+TARGETS = [
+    "config",
+    "grpc_server.server",
+    "bot.core",
+    "bot.handlers",
+    "gspread",
+]
+
+HEAVY_MODULES = ["gspread", "google.oauth2.service_account", "pandas", "openpyxl"]
+
+_PROBE = """
+import sys, time
+t = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - t
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+def measure(target, runs):
+    timings = []
+    heavy_loaded = ""
+    for _ in range(runs):
+        code = _PROBE.format(target=target, heavy=HEAVY_MODULES)
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        elapsed, heavy_loaded = result.stdout.strip().split(" ", 1) if " " in result.stdout.strip() else (result.stdout.strip(), "")
+        timings.append(float(elapsed))
+    return timings, heavy_loaded
+
+def main():
+    parser = argparse.ArgumentParser(description="Import vaqti benchmarki")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Modul':<22} {'median':>10} {'min':>10}  Yuklangan og'ir modullar")
+    for target in TARGETS:
+        timings, info = measure(target, args.runs)
+        if timings is None:
+            print(f"{target:<22} {'xato':>10} {'':>10}  {info}")
+            continue
+        print(f"{target:<22} {statistics.median(timings) * 1000:8.1f}ms {min(timings) * 1000:8.1f}ms  {info or '-'}")
+
+if __name__ == "__main__":
+    main()
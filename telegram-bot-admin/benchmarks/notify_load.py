@@ -0,0 +1,318 @@
+# benchmarks/notify_load.py
+"""
+BotAdminService.NotifyPaymentSuccess uchun yuklama testi.
+
+So'rovlar haqiqiy gRPC orqali berilgan tezlik (rate) va parallellik bilan
+yuboriladi; bot.send_message esa lokal soxta Telegram Bot API serveriga
+boradi. Soxta server kechikish va 429 (Too Many Requests) javoblarini
+qo'sha oladi.
+
+Ishlatish:
+    python -m benchmarks.notify_load --rate 50 --duration 10 --concurrency 20 \\
+        --tg-latency 0.05 --tg-429-rate 0.02 [--deadline 5] [--json]
+
+Standart holatda BotAdminService shu jarayonning o'zida ishga tushiriladi.
+--target berilsa, allaqachon ishlayotgan botga yuklama beriladi; u holda bot
+TELEGRAM_API_BASE_URL=http://<host>:<tg-port>/bot bilan ishga tushirilgan bo'lishi kerak.
+
+Hisobot: RPC kechikishi va yetkazish (so'rov -> Telegram API) kechikishining
+p50/p95/p99 qiymatlari, o'tkazuvchanlik, gRPC xato kodlari va yo'qolgan xabarlar.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import grpc
+
+# payme-service NotifyPaymentSuccess'ni 5 soniyalik deadline bilan chaqiradi
+DEFAULT_DEADLINE = 5.0
+
+# Har bir so'rov account_id'siga yoziladigan marker - xabar matnidan qidiriladi
+_MARKER_RE = re.compile(r"LT\d{9}")
+
+
+class FakeTelegramAPI:
+    """Kechikish va 429 javoblarini qo'sha oladigan soxta Telegram Bot API serveri."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, rate_429=0.0, retry_after=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.delivered = {}
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._random = random.Random(42)
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _respond(self, method, params):
+        """(http_status, javob) qaytaradi va yetkazilgan xabarlarni qayd etadi."""
+        if method == "getMe":
+            return 200, {"ok": True, "result": {"id": 1, "is_bot": True, "first_name": "loadtest", "username": "loadtest_bot"}}
+        if method != "sendMessage":
+            return 200, {"ok": True, "result": True}
+
+        with self._lock:
+            throttled = self._random.random() < self.rate_429
+            self.counts["429" if throttled else "ok"] += 1
+        if throttled:
+            return 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }
+
+        marker = _MARKER_RE.search(str(params.get("text", "")))
+        if marker:
+            with self._lock:
+                self.delivered.setdefault(marker.group(0), time.perf_counter())
+        return 200, {
+            "ok": True,
+            "result": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": params.get("chat_id", 0), "type": "supergroup", "title": "loadtest"},
+                "text": params.get("text", ""),
+            },
+        }
+
+    def _make_handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Sarlavha va tana alohida yoziladi - Nagle kechikishi o'lchovni buzmasin
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                if "json" in self.headers.get("Content-Type", ""):
+                    params = json.loads(body or b"{}")
+                else:
+                    params = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+
+                delay = api.latency + (api._random.uniform(0, api.jitter) if api.jitter else 0.0)
+                if delay:
+                    time.sleep(delay)
+
+                status, payload = api._respond(self.path.rsplit("/", 1)[-1], params)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST
+
+        return Handler
+
+
+def percentile(values, p):
+    """Eng yaqin rank usuli bilan persentil (bo'sh ro'yxat uchun None)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_local_server(tg_port):
+    """BotAdminService'ni soxta Telegram API'ga ulangan Bot bilan ishga tushiradi."""
+    from telegram import Bot
+    from telegram.utils.request import Request
+    from config import settings
+    from grpc_server import server as grpc_server
+
+    # Updater bilan bir xil ulanishlar puli (workers + 4)
+    request = Request(con_pool_size=settings.telegram_workers + 4, connect_timeout=20, read_timeout=20)
+    bot = Bot("123456:LOADTEST", base_url=f"http://127.0.0.1:{tg_port}/bot", request=request)
+    settings.telegram_payment_group_id = "-1001000000000"
+
+    port = _free_port()
+    server = grpc_server.start_server(bot, port=port)
+    return server, f"127.0.0.1:{port}"
+
+
+def run_load(target, rate, duration, concurrency, deadline, warmup=0):
+    """
+    Ochiq tsiklli yuklama: i-so'rov t0 + i/rate vaqtida rejalashtiriladi, bir vaqtda
+    ko'pi bilan `concurrency` ta so'rov yuboriladi.
+    Qaytaradi: (har bir so'rov uchun {marker, sent_at, rpc_latency, code} ro'yxati, davomiylik).
+    """
+    from generated import bot_admin_pb2, bot_admin_pb2_grpc
+
+    channel = grpc.insecure_channel(target)
+    grpc.channel_ready_future(channel).result(timeout=10)
+    stub = bot_admin_pb2_grpc.BotAdminServiceStub(channel)
+
+    def call(seq, record):
+        marker = f"LT{seq:09d}"
+        request = bot_admin_pb2.NotifyPaymentSuccessRequest(
+            student_name=f"Yuklama Test {seq}",
+            branch_name="Loadtest filiali",
+            group_name="7-sinf",
+            amount=150000000,
+            payment_time="2026-01-01 12:00:00",
+            account_id=marker,
+            contract_number=f"LT-{seq}",
+            topic_id=seq % 5,
+        )
+        sent_at = time.perf_counter()
+        try:
+            stub.NotifyPaymentSuccess(request, timeout=deadline)
+            code = "OK"
+        except grpc.RpcError as e:
+            code = e.code().name
+        if record:
+            return {"marker": marker, "sent_at": sent_at, "rpc_latency": time.perf_counter() - sent_at, "code": code}
+        return None
+
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Isitish: ulanishlar va thread pool'lar hisobotga ta'sir qilmasligi uchun
+        for f in [pool.submit(call, 10**8 + i, False) for i in range(warmup)]:
+            f.result()
+
+        total = int(rate * duration)
+        slots = threading.BoundedSemaphore(concurrency)
+        pending = []
+        started_at = time.perf_counter()
+        for seq in range(total):
+            delay = started_at + seq / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            slots.acquire()
+            future = pool.submit(call, seq, True)
+            future.add_done_callback(lambda _: slots.release())
+            pending.append(future)
+        results = [f.result() for f in pending]
+        wall_time = time.perf_counter() - started_at
+
+    channel.close()
+    return results, wall_time
+
+
+def build_report(results, fake_api, wall_time, drain_timeout):
+    """Yetkazilishini kutib, yakuniy hisobotni lug'at ko'rinishida qaytaradi."""
+    deadline = time.perf_counter() + drain_timeout
+    expected = {r["marker"] for r in results if r["code"] == "OK"}
+    while time.perf_counter() < deadline and not expected <= fake_api.delivered.keys():
+        time.sleep(0.05)
+
+    rpc_ms = [r["rpc_latency"] * 1000 for r in results]
+    delivery_ms = [
+        (fake_api.delivered[r["marker"]] - r["sent_at"]) * 1000
+        for r in results if r["marker"] in fake_api.delivered
+    ]
+    codes = Counter(r["code"] for r in results)
+
+    def summary(values):
+        stats = {f"p{p}": percentile(values, p) for p in (50, 95, 99)}
+        stats["max"] = max(values, default=None)
+        return {k: round(v, 2) if v is not None else None for k, v in stats.items()}
+
+    return {
+        "requests": len(results),
+        "wall_time": round(wall_time, 3),
+        "throughput_rps": round(len(results) / wall_time, 2) if wall_time else 0.0,
+        "delivered": len(delivery_ms),
+        "lost": len(results) - len(delivery_ms),
+        "telegram_429": fake_api.counts["429"],
+        "grpc_codes": dict(codes),
+        "rpc_ms": summary(rpc_ms),
+        "delivery_ms": summary(delivery_ms),
+    }
+
+
+def print_report(report, args):
+    print(f"NotifyPaymentSuccess: {args.rate}/s x {args.duration}s, parallel {args.concurrency}, "
+          f"deadline {args.deadline}s, Telegram kechikishi {args.tg_latency * 1000:.0f}ms, 429 ulushi {args.tg_429_rate:.0%}")
+    print(f"  So'rovlar:        {report['requests']} ({report['throughput_rps']}/s, {report['wall_time']}s)")
+    print("  gRPC kodlari:     " + ", ".join(f"{k}={v}" for k, v in sorted(report['grpc_codes'].items())))
+    print(f"  Yetkazildi:       {report['delivered']} (yo'qoldi: {report['lost']}, 429: {report['telegram_429']})")
+    print(f"  {'':<16} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for key, label in (("rpc_ms", "RPC, ms"), ("delivery_ms", "Yetkazish, ms")):
+        row = report[key]
+        cells = " ".join(f"{row[k]:9.1f}" if row[k] is not None else f"{'-':>9}" for k in ("p50", "p95", "p99", "max"))
+        print(f"  {label:<16} {cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NotifyPaymentSuccess yuklama testi")
+    parser.add_argument("--rate", type=float, default=20.0, help="so'rov/soniya")
+    parser.add_argument("--duration", type=float, default=10.0, help="soniya")
+    parser.add_argument("--concurrency", type=int, default=10, help="bir vaqtdagi maksimal so'rovlar")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE, help="gRPC deadline (soniya)")
+    parser.add_argument("--warmup", type=int, default=5, help="hisobga olinmaydigan isitish so'rovlari")
+    parser.add_argument("--tg-latency", type=float, default=0.05, help="soxta Telegram API kechikishi (soniya)")
+    parser.add_argument("--tg-jitter", type=float, default=0.0, help="kechikishga qo'shiladigan tasodifiy qism (soniya)")
+    parser.add_argument("--tg-429-rate", type=float, default=0.0, help="sendMessage'ning 429 qaytarish ulushi (0..1)")
+    parser.add_argument("--tg-port", type=int, default=0, help="soxta Telegram API porti (0 - ixtiyoriy)")
+    parser.add_argument("--target", default="", help="ishlayotgan bot gRPC manzili (host:port)")
+    parser.add_argument("--json", action="store_true", help="hisobotni JSON ko'rinishida chiqarish")
+    args = parser.parse_args()
+
+    fake_api = FakeTelegramAPI(
+        port=args.tg_port,
+        latency=args.tg_latency,
+        jitter=args.tg_jitter,
+        rate_429=args.tg_429_rate,
+    ).start()
+
+    server = None
+    target = args.target
+    if not target:
+        server, target = _start_local_server(fake_api.port)
+    elif not args.json:
+        print(f"Soxta Telegram API: http://127.0.0.1:{fake_api.port}/bot")
+
+    try:
+        results, wall_time = run_load(target, args.rate, args.duration, args.concurrency, args.deadline, args.warmup)
+        report = build_report(results, fake_api, wall_time, drain_timeout=args.deadline)
+    finally:
+        if server:
+            server.stop(grace=1)
+        fake_api.stop()
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        print_report(report, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/notify_logging.py
+"""
+NotifyPaymentSuccess'dagi logging xarajati benchmarki.
+
+BotAdminService.NotifyPaymentSuccess to'g'ridan-to'g'ri (gRPC va Telegram'siz,
+bo'sh bot bilan) chaqiriladi va bitta xabarnomaga ketgan vaqt turli logging
+sozlamalarida o'lchanadi:
+  o'chirilgan    - loglar umuman yozilmaydi (asos)
+  eski (sinxron) - basicConfig uslubidagi StreamHandler va har bir to'lov uchun
+                   butun protobuf so'rovini f-string bilan yozadigan 2 ta INFO log
+  yangi          - logging_setup: navbat + JSON, to'lovlar namunalab yoziladi
+  yangi (DEBUG)  - logging_setup, har bir to'lov navbat orqali yoziladi
+
+Har bir sozlama tez (fayl) va sekin (har bir yozuvda --slow-ms kutadigan,
+to'lgan pipe yoki sekin log drayverini taqlid qiladigan) chiqishda o'lchanadi.
+
+Ishlatish:
+    python -m benchmarks.notify_logging [--calls 5000] [--slow-ms 1]
+"""
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+
+from config import settings
+from generated import bot_admin_pb2
+from grpc_server import server as grpc_server
+import logging_setup
+
+
+class _NullBot:
+    def send_message(self, **kwargs):
+        pass
+
+
+class _SlowStream:
+    """Har bir write() chaqiruvida kutadigan chiqish oqimi."""
+
+    def __init__(self, stream, delay):
+        self.stream = stream
+        self.delay = delay
+
+    def write(self, data):
+        time.sleep(self.delay)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class _LegacyService(grpc_server.BotAdminService):
+    """Oldingi versiyadagi har bir to'lov uchun yoziladigan loglar."""
+
+    def NotifyPaymentSuccess(self, request, context):
+        logger = grpc_server.logger
+        logger.info(f"To'lov haqida gRPC xabarnomasi keldi: {request}")
+        response = super().NotifyPaymentSuccess(request, context)
+        logger.info(f"Xabar guruhga ({settings.telegram_payment_group_id}) Topic: {request.topic_id or None} yuborildi.")
+        return response
+
+
+def _request(i):
+    return bot_admin_pb2.NotifyPaymentSuccessRequest(
+        student_name="Karimov Aziz", account_id=f"YM{i:06d}", contract_number=f"12-{i}",
+        branch_name="Chilonzor", group_name="5-sinf", amount=75000000,
+        payment_time="2026-10-19 10:00:00", topic_id=7,
+    )
+
+
+def _reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging_setup._stop_listener()
+
+
+def _configure(mode, stream):
+    _reset_root()
+    root = logging.getLogger()
+    if mode == "off":
+        root.setLevel(logging.CRITICAL)
+    elif mode == "legacy":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(logging_setup.TEXT_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    else:
+        settings.log_level = "DEBUG" if mode == "queue-debug" else "INFO"
+        logging_setup.setup_logging(stream=stream)
+    # Har bir sozlamada namuna birinchi chaqiruvda yoziladi
+    grpc_server.payment_log = logging_setup.SampledLog(grpc_server.logger, settings.log_summary_interval)
+
+
+def run_case(mode, stream, calls):
+    _configure(mode, stream)
+    service = (_LegacyService if mode == "legacy" else grpc_server.BotAdminService)(_NullBot())
+    requests = [_request(i) for i in range(calls)]
+    timings = []
+    for request in requests:
+        started_at = time.perf_counter()
+        service.NotifyPaymentSuccess(request, None)
+        timings.append((time.perf_counter() - started_at) * 1e6)
+
+    # Navbatdagi yozuvlar chiqib bo'lguncha ketgan vaqt (chaqiruvlarga ta'sir qilmaydi)
+    drain_started_at = time.perf_counter()
+    _reset_root()
+    drain_ms = (time.perf_counter() - drain_started_at) * 1000
+
+    timings.sort()
+    return {
+        "mean": statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p99": timings[min(int(len(timings) * 0.99), len(timings) - 1)],
+        "max": timings[-1],
+        "drain_ms": drain_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NotifyPaymentSuccess logging xarajati")
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--slow-ms", type=float, default=1.0, help="sekin chiqishdagi har bir yozuv kechikishi (ms)")
+    args = parser.parse_args()
+
+    settings.telegram_payment_group_id = settings.telegram_payment_group_id or "-100"
+    modes = [("off", "o'chirilgan"), ("legacy", "eski (sinxron)"), ("queue", "yangi"), ("queue-debug", "yangi (DEBUG)")]
+
+    print(f"{args.calls} ta chaqiruv, mikrosoniyada (1 xabarnoma):")
+    print(f"{'Chiqish':<8} {'Sozlama':<16} {'o`rtacha':>9} {'p50':>8} {'p99':>8} {'max':>9} {'navbat':>9}")
+    with tempfile.TemporaryFile("w+") as sink:
+        for sink_name, stream in (("fayl", sink), ("sekin", _SlowStream(sink, args.slow_ms / 1000))):
+            for mode, label in modes:
+                r = run_case(mode, stream, args.calls)
+                drain = f"{r['drain_ms']:7.0f}ms" if mode.startswith("queue") else "-"
+                print(f"{sink_name:<8} {label:<16} {r['mean']:9.1f} {r['p50']:8.1f} {r['p99']:8.1f} {r['max']:9.1f} {drain:>9}")
+
+
+if __name__ == "__main__":
+    main()
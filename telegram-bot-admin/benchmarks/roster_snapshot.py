@@ -0,0 +1,92 @@
+# benchmarks/roster_snapshot.py
+"""
+Ro'yxat nusxasi (roster/snapshot.py) va jonli ListBranches + ListStudents solishtirmasi.
+
+O'lchanadi:
+  RPC        - aio_client.fetch_branches_and_students() (soxta ManagementService,
+               har bir RPC --mgmt-latency kechikadi, javob haqiqiy protobuf)
+  saqlash    - snapshot.save (fayl hajmi bilan)
+  ochish     - snapshot.load: mmap + sarlavha (dashboard birinchi so'rovda kutadigan qism)
+  dekodlash  - ochish + filiallar va o'quvchilarni to'liq o'qish
+
+Ishlatish:
+    python -m benchmarks.roster_snapshot [--students 20000] [--mgmt-latency 0.05] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks import aio_runtime
+from benchmarks.search_index import make_students
+from config import settings
+from generated import payment_pb2
+from roster import snapshot
+
+
+def _students(count, branches):
+    return [
+        payment_pb2.Student(
+            id=s.id, account_id=s.account_id, branch_id=f"b{i % branches}", full_name=s.full_name,
+            parent_name=s.parent_name, phone=s.phone, contract_number=s.contract_number,
+            group_name=s.group_name, status=True,
+        )
+        for i, s in enumerate(make_students(count))
+    ]
+
+
+def _median_ms(func, runs):
+    timings = []
+    result = None
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return result, statistics.median(timings)
+
+
+def _decode(path):
+    loaded, error = snapshot.load(path)
+    if error:
+        raise RuntimeError(error)
+    return len(loaded.branches) + len(loaded.students)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ro'yxat nusxasi va RPC solishtirmasi")
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--branches", type=int, default=10)
+    parser.add_argument("--mgmt-latency", type=float, default=0.05, help="har bir RPC kechikishi (soniya)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    management, servicer, settings.grpc_go_server_address = aio_runtime._start_management(args.mgmt_latency)
+    servicer._branches = payment_pb2.ListBranchesResponse(branches=[
+        payment_pb2.Branch(id=f"b{i}", name=f"Filial {i}") for i in range(args.branches)
+    ])
+    servicer._students = payment_pb2.ListStudentsResponse(students=_students(args.students, args.branches))
+
+    from grpc_client import aio_client
+
+    path = os.path.join(tempfile.mkdtemp(), "roster.snapshot")
+    try:
+        ((branches, _), (students, _)), rpc_ms = _median_ms(aio_client.fetch_branches_and_students, args.runs)
+        size, save_ms = _median_ms(lambda: snapshot.save(path, branches, students), args.runs)
+        _, open_ms = _median_ms(lambda: snapshot.load(path), args.runs)
+        _, decode_ms = _median_ms(lambda: _decode(path), args.runs)
+    finally:
+        management.stop(grace=None)
+        if os.path.exists(path):
+            os.remove(path)
+
+    print(f"{len(students)} ta o'quvchi, {len(branches)} ta filial; RPC kechikishi {args.mgmt_latency * 1000:.0f} ms, "
+          f"mediana ({args.runs} marta)")
+    print(f"RPC (ListBranches + ListStudents): {rpc_ms:9.1f} ms")
+    print(f"Nusxani saqlash:                   {save_ms:9.1f} ms ({size / 1024:.0f} KB)")
+    print(f"Nusxani ochish (mmap + sarlavha):  {open_ms:9.3f} ms")
+    print(f"Ochish + to'liq dekodlash:         {decode_ms:9.1f} ms ({rpc_ms / decode_ms:.1f}x RPC'dan tez)")
+
+
+if __name__ == "__main__":
+    main()
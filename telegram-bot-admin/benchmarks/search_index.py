@@ -0,0 +1,90 @@
+# benchmarks/search_index.py
+"""
+O'quvchilar qidiruv indeksi (search.index.StudentIndex) benchmarki.
+
+Sintetik ro'yxatda indeksni qurish, 1% o'zgargan ro'yxat bilan farq bo'yicha
+yangilash va har xil turdagi so'rovlar vaqtini o'lchaydi.
+
+Ishlatish:
+    python -m benchmarks.search_index [--students 100000] [--queries 200]
+"""
+import argparse
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from search.index import StudentIndex
+
+FIRST_NAMES = ["Ali", "Vali", "Aziz", "Jasur", "Dilnoza", "Madina", "Shahzod", "Gulnora", "Otabek", "Sardor",
+               "Nodira", "Bekzod", "Zarina", "Sherzod", "Malika", "Jahongir", "Kamola", "Ulug'bek", "Farrux", "Sevara"]
+LAST_NAMES = ["Karimov", "Rahimov", "Toshmatov", "Yusupov", "Aliyev", "Qodirov", "Ismoilov", "Sobirov", "Nazarov",
+              "Xolmatov", "G'aniyev", "Saidov", "Ergashev", "Mirzayev", "Abdullayev", "To'xtayev", "Hasanov", "Umarov"]
+
+
+def make_students(count, seed=1):
+    rnd = random.Random(seed)
+    students = []
+    for i in range(count):
+        last = rnd.choice(LAST_NAMES) + (f"{rnd.randint(0, 999)}" if rnd.random() < 0.5 else "")
+        students.append(SimpleNamespace(
+            id=f"id-{i:08d}",
+            account_id=f"YM{i:06d}",
+            full_name=f"{last} {rnd.choice(FIRST_NAMES)}",
+            parent_name=f"{last} {rnd.choice(FIRST_NAMES)}",
+            phone=f"+998 9{rnd.randint(0, 9)} {rnd.randint(1000000, 9999999)}",
+            contract_number=f"{rnd.randint(1, 99)}-{i}",
+            group_name=f"{rnd.randint(1, 11)}-sinf",
+            status=True,
+        ))
+    return students
+
+
+def timed(func, *args):
+    started_at = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - started_at) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Qidiruv indeksi benchmarki")
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    students = make_students(args.students)
+    index = StudentIndex()
+    _, build_ms = timed(index.build, students)
+    print(f"Qurish:            {build_ms:9.1f} ms ({len(index)} ta o'quvchi)")
+
+    # 1% o'zgargan, 0.1% o'chirilgan, 0.1% yangi
+    rnd = random.Random(2)
+    changed = [SimpleNamespace(**vars(s)) for s in students]
+    for s in rnd.sample(changed, len(changed) // 100):
+        s.phone = f"+998 99 {rnd.randint(1000000, 9999999)}"
+    del changed[: len(changed) // 1000]
+    changed.extend(make_students(len(students) // 1000, seed=3))
+    for i, s in enumerate(changed[-(len(students) // 1000):]):
+        s.id, s.account_id = f"new-{i}", f"YN{i:06d}"
+    stats, refresh_ms = timed(index.refresh, changed)
+    print(f"Farq bo'yicha yangilash: {refresh_ms:5.1f} ms ({stats})")
+
+    samples = rnd.sample(changed, args.queries)
+    query_kinds = {
+        "Ism (to'liq)": [s.full_name for s in samples],
+        "Ism (prefiks)": [s.full_name.split()[0][:4] for s in samples],
+        "Ism (xato)": [s.full_name.split()[0][:-1] + "x" for s in samples],
+        "Telefon": [s.phone[-7:] for s in samples],
+        "Shartnoma": [s.contract_number for s in samples],
+        "Hisob raqami": [s.account_id for s in samples],
+    }
+    print(f"{'So`rov turi':<16} {'p50':>8} {'p99':>8} {'max':>8}")
+    for kind, queries in query_kinds.items():
+        timings = [timed(index.search, q)[1] for q in queries]
+        timings.sort()
+        p99 = timings[min(int(len(timings) * 0.99), len(timings) - 1)]
+        print(f"{kind:<16} {statistics.median(timings):6.2f}ms {p99:6.2f}ms {timings[-1]:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,74 @@
-from telegram.ext import Updater, CommandHandler, MessageHandler, Filters, ConversationHandler
+import logging
+from telegram.error import TelegramError
+from telegram.ext import Updater, CommandHandler, MessageHandler, Filters, ConversationHandler, CallbackQueryHandler
 from config import settings
-from . import handlers
 from . import states
+from .persistence import SQLitePersistence
 
-def run_bot():
+logger = logging.getLogger(__name__)
+
+def create_updater():
+    """Updater va Bot obyektini yaratadi (handlerlarsiz, polling'siz)."""
     # Timeoutlarni oshiramiz (20 soniya)
     req_kwargs = {
         'read_timeout': 20,
         'connect_timeout': 20
     }
-    
-    updater = Updater(settings.telegram_bot_token, use_context=True, request_kwargs=req_kwargs)
-    
+    updater_kwargs = {
+        'use_context': True,
+        'request_kwargs': req_kwargs,
+        'workers': settings.telegram_workers,
+        # Suhbat holatlari va user_data qayta ishga tushishda tiklanadi
+        'persistence': SQLitePersistence(),
+    }
+    if settings.telegram_api_base_url:
+        updater_kwargs['base_url'] = settings.telegram_api_base_url
+
+    if settings.telegram_update_mode == "webhook":
+        from .webhook import WebhookUpdater
+        return WebhookUpdater(settings.telegram_bot_token, secret_token=settings.telegram_webhook_secret, **updater_kwargs)
+    return Updater(settings.telegram_bot_token, **updater_kwargs)
+
+def start_updates(updater):
+    """Webhook rejimi sozlangan bo'lsa webhook'ni, aks holda polling'ni ishga tushiradi."""
+    if settings.telegram_update_mode == "webhook":
+        if not settings.telegram_webhook_url:
+            logger.error("TELEGRAM_WEBHOOK_URL berilmagan - polling rejimiga o'tilmoqda.")
+        elif not hasattr(updater, 'set_secret_webhook'):
+            logger.error("Updater webhook rejimida yaratilmagan - polling rejimiga o'tilmoqda.")
+        else:
+            try:
+                updater.set_secret_webhook(settings.telegram_webhook_url)
+                updater.start_webhook(
+                    listen=settings.telegram_webhook_listen,
+                    port=settings.telegram_webhook_port,
+                    url_path=settings.telegram_webhook_path,
+                )
+                logger.info(f"Webhook rejimi: {settings.telegram_webhook_listen}:{settings.telegram_webhook_port}/{settings.telegram_webhook_path}")
+                return "webhook"
+            except (TelegramError, OSError) as e:
+                logger.error(f"Webhook'ni ishga tushirib bo'lmadi ({e}) - polling rejimiga o'tilmoqda.")
+
+    updater.start_polling()
+    return "polling"
+
+def register_handlers(updater, schedule_sync=True):
+    """Barcha handler va rejalashtirilgan vazifalarni ro'yxatdan o'tkazadi.
+
+    schedule_sync=False bo'lsa avtomatik sinxronizatsiya rejalashtirilmaydi
+    (ko'p jarayonli rejimda uni alohida sync jarayoni bajaradi).
+    """
+    # handlers moduli (va u orqali grpc_client) faqat shu yerda yuklanadi
+    from . import handlers
+
     dispatcher = updater.dispatcher
     job_queue = updater.job_queue
 
     # --- AVTOMATIK SINXRONIZATSIYA ---
-    # Har 3600 soniyada (1 soat) ishga tushadi.
-    # first=60 -> Bot ishga tushgandan 60 soniya o'tib birinchi marta ishlaydi.
-    job_queue.run_repeating(handlers.auto_sync_job, interval=3600, first=60)
+    # Bot ishga tushgandan 60 soniya o'tib birinchi marta ishlaydi, keyin o'zini
+    # moslashuvchan interval bilan qayta rejalashtiradi (sync_engine.next_sync_interval).
+    if schedule_sync:
+        job_queue.run_once(handlers.auto_sync_job, 60, context={'interval': settings.sync_interval}, name='auto_sync')
 
     common_fallbacks = [
         CommandHandler('cancel', handlers.cancel),
@@ -36,6 +86,8 @@ def run_bot():
             states.BRANCH_TOPIC_ID: [MessageHandler(Filters.text & ~Filters.command, handlers.get_branch_topic_id)],
         },
         fallbacks=common_fallbacks,
+        name='add_branch',
+        persistent=True,
     )
 
     add_student_conv = ConversationHandler(
@@ -49,6 +101,8 @@ def run_bot():
             states.STUDENT_DISCOUNT: [MessageHandler(Filters.text & ~Filters.command, handlers.get_student_discount)],
         },
         fallbacks=common_fallbacks,
+        name='add_student',
+        persistent=True,
     )
 
     delete_student_conv = ConversationHandler(
@@ -57,6 +111,8 @@ def run_bot():
             states.DELETE_STUDENT_ACCOUNT_ID: [MessageHandler(Filters.text & ~Filters.command, handlers.get_student_account_id_to_delete)],
         },
         fallbacks=common_fallbacks,
+        name='delete_student',
+        persistent=True,
     )
 
     delete_branch_conv = ConversationHandler(
@@ -66,15 +122,35 @@ def run_bot():
             states.DELETE_BRANCH_CONFIRM: [MessageHandler(Filters.text & ~Filters.command, handlers.confirm_branch_delete)],
         },
         fallbacks=common_fallbacks,
+        name='delete_branch',
+        persistent=True,
     )
 
     change_status_conv = ConversationHandler(
-        entry_points=[MessageHandler(Filters.regex('^🔄 Statusni o\'zgartirish'), handlers.change_status_start)],
+        entry_points=[
+            MessageHandler(Filters.regex('^🔄 Statusni o\'zgartirish'), handlers.change_status_start),
+            # /search natijalaridagi inline tugmalar
+            CallbackQueryHandler(handlers.change_status_from_search, pattern=r'^status:'),
+        ],
         states={
             states.CHANGE_STATUS_ACCOUNT_ID: [MessageHandler(Filters.text & ~Filters.command, handlers.get_student_for_status_change)],
             states.CONFIRM_STATUS_CHANGE: [MessageHandler(Filters.text & ~Filters.command, handlers.confirm_status_change)],
         },
         fallbacks=common_fallbacks,
+        name='change_status',
+        persistent=True,
+    )
+
+    bulk_conv = ConversationHandler(
+        entry_points=[MessageHandler(Filters.regex('^📋 Ommaviy amallar'), handlers.bulk_start)],
+        states={
+            states.BULK_ACTION: [MessageHandler(Filters.text & ~Filters.command, handlers.bulk_get_action)],
+            states.BULK_ACCOUNT_IDS: [MessageHandler(Filters.document | (Filters.text & ~Filters.command), handlers.bulk_get_account_ids)],
+            states.BULK_CONFIRM: [MessageHandler(Filters.text & ~Filters.command, handlers.bulk_confirm)],
+        },
+        fallbacks=common_fallbacks,
+        name='bulk',
+        persistent=True,
     )
 
     dispatcher.add_handler(CommandHandler("start", handlers.start))
@@ -83,15 +159,27 @@ def run_bot():
     dispatcher.add_handler(MessageHandler(Filters.regex('^⚙️ Adminlar'), handlers.manage_admins))
     
     dispatcher.add_handler(MessageHandler(Filters.regex('^🔄 Google Sheets bilan sinxronlash'), handlers.sync_with_google_sheet))
+    dispatcher.add_handler(CallbackQueryHandler(handlers.sync_target_callback, pattern=r'^sync:'))
+    dispatcher.add_handler(CommandHandler("sync", handlers.sync_command))
 
     dispatcher.add_handler(CommandHandler("add_admin", handlers.add_admin_command))
     dispatcher.add_handler(CommandHandler("remove_admin", handlers.remove_admin_command))
+    dispatcher.add_handler(CommandHandler("grpc_status", handlers.grpc_status_command))
+    dispatcher.add_handler(CommandHandler("sync_history", handlers.sync_history_command))
+    dispatcher.add_handler(CommandHandler("search", handlers.search_students_command))
+    dispatcher.add_handler(CommandHandler("hisobot", handlers.statement_report_command))
+    dispatcher.add_handler(CommandHandler("diag", handlers.diag_command))
 
     dispatcher.add_handler(add_branch_conv)
     dispatcher.add_handler(add_student_conv)
     dispatcher.add_handler(delete_student_conv)
     dispatcher.add_handler(delete_branch_conv)
     dispatcher.add_handler(change_status_conv)
+    dispatcher.add_handler(bulk_conv)
 
-    updater.start_polling()
+def run_bot(updater=None, schedule_sync=True):
+    if updater is None:
+        updater = create_updater()
+    register_handlers(updater, schedule_sync=schedule_sync)
+    start_updates(updater)
     return updater.bot, updater.idle
\ No newline at end of file
@@ -1,32 +1,31 @@
 # telegram-bot-admin/bot/handlers.py
 
-from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
+from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CallbackContext, ConversationHandler
 from functools import wraps
-from config import settings, SHEET_COLUMNS_CONFIG, START_ROW
+from config import settings
 from database import db
 from grpc_client import client as grpc_client
+from grpc_client.singleflight import SingleFlight
+import html
+import io
 import logging
-import gspread
-from google.oauth2.service_account import Credentials
+import threading
+import time
+from sync import engine as sync_engine
+from sync.metrics import PHASES, PHASE_LABELS
+from search import service as search_service
+from roster import service as roster_service
+from search.index import student_index
+from reports import statement as statement_report
+from diag import probes as diag_probes
+from bulk import operations as bulk_ops
 from . import states
 
-# Loglarni terminalga chiqarish
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 super_admin_id = settings.super_admin_id
 
 # --- Yordamchi Funksiyalar ---
-def get_gsheet_client():
-    try:
-        scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-        creds = Credentials.from_service_account_file(settings.google_creds_file, scopes=scopes)
-        client = gspread.authorize(creds)
-        return client, None
-    except Exception as e:
-        logger.error(f"Google Sheets'ga ulanishda xatolik: {e}")
-        return None, str(e)
-
 def get_back_keyboard():
     return ReplyKeyboardMarkup([["⬅️ Orqaga"]], resize_keyboard=True)
 
@@ -35,16 +34,50 @@ def create_dynamic_keyboard(items):
     keyboard.append(["⬅️ Orqaga"])
     return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
 
-def normalize_text(s):
-    return (s or "").strip().lower().replace(" ", "")
-
-def safe_get(row, index):
-    """Ro'yxatdan indeks bo'yicha xavfsiz olish"""
-    try:
-        val = row[index]
-        return str(val).strip() if val else ""
-    except IndexError:
+# --- Dashboard ("🏢 Filiallar", "🎓 O'quvchilar") keshi ---
+# Tayyor matn dashboard_cache_ttl soniya saqlanadi; bir vaqtda bosilgan tugmalar
+# bitta hisoblashni kutadi. Bitta admin shu tugmani dashboard_throttle_seconds
+# ichida qayta bossa (masalan, ikki marta tez bosish), e'tiborsiz qoldiriladi.
+_dashboard_flight = SingleFlight()
+_dashboard_cache = {}
+_last_dashboard_press = {}
+_press_lock = threading.Lock()
+
+def _invalidate_dashboards():
+    _dashboard_cache.clear()
+
+def _render_dashboard(key, render):
+    text, error = render()
+    # Diskdagi nusxadan chizilgan matn keshlanmaydi - fon tekshiruvidan keyin jonli ro'yxat ko'rsatiladi
+    if not error and roster_service.is_reconciled():
+        _dashboard_cache[key] = (time.monotonic(), text)
+    return text, error
+
+def _snapshot_note(snapshot_age):
+    if snapshot_age is None:
         return ""
+    return f"\n_🕒 Ro'yxat nusxasi: {roster_service.format_age(snapshot_age)} oldin saqlangan, baza tekshirilmoqda._\n"
+
+def _show_dashboard(update: Update, key, render):
+    """render() -> (matn, xato). Matn Markdown'da yuboriladi, xatolar keshlanmaydi."""
+    now = time.monotonic()
+    with _press_lock:
+        press_key = (update.effective_user.id, key)
+        last_press = _last_dashboard_press.get(press_key)
+        if last_press is not None and now - last_press < settings.dashboard_throttle_seconds:
+            logger.debug("Dashboard '%s' takroriy bosildi (%s) - o'tkazib yuborildi", key, update.effective_user.id)
+            return
+        _last_dashboard_press[press_key] = now
+
+    cached = _dashboard_cache.get(key)
+    if cached and now - cached[0] < settings.dashboard_cache_ttl:
+        text, error = cached[1], None
+    else:
+        text, error = _dashboard_flight.do(key, lambda: _render_dashboard(key, render))
+    if error:
+        update.message.reply_text(error)
+    else:
+        update.message.reply_text(text, parse_mode='Markdown')
 
 # --- Dekoratorlar ---
 def admin_required(func):
@@ -52,7 +85,7 @@ def admin_required(func):
     def wrapped(update: Update, context: CallbackContext, *args, **kwargs):
         user_id = update.effective_user.id
         if not db.is_admin(user_id):
-            update.message.reply_text("Sizda bu buyruqni ishlatish uchun ruxsat yo'q.")
+            update.effective_message.reply_text("Sizda bu buyruqni ishlatish uchun ruxsat yo'q.")
             return
         return func(update, context, *args, **kwargs)
     return wrapped
@@ -74,7 +107,7 @@ def start(update: Update, context: CallbackContext):
         ["🏢 Filiallar", "🎓 O'quvchilar"],
         ["➕ Filial qo'shish", "👤 O'quvchi qo'shish"],
         ["🗑 Filialni o'chirish", "🗑 O'quvchini o'chirish"],
-        ["🔄 Statusni o'zgartirish"],
+        ["🔄 Statusni o'zgartirish", "📋 Ommaviy amallar"],
         ["🔄 Google Sheets bilan sinxronlash"],
         ["⚙️ Adminlar"]
     ]
@@ -88,177 +121,196 @@ def cancel(update: Update, context: CallbackContext):
     return ConversationHandler.END
 
 # ====================================================================
-# SINXRONIZATSIYA MANTIQI (UMUMIY)
+# SINXRONIZATSIYA (mantiq sync.engine modulida)
 # ====================================================================
-def _execute_sync(status_callback):
-    """
-    Asosiy sinxronizatsiya logikasi.
-    status_callback: (str) -> None funksiyasi (xabar berish uchun)
-    """
-    gspread_client, err = get_gsheet_client()
-    if err:
-        status_callback(f"❌ Google Sheets xatosi: {err}")
-        return
+# --- Qo'lda ishga tushirish uchun handler ---
+@admin_required
+def sync_with_google_sheet(update: Update, context: CallbackContext):
+    """Sinxronizatsiya doirasini tanlash: hammasi, bitta varaq yoki bitta filial."""
+    buttons = [[InlineKeyboardButton("🔄 Hammasi", callback_data="sync:all")]]
+    for i, sheet_name in enumerate(settings.google_worksheet_name_list):
+        buttons.append([InlineKeyboardButton(f"📄 {sheet_name}", callback_data=f"sync:sheet:{i}")])
+    branches, _ = grpc_client.list_branches()
+    for branch in branches or []:
+        buttons.append([InlineKeyboardButton(f"🏢 {branch.name}", callback_data=f"sync:branch:{branch.id}")])
+    update.message.reply_text(
+        "Nimani sinxronlaymiz?\n\nVaraqning bir qismi uchun: /sync <varaq> <qatorlar>, "
+        "masalan: /sync Chilonzor 120-135",
+        reply_markup=InlineKeyboardMarkup(buttons),
+    )
 
-    try:
-        status_callback("⏳ Bazadan ma'lumotlar olinmoqda...")
-        all_branches, _ = grpc_client.list_branches()
-        all_students, _ = grpc_client.list_students()
-        
-        if not all_branches:
-            status_callback("❌ DIQQAT: Bazada hech qanday filial yo'q! Avval bot orqali filial yarating.")
+@admin_required
+def sync_target_callback(update: Update, context: CallbackContext):
+    query = update.callback_query
+    query.answer()
+    _, kind, value = (query.data.split(":", 2) + [""])[:3]
+
+    sheet_name, branch = None, None
+    if kind == "sheet":
+        sheet_names = settings.google_worksheet_name_list
+        sheet_name = sheet_names[int(value)] if value.isdigit() and int(value) < len(sheet_names) else None
+        if sheet_name is None:
+            query.message.edit_text("❌ Varaq topilmadi.")
+            return
+    elif kind == "branch":
+        branches, error = grpc_client.list_branches()
+        branch = next((b for b in branches or [] if b.id == value), None)
+        if branch is None:
+            query.message.edit_text(f"❌ Filial topilmadi. {error or ''}".strip())
             return
 
-        branch_map = {normalize_text(b.name): b.id for b in all_branches}
-        db_students_by_uuid = {s.id: s for s in all_students}
-
-        spreadsheet = gspread_client.open_by_key(settings.google_spreadsheet_id)
-    except Exception as e:
-        status_callback(f"❌ Boshlang'ich xatolik: {e}")
-        logger.error(f"Sync init error: {e}")
-        return
-
-    total_created = 0
-    total_updated = 0
+    progress_message = query.message.edit_text("⏳ Sinxronizatsiya boshlanmoqda...")
+    if kind == "all":
+        _run_sync(progress_message, lambda callback: sync_engine.execute_sync(callback, trigger="manual"))
+    else:
+        _run_sync(progress_message, lambda callback: sync_engine.execute_targeted_sync(
+            callback, sheet_name=sheet_name, branch=branch,
+        ))
 
+def _resolve_sync_target(name):
+    """Nom bo'yicha varaq yoki filial. Qaytaradi: (sheet_name, branch, error)"""
+    key = sync_engine.normalize_text(name)
     for sheet_name in settings.google_worksheet_name_list:
-        try:
-            status_callback(f"⏳ '{sheet_name}' varag'i o'qilmoqda...")
-            logger.info(f"--- VARAQ: {sheet_name} ---")
-            
-            try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-            except gspread.exceptions.WorksheetNotFound:
-                logger.error(f"Varaq topilmadi: {sheet_name}")
-                continue
-
-            rows = worksheet.get_all_values()[START_ROW-1:]
-            
-            to_create = [] 
-            to_update = [] 
-            updates_for_sheet = [] 
-
-            for i, row in enumerate(rows):
-                row_num = i + START_ROW
-                
-                student_name_raw = safe_get(row, SHEET_COLUMNS_CONFIG["student_name"])
-                if not student_name_raw:
-                    continue
-
-                b_name_raw = safe_get(row, SHEET_COLUMNS_CONFIG["branch_name"])
-                b_name_norm = normalize_text(b_name_raw)
-                b_id = branch_map.get(b_name_norm)
-                
-                if not b_id: 
-                    continue 
-
-                acc_id = safe_get(row, SHEET_COLUMNS_CONFIG["account_id"]).upper().replace(" ", "")
-                uuid_val = safe_get(row, SHEET_COLUMNS_CONFIG["uuid"])
-                
-                try:
-                    discount_str = safe_get(row, SHEET_COLUMNS_CONFIG["discount"]).replace('%', '')
-                    discount_val = float(discount_str) if discount_str else 0.0
-                except:
-                    discount_val = 0.0
-
-                # Statusni aniqlash: Sheetda 'amalda' bo'lsa -> True
-                is_active = True
-                student_data = {
-                    'branch_id': b_id,
-                    'account_id': acc_id,
-                    'full_name': student_name_raw,
-                    'parent_name': safe_get(row, SHEET_COLUMNS_CONFIG["parent_name"]),
-                    'phone': safe_get(row, SHEET_COLUMNS_CONFIG["phone"]),
-                    'group_name': f"{safe_get(row, SHEET_COLUMNS_CONFIG['class'])}-sinf",
-                    'contract_number': safe_get(row, SHEET_COLUMNS_CONFIG["contract_number"]),
-                    'discount_percent': discount_val,
-                    'status': is_active
-                }
-
-                if uuid_val and uuid_val in db_students_by_uuid:
-                    student_data['id'] = uuid_val
-                    to_update.append(student_data)
-                else:
-                    student_data['row_number'] = row_num
-                    to_create.append(student_data)
-
-            if to_update:
-                logger.info(f"Yangilanmoqda: {len(to_update)} ta")
-                grpc_client.update_students_batch(to_update)
-                total_updated += len(to_update)
-
-            if to_create:
-                logger.info(f"Yaratilmoqda: {len(to_create)} ta")
-                clean_create_list = [{k: v for k, v in s.items() if k != 'row_number'} for s in to_create]
-                
-                created_students, err = grpc_client.create_students_batch(clean_create_list)
-                if err:
-                    logger.error(f"Create batch error: {err}")
-                else:
-                    total_created += len(created_students)
-                    created_map = {s.account_id: s for s in created_students}
-
-                    for item in to_create:
-                        res = created_map.get(item['account_id'])
-                        # Agar account_id bo'sh bo'lsa, ism va filial orqali topishga harakat qilamiz
-                        if not res:
-                             for s in created_students:
-                                 if s.branch_id == item['branch_id'] and normalize_text(s.full_name) == normalize_text(item['full_name']):
-                                     res = s
-                                     break
-                        
-                        if res:
-                            updates_for_sheet.append(gspread.Cell(item['row_number'], SHEET_COLUMNS_CONFIG["uuid"] + 1, res.id))
-                            if not item['account_id']:
-                                 updates_for_sheet.append(gspread.Cell(item['row_number'], SHEET_COLUMNS_CONFIG["account_id"] + 1, res.account_id))
-
-            if updates_for_sheet:
-                logger.info(f"Sheet yangilanmoqda: {len(updates_for_sheet)} ta katak")
-                worksheet.update_cells(updates_for_sheet, value_input_option='USER_ENTERED')
-
-        except Exception as e:
-            logger.error(f"Sheet loop error: {e}", exc_info=True)
-            status_callback(f"⚠️ Xatolik varaqda: {e}")
-
-    final_msg = f"✅ Sinxronizatsiya tugadi!\nYangilandi: {total_updated}\nQo'shildi: {total_created}"
-    logger.info(final_msg)
-    status_callback(final_msg)
+        if sync_engine.normalize_text(sheet_name) == key:
+            return sheet_name, None, None
+    branches, error = grpc_client.list_branches()
+    if error:
+        return None, None, error
+    for branch in branches:
+        if sync_engine.normalize_text(branch.name) == key:
+            return None, branch, None
+    return None, None, f"'{name}' nomli varaq yoki filial topilmadi.\nVaraqlar: {', '.join(settings.google_worksheet_name_list)}"
 
-# --- Qo'lda ishga tushirish uchun handler ---
 @admin_required
-def sync_with_google_sheet(update: Update, context: CallbackContext):
-    progress_message = update.message.reply_text("⏳ Sinxronizatsiya boshlanmoqda...", reply_markup=ReplyKeyboardRemove())
+def sync_command(update: Update, context: CallbackContext):
+    """/sync <varaq yoki filial> [qatorlar] - faqat tanlangan qismni sinxronlaydi."""
+    if not context.args:
+        update.message.reply_text(
+            "Ishlatish: /sync <varaq yoki filial> [qatorlar]\nMasalan: /sync Chilonzor yoki /sync Chilonzor 120-135"
+        )
+        return
+
+    # Nomning o'zi raqam bilan tugashi mumkin ("Filial 2"), shuning uchun avval butun matn tekshiriladi
+    args, row_range = list(context.args), None
+    sheet_name, branch, error = _resolve_sync_target(" ".join(args))
+    if error and len(args) > 1 and args[-1][:1].isdigit():
+        row_range, range_error = sync_engine.parse_row_range(args[-1])
+        if range_error:
+            update.message.reply_text(f"❌ {range_error}")
+            return
+        sheet_name, branch, error = _resolve_sync_target(" ".join(args[:-1]))
+    if error:
+        update.message.reply_text(f"❌ {error}")
+        return
+    if branch is not None and row_range:
+        update.message.reply_text("❌ Qatorlar oralig'i faqat varaq uchun beriladi.")
+        return
+
+    progress_message = update.message.reply_text("⏳ Sinxronizatsiya boshlanmoqda...")
+    _run_sync(progress_message, lambda callback: sync_engine.execute_targeted_sync(
+        callback, sheet_name=sheet_name, branch=branch, row_range=row_range,
+    ))
 
+def _run_sync(progress_message, execute):
     def telegram_callback(text):
         try:
             if progress_message.text != text:
                 progress_message.edit_text(text)
         except: pass
 
-    _execute_sync(telegram_callback)
-    start(update, context)
+    execute(telegram_callback)
+    _invalidate_dashboards()
+    _refresh_search_index()
+
+def _refresh_search_index():
+    # Qidiruv ishlatilgan bo'lsa, indeksni sinxronizatsiyadan keyin darhol yangilaymiz
+    if student_index.refreshed_at:
+        search_service.get_index()
 
 # --- Avtomatik (JobQueue) uchun handler ---
 def auto_sync_job(context: CallbackContext):
-    logger.info("⏰ Avtomatik soatlik sinxronizatsiya boshlandi...")
-    
-    def log_callback(text):
-        # Faqat muhim xabarlarni logga chiqaramiz
-        if "✅" in text or "❌" in text or "⚠️" in text:
-            logger.info(f"[AUTO-SYNC] {text}")
-            
-    _execute_sync(log_callback)
+    logger.info("⏰ Avtomatik sinxronizatsiya boshlandi...")
+
+    job_state = context.job.context if isinstance(context.job.context, dict) else {}
+    interval, last_full_sync = sync_engine.run_scheduled_sync(
+        job_state.get('interval', settings.sync_interval),
+        job_state.get('last_full_sync', 0.0),
+    )
+    _invalidate_dashboards()
+    _refresh_search_index()
+    logger.info(f"[AUTO-SYNC] Keyingi tekshiruv {interval} soniyadan keyin.")
+    context.job_queue.run_once(
+        auto_sync_job, interval,
+        context={'interval': interval, 'last_full_sync': last_full_sync},
+        name='auto_sync',
+    )
+
+def _format_duration(seconds):
+    return f"{seconds:.1f}s" if seconds >= 1 else f"{seconds * 1000:.0f}ms"
+
+@admin_required
+def sync_history_command(update: Update, context: CallbackContext):
+    try:
+        limit = int(context.args[0]) if context.args else 10
+    except ValueError:
+        update.message.reply_text("Noto'g'ri format. Ishlatish: /sync_history [soni]")
+        return
+    limit = max(1, min(limit, 50))
+
+    # Trend uchun oxirgi N ta va undan oldingi N ta ishga tushirish solishtiriladi
+    runs = db.get_recent_sync_runs(limit * 2)
+    if not runs:
+        update.message.reply_text("Hali sinxronizatsiya tarixi yo'q.")
+        return
+    recent, previous = runs[:limit], runs[limit:]
+
+    status_icons = {"ok": "✅", "partial": "⚠️", "failed": "❌"}
+    message = f"📊 *Oxirgi {len(recent)} ta sinxronizatsiya:*\n\n"
+    for run in recent:
+        started = time.strftime("%d.%m %H:%M", time.localtime(run['started_at']))
+        icon = status_icons.get(run['status'], "❔")
+        message += (
+            f"{icon} `{started}` {run['trigger']} - {_format_duration(run['duration'])}"
+            f" (+{run['created']} / ~{run['updated']}, varaq {run['sheets_changed']}/{run['sheets_changed'] + run['sheets_skipped']})\n"
+        )
+        phases = [f"{PHASE_LABELS[p]} {_format_duration(run['phases'][p])}" for p in PHASES if p in run['phases']]
+        if phases:
+            message += "    " + ", ".join(phases) + "\n"
+        if run['errors']:
+            message += f"    Xatolar: {len(run['errors'])}\n"
+
+    def average(items, key):
+        values = [key(r) for r in items if r['sheets_changed'] > 0]
+        return sum(values) / len(values) if values else None
+
+    rows = [("Jami", lambda r: r['duration'])] + [
+        (PHASE_LABELS[p], lambda r, p=p: r['phases'].get(p, 0.0)) for p in PHASES
+    ]
+    trend_lines = []
+    for label, key in rows:
+        now, before = average(recent, key), average(previous, key)
+        if now is None or before is None:
+            continue
+        change = ((now - before) / before * 100) if before else 0.0
+        trend_lines.append(f"- {label}: {_format_duration(now)} ({change:+.0f}%)")
+    if trend_lines:
+        message += "\n📈 *Trend (o'rtacha, oldingi davrga nisbatan):*\n" + "\n".join(trend_lines) + "\n"
+
+    update.message.reply_text(message, parse_mode='Markdown')
 
 # --- FILIALLAR ---
 @admin_required
 def list_branches(update: Update, context: CallbackContext):
-    branches_info, error = grpc_client.list_branches_with_student_counts()
+    _show_dashboard(update, "branches", _render_branches)
+
+def _render_branches():
+    roster, error = roster_service.get_roster()
     if error:
-        update.message.reply_text(f"Xatolik: {error}")
-        return
+        return None, f"Xatolik: {error}"
+    branches, students, snapshot_age = roster
+    branches_info = grpc_client.count_students_by_branch(branches, students)
     if not branches_info:
-        update.message.reply_text("Hozircha filiallar mavjud emas.")
-        return
+        return "Hozircha filiallar mavjud emas.", None
     message = "🏢 *Barcha filiallar:*\n\n"
     for info in branches_info:
         branch = info['branch']
@@ -266,7 +318,7 @@ def list_branches(update: Update, context: CallbackContext):
         fee_in_som = branch.monthly_fee
         formatted_fee = f"{fee_in_som:,.0f}".replace(',', ' ')
         message += f"▪️ *{branch.name}*\n   - Oylik to'lov: {formatted_fee} so'm\n   - O'quvchilar soni: {count} ta\n   - Topic ID: {branch.topic_id}\n\n"
-    update.message.reply_text(message, parse_mode='Markdown')
+    return message + _snapshot_note(snapshot_age), None
 
 @admin_required
 def add_branch_start(update: Update, context: CallbackContext):
@@ -329,6 +381,7 @@ def get_branch_topic_id(update: Update, context: CallbackContext):
             update.message.reply_text(f"Xatolik yuz berdi: {error}")
         else:
             update.message.reply_text(f"✅ Muvaffaqiyatli! '{new_branch.name}' nomli yangi filial qo'shildi (Topic ID: {topic_id}).")
+            _invalidate_dashboards()
             
     except ValueError:
         update.message.reply_text("Iltimos, Topic ID uchun faqat raqam kiriting.")
@@ -380,6 +433,7 @@ def confirm_branch_delete(update: Update, context: CallbackContext):
         success, error = grpc_client.delete_branch(branch_id)
         if success:
             update.message.reply_text(f"✅ Filial '{branch_name}' muvaffaqiyatli o'chirildi.")
+            _invalidate_dashboards()
         else:
             update.message.reply_text(f"❌ Xatolik: {error}")
         context.user_data.clear()
@@ -391,14 +445,15 @@ def confirm_branch_delete(update: Update, context: CallbackContext):
 # --- O'QUVCHILAR ---
 @admin_required
 def list_students(update: Update, context: CallbackContext):
-    branches, branch_error = grpc_client.list_branches()
-    students, student_error = grpc_client.list_students()
-    if branch_error or student_error:
-        update.message.reply_text(f"Ma'lumotlarni olishda xatolik yuz berdi.")
-        return
+    _show_dashboard(update, "students", _render_students)
+
+def _render_students():
+    roster, error = roster_service.get_roster()
+    if error:
+        return None, f"Ma'lumotlarni olishda xatolik yuz berdi."
+    branches, students, snapshot_age = roster
     if not students:
-        update.message.reply_text("Hozircha o'quvchilar mavjud emas.")
-        return
+        return "Hozircha o'quvchilar mavjud emas.", None
     branch_map = {branch.id: branch.name for branch in branches}
     student_counts_by_branch = {branch.id: 0 for branch in branches}
     active_students = 0
@@ -419,7 +474,7 @@ def list_students(update: Update, context: CallbackContext):
     for branch_id, count in student_counts_by_branch.items():
         branch_name = branch_map.get(branch_id, "Noma'lum filial")
         message += f"- {branch_name}: *{count}* ta o'quvchi\n"
-    update.message.reply_text(message, parse_mode='Markdown')
+    return message + _snapshot_note(snapshot_age), None
 
 @admin_required
 def add_student_start(update: Update, context: CallbackContext):
@@ -481,6 +536,8 @@ def get_student_discount(update: Update, context: CallbackContext):
         else:
             success_message = f"✅ Muvaffaqiyatli! Yangi o'quvchi qo'shildi.\n\n👤 *F.I.Sh:* {new_student.full_name}\n🆔 *Hisob raqami:* `{new_student.account_id}`\n\nUshbu hisob raqamini o'quvchiga taqdim eting."
             update.message.reply_text(success_message, parse_mode='Markdown')
+            student_index.upsert(new_student)
+            _invalidate_dashboards()
     except (ValueError, KeyError) as e:
         update.message.reply_text(f"Kiritishda xatolik: {e}. Iltimos, qaytadan boshlang.")
     context.user_data.clear()
@@ -503,6 +560,8 @@ def get_student_account_id_to_delete(update: Update, context: CallbackContext):
         update.message.reply_text(f"❌ Xatolik: {error}")
     else:
         update.message.reply_text(f"✅ O'quvchi (hisob raqami: {account_id}) muvaffaqiyatli o'chirildi.")
+        student_index.remove_account(account_id)
+        _invalidate_dashboards()
     start(update, context)
     return ConversationHandler.END
 
@@ -518,12 +577,27 @@ def get_student_for_status_change(update: Update, context: CallbackContext):
     if error or not student:
         update.message.reply_text(f"❌ Xatolik: {error or 'O`quvchi topilmadi.'}\nQaytadan kiriting:")
         return states.CHANGE_STATUS_ACCOUNT_ID
+    return _ask_new_status(update.message, context, student)
+
+@admin_required
+def change_status_from_search(update: Update, context: CallbackContext):
+    """Qidiruv natijasidagi inline tugma: statusni o'zgartirish oqimiga to'g'ridan-to'g'ri o'tadi."""
+    query = update.callback_query
+    query.answer()
+    account_id = query.data.split(":", 1)[1]
+    student, error = grpc_client.get_student_by_account_id(account_id)
+    if error or not student:
+        query.message.reply_text(f"❌ Xatolik: {error or 'O`quvchi topilmadi.'}")
+        return ConversationHandler.END
+    return _ask_new_status(query.message, context, student)
+
+def _ask_new_status(message, context, student):
     context.user_data['student_to_update'] = student
     status_text = "✅ Faol" if student.status else "❌ Nofaol"
-    message = f"O'quvchi topildi:\n\n👤 *F.I.Sh:* {student.full_name}\n🆔 *Hisob raqami:* `{student.account_id}`\n✳️ *Joriy holati:* {status_text}\n\nYangi holatni tanlang:"
+    text = f"O'quvchi topildi:\n\n👤 *F.I.Sh:* {student.full_name}\n🆔 *Hisob raqami:* `{student.account_id}`\n✳️ *Joriy holati:* {status_text}\n\nYangi holatni tanlang:"
     keyboard = [["✅ Faollashtirish", "❌ Nofaollashtirish"], ["⬅️ Orqaga"]]
     reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
-    update.message.reply_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+    message.reply_text(text, reply_markup=reply_markup, parse_mode='Markdown')
     return states.CONFIRM_STATUS_CHANGE
 
 def confirm_status_change(update: Update, context: CallbackContext):
@@ -541,8 +615,218 @@ def confirm_status_change(update: Update, context: CallbackContext):
     else:
         status_text = "✅ Faol" if updated_student.status else "❌ Nofaol"
         update.message.reply_text(f"✅ Muvaffaqiyatli! O'quvchi *{updated_student.full_name}* uchun yangi holat: *{status_text}*", parse_mode='Markdown')
+        student_index.upsert(updated_student)
+        _invalidate_dashboards()
     return cancel(update, context)
 
+# --- OMMAVIY AMALLAR ---
+BULK_ACTIONS = {
+    "🗑 Ommaviy o'chirish": bulk_ops.ACTION_DELETE,
+    "✅ Ommaviy faollashtirish": bulk_ops.ACTION_ACTIVATE,
+    "❌ Ommaviy nofaollashtirish": bulk_ops.ACTION_DEACTIVATE,
+}
+BULK_ACTION_NAMES = {
+    bulk_ops.ACTION_DELETE: "o'chirish",
+    bulk_ops.ACTION_ACTIVATE: "faollashtirish",
+    bulk_ops.ACTION_DEACTIVATE: "nofaollashtirish",
+}
+# Xabarda ko'rsatiladigan ro'yxatlar uzunligi; to'liq xatolar ro'yxati fayl bilan yuboriladi
+BULK_PREVIEW_LIMIT = 10
+BULK_FAILURES_LIMIT = 30
+
+def _preview(items, limit=BULK_PREVIEW_LIMIT):
+    shown = ", ".join(html.escape(str(item)) for item in items[:limit])
+    return shown + (f" va yana {len(items) - limit} ta" if len(items) > limit else "")
+
+@admin_required
+def bulk_start(update: Update, context: CallbackContext):
+    keyboard = [[label] for label in BULK_ACTIONS] + [["⬅️ Orqaga"]]
+    update.message.reply_text("Qaysi amalni bajaramiz?", reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True))
+    return states.BULK_ACTION
+
+def bulk_get_action(update: Update, context: CallbackContext):
+    if update.message.text == "⬅️ Orqaga": return cancel(update, context)
+    action = BULK_ACTIONS.get(update.message.text)
+    if not action:
+        update.message.reply_text("Iltimos, tugmalardan birini tanlang.")
+        return states.BULK_ACTION
+    context.user_data['bulk_action'] = action
+    update.message.reply_text(
+        "Hisob raqamlarini yuboring:\n"
+        "- ro'yxat sifatida (bo'sh joy, vergul yoki yangi qator bilan ajratilgan), yoki\n"
+        "- .txt, .csv yoki .xlsx fayl (fayldagi boshqa ustunlar e'tiborga olinmaydi).",
+        reply_markup=get_back_keyboard(),
+    )
+    return states.BULK_ACCOUNT_IDS
+
+def bulk_get_account_ids(update: Update, context: CallbackContext):
+    message = update.message
+    if message.text == "⬅️ Orqaga": return cancel(update, context)
+    action = context.user_data.get('bulk_action')
+
+    if message.document:
+        if message.document.file_size and message.document.file_size > bulk_ops.MAX_FILE_SIZE:
+            message.reply_text("Fayl juda katta. Kichikroq fayl yuboring:")
+            return states.BULK_ACCOUNT_IDS
+        content = bytes(message.document.get_file().download_as_bytearray())
+        text, error = bulk_ops.read_file_text(message.document.file_name, content)
+        if error:
+            message.reply_text(f"❌ {error}")
+            return states.BULK_ACCOUNT_IDS
+        account_ids, duplicates, invalid = bulk_ops.extract_account_ids(text, strict=False)
+    else:
+        account_ids, duplicates, invalid = bulk_ops.extract_account_ids(message.text)
+    if not account_ids:
+        message.reply_text("Hisob raqamlari topilmadi (masalan, YM19857). Qaytadan yuboring:")
+        return states.BULK_ACCOUNT_IDS
+
+    plan, error = bulk_ops.plan(account_ids, action)
+    if error:
+        message.reply_text(f"❌ O'quvchilarni tekshirishda xatolik: {error}")
+        return cancel(update, context)
+
+    students = plan['students']
+    lines = [
+        f"📋 <b>Amal:</b> {BULK_ACTION_NAMES[action]}",
+        f"Ro'yxatda: {len(account_ids)} ta hisob raqami",
+    ]
+    if duplicates:
+        lines.append(f"🔁 Takroriy (bir marta hisoblandi): {duplicates}")
+    if invalid:
+        lines.append(f"⚠️ Noto'g'ri format ({len(invalid)}): {_preview(invalid)}")
+    if plan['not_found']:
+        lines.append(f"❓ Topilmadi ({len(plan['not_found'])}): {_preview(plan['not_found'])}")
+    if plan['unchanged']:
+        lines.append(f"➖ Holati allaqachon shunday ({len(plan['unchanged'])}): {_preview(plan['unchanged'])}")
+    if not students:
+        lines.append("\nBajariladigan amal yo'q.")
+        message.reply_text("\n".join(lines), parse_mode='HTML')
+        context.user_data.clear()
+        start(update, context)
+        return ConversationHandler.END
+
+    lines.append(f"\n✳️ <b>Bajariladi: {len(students)} ta o'quvchi</b>")
+    lines.append(_preview([f"{s.full_name} ({s.account_id})" for s in students]))
+    context.user_data['bulk_students'] = students
+    keyboard = [["✅ Tasdiqlash"], ["⬅️ Orqaga"]]
+    message.reply_text("\n".join(lines), parse_mode='HTML', reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True))
+    return states.BULK_CONFIRM
+
+def bulk_confirm(update: Update, context: CallbackContext):
+    if update.message.text != "✅ Tasdiqlash": return cancel(update, context)
+    action = context.user_data.get('bulk_action')
+    students = context.user_data.get('bulk_students')
+    if not action or not students:
+        update.message.reply_text("Xatolik yuz berdi. Iltimos, boshidan boshlang.")
+        return cancel(update, context)
+
+    update.message.reply_text(f"⏳ {len(students)} ta o'quvchi uchun {BULK_ACTION_NAMES[action]} bajarilmoqda...", reply_markup=ReplyKeyboardRemove())
+    started_at = time.perf_counter()
+    succeeded, failures = bulk_ops.apply(students, action)
+    elapsed = time.perf_counter() - started_at
+
+    for student in succeeded:
+        if action == bulk_ops.ACTION_DELETE:
+            student_index.remove_account(student.account_id)
+        else:
+            updated = type(student)()
+            updated.CopyFrom(student)
+            updated.status = action == bulk_ops.ACTION_ACTIVATE
+            student_index.upsert(updated)
+    if succeeded:
+        _invalidate_dashboards()
+
+    lines = [f"✅ Bajarildi: {len(succeeded)} ta ({_format_duration(elapsed)})"]
+    if failures:
+        lines.append(f"❌ Xato: {len(failures)} ta")
+        failure_lines = [f"{account_id}: {error}" for account_id, error in failures.items()]
+        lines.extend(html.escape(line) for line in failure_lines[:BULK_FAILURES_LIMIT])
+        if len(failure_lines) > BULK_FAILURES_LIMIT:
+            lines.append("... to'liq ro'yxat faylda")
+    update.message.reply_text("\n".join(lines), parse_mode='HTML')
+    if len(failures) > BULK_FAILURES_LIMIT:
+        report = io.BytesIO("\n".join(failure_lines).encode("utf-8"))
+        update.message.reply_document(document=report, filename="xatolar.txt")
+
+    context.user_data.clear()
+    start(update, context)
+    return ConversationHandler.END
+
+@admin_required
+def search_students_command(update: Update, context: CallbackContext):
+    query = " ".join(context.args).strip()
+    if not query:
+        update.message.reply_text("Foydalanish: /search <ism, telefon, shartnoma yoki hisob raqami>")
+        return
+    index, error = search_service.get_index()
+    if error:
+        update.message.reply_text(f"❌ Qidiruv indeksini yuklab bo'lmadi: {error}")
+        return
+
+    started_at = time.perf_counter()
+    results = index.search(query, limit=settings.search_results_limit)
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    if not results:
+        update.message.reply_text(f"🔍 \"{query}\" bo'yicha hech narsa topilmadi.")
+        return
+
+    lines = [f"🔍 <b>Qidiruv natijalari:</b> {html.escape(query)}\n"]
+    buttons = []
+    for i, (student, _) in enumerate(results, start=1):
+        status_icon = "✅" if student.status else "❌"
+        lines.append(
+            f"{i}. {status_icon} <b>{html.escape(student.full_name)}</b> - <code>{html.escape(student.account_id)}</code>\n"
+            f"     {html.escape(student.group_name)}, 📞 {html.escape(student.phone or '-')}, 📄 {html.escape(student.contract_number or '-')}"
+        )
+        buttons.append([InlineKeyboardButton(f"🔄 {i}. {student.full_name[:40]}", callback_data=f"status:{student.account_id}")])
+    lines.append(f"\n<i>{len(index)} ta o'quvchi ichidan, {elapsed_ms:.1f} ms</i>")
+    update.message.reply_text("\n".join(lines), parse_mode='HTML', reply_markup=InlineKeyboardMarkup(buttons))
+
+@admin_required
+def statement_report_command(update: Update, context: CallbackContext):
+    period, error = statement_report.parse_period(context.args)
+    if error:
+        update.message.reply_text(error)
+        return
+    first, last = period
+    report, error = statement_report.build_report(first, last)
+    if error:
+        update.message.reply_text(f"❌ Ko'chirmani olishda xatolik: {error}")
+        return
+
+    # Filial nomlari merchant_id bo'yicha (nomlar keshlanmaydi - o'zgarsa darhol ko'rinadi)
+    branch_names = {}
+    branches, _ = grpc_client.list_branches()
+    for branch in branches or []:
+        branch_names.setdefault(branch.merchant_id, []).append(branch.name)
+
+    columns = report["columns"]
+    total_amount, total_count = columns.total()
+    money = statement_report.format_amount
+    lines = [
+        f"📊 <b>Hisobot:</b> {first:%d.%m.%Y} - {last:%d.%m.%Y}",
+        f"💰 <b>Jami:</b> {money(total_amount)} so'm ({total_count} ta to'lov)",
+    ]
+
+    def section(title, totals, label):
+        lines.append(f"\n{title}")
+        for key, (amount, count) in totals:
+            lines.append(f"- {html.escape(label(key))}: {money(amount)} so'm ({count} ta)")
+
+    if total_count:
+        by_branch = sorted(columns.by_branch().items(), key=lambda item: -item[1][0])
+        section("🏢 <b>Filiallar:</b>", by_branch, lambda m: ", ".join(branch_names.get(m, [])) or m or "Noma'lum")
+        if first.strftime("%Y-%m") != last.strftime("%Y-%m"):
+            section("🗓 <b>Oylar:</b>", sorted(columns.by_month().items()), lambda month: month)
+        if (last - first).days < 31:
+            section("📅 <b>Kunlar:</b>", sorted(columns.by_day().items()), lambda day: f"{day[8:10]}.{day[5:7]}")
+
+    lines.append(
+        f"\n<i>Keshdan {report['cached_days']} kun, serverdan {report['fetched_days']} kun "
+        f"({report['fetch_calls']} so'rov), {_format_duration(report['elapsed'])}</i>"
+    )
+    update.message.reply_text("\n".join(lines), parse_mode='HTML')
+
 @admin_required
 def manage_admins(update: Update, context: CallbackContext):
     admin_ids = db.get_all_admins()
@@ -557,6 +841,57 @@ def manage_admins(update: Update, context: CallbackContext):
     message += "\nAdminni o'chirish uchun: `/remove_admin <user_id>`"
     update.message.reply_text(message, parse_mode='Markdown')
 
+@admin_required
+def grpc_status_command(update: Update, context: CallbackContext):
+    state = grpc_client.get_breaker_state()
+    state_names = {"closed": "✅ Yopiq (normal)", "open": "⛔️ Ochiq (so'rovlar rad etilmoqda)", "half_open": "🟡 Sinov rejimi"}
+    message = "🔌 *payme-service ulanishi:*\n\n"
+    message += f"Holat: {state_names.get(state['state'], state['state'])}\n"
+    message += f"Ketma-ket xatolar: {state['failures']}/{state['failure_threshold']}\n"
+    message += f"Rad etilgan so'rovlar: {state['rejected']}\n"
+    if state['state'] == "open":
+        message += f"Qayta urinish: {int(state['retry_in'])} soniyadan keyin\n"
+    if state['last_error']:
+        message += f"Oxirgi xato: `{state['last_error']}`\n"
+    coalescing = grpc_client.get_coalescing_stats()
+    message += f"Birlashtirilgan so'rovlar: {coalescing['shared']} (yuborilgan {coalescing['executed']})\n"
+    update.message.reply_text(message, parse_mode='Markdown')
+
+@admin_required
+def diag_command(update: Update, context: CallbackContext):
+    try:
+        count = int(context.args[0]) if context.args else diag_probes.DEFAULT_PROBES
+    except ValueError:
+        update.message.reply_text("Noto'g'ri format. Ishlatish: /diag [o'lchovlar soni]")
+        return
+    count = max(1, min(count, diag_probes.MAX_PROBES))
+
+    progress = update.message.reply_text(f"⏳ Diagnostika: har bir bog'liqlik {count} martadan tekshirilmoqda...")
+    report = diag_probes.run_diagnostics(context.bot, count)
+
+    def ms(seconds):
+        return f"{seconds * 1000:.0f}"
+
+    lines = ["🩺 <b>Diagnostika</b> (min / median / max, ms)\n"]
+    for result in report["results"]:
+        icon = "✅" if not result["errors"] else ("⚠️" if result["ok"] else "❌")
+        line = f"{icon} <b>{html.escape(result['name'])}</b>\n"
+        if result["ok"]:
+            line += f"    <code>{ms(result['min'])} / {ms(result['median'])} / {ms(result['max'])}</code>"
+        if result["errors"]:
+            line += f"    xato {len(result['errors'])}/{result['count']}: {html.escape(result['errors'][-1][:200])}"
+        lines.append(line)
+
+    quota = report["sheets_quota"]
+    lines.append(
+        f"\n📊 <b>Sheets kvotasi:</b> oxirgi daqiqada {quota['used']}/{quota['limit']} so'rov, "
+        f"qolgan {quota['remaining']}"
+    )
+    if quota["throttled_last_hour"]:
+        lines.append(f"⚠️ Oxirgi soatda 429 javoblar: {quota['throttled_last_hour']}")
+    lines.append(f"\n<i>{_format_duration(report['elapsed'])}</i>")
+    progress.edit_text("\n".join(lines), parse_mode='HTML')
+
 @super_admin_required
 def add_admin_command(update: Update, context: CallbackContext):
     try:
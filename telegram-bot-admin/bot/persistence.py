@@ -0,0 +1,217 @@
+# telegram-bot-admin/bot/persistence.py
+"""
+ConversationHandler holatlari va adminlarning user_data'si uchun SQLite persistence.
+
+Bot qayta ishga tushsa, yarmida qolgan suhbat (filial/o'quvchi qo'shish, o'chirish,
+status, ommaviy amallar) o'sha qadamdan davom etadi.
+
+PicklePersistence har bir yangilanishda butun faylni qayta yozadi. Bu yerda esa:
+  - user_data har bir kaliti alohida qator (bot_user_data); yangilanishda faqat
+    pickle ko'rinishi oxirgi yozilganidan farq qilgan yoki o'chirilgan kalitlar,
+    suhbatlardan esa faqat holati o'zgarganlari navbatga qo'yiladi;
+  - navbat fon oqimida har persistence_flush_interval soniyada bitta tranzaksiya
+    bilan yoziladi, shuning uchun xabarni qayta ishlash diskni kutmaydi.
+
+Protobuf obyektlari (Branch, Student) SerializeToString ko'rinishida, repeated
+konteynerlar esa oddiy ro'yxat sifatida saqlanadi.
+"""
+import io
+import json
+import logging
+import pickle
+import threading
+import time
+from collections import defaultdict
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+from google.protobuf.message import Message
+from telegram.ext import BasePersistence
+
+from config import settings
+from database import db
+
+logger = logging.getLogger(__name__)
+
+# upb/python/cpp implementatsiyalaridagi repeated konteyner turlari
+_REPEATED_TYPES = (
+    type(descriptor_pb2.FileDescriptorSet().file),
+    type(descriptor_pb2.FileDescriptorProto().dependency),
+)
+
+
+def _load_message(full_name, data):
+    descriptor = descriptor_pool.Default().FindMessageTypeByName(full_name)
+    return message_factory.GetMessageClass(descriptor).FromString(data)
+
+
+class _Pickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        if isinstance(obj, Message):
+            return _load_message, (obj.DESCRIPTOR.full_name, obj.SerializeToString())
+        if isinstance(obj, _REPEATED_TYPES):
+            return list, (list(obj),)
+        return NotImplemented
+
+
+def _dumps(value):
+    buffer = io.BytesIO()
+    _Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+    return buffer.getvalue()
+
+
+class SQLitePersistence(BasePersistence):
+    """Faqat user_data va suhbatlar saqlanadi (chat_data/bot_data ishlatilmaydi)."""
+
+    def __init__(self, flush_interval=None):
+        super().__init__(store_user_data=True, store_chat_data=False, store_bot_data=False)
+        self.flush_interval = settings.persistence_flush_interval if flush_interval is None else flush_interval
+        self._lock = threading.Lock()
+        # Bir vaqtda faqat bitta yozuvchi (fon oqimi yoki flush)
+        self._write_lock = threading.Lock()
+        self._loaded = False
+        self._user_data = {}
+        # user_id -> {kalit: oxirgi yozilgan pickle baytlari}
+        self._persisted = {}
+        self._conversations = {}
+        self._pending_user_data = {}
+        self._pending_conversations = {}
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    # BasePersistence har bir get_*/update_* chaqiruvida ma'lumotni deepcopy qiladi
+    # (Bot obyektini almashtirish uchun). user_data'da Bot yo'q, nusxa esa har bir
+    # xabarda butun lug'atni ko'chirardi.
+    def insert_bot(self, obj):
+        return obj
+
+    def replace_bot(self, obj):
+        return obj
+
+    def _load(self):
+        """Bazadagi holatni (bir marta) o'qiydi. _lock ostida chaqiriladi."""
+        if self._loaded:
+            return
+        self._loaded = True
+        for user_id, key, value in db.load_bot_user_data():
+            try:
+                key = json.loads(key)
+                self._user_data.setdefault(user_id, {})[key] = pickle.loads(value)
+            except Exception as e:
+                logger.warning(f"user_data tiklanmadi (user {user_id}, {key}): {e}")
+                continue
+            self._persisted.setdefault(user_id, {})[key] = value
+        for name, conv_key, state in db.load_bot_conversations():
+            self._conversations.setdefault(name, {})[tuple(json.loads(conv_key))] = json.loads(state)
+        logger.info(
+            f"Bot holati tiklandi: {len(self._user_data)} ta admin user_data, "
+            f"{sum(len(c) for c in self._conversations.values())} ta ochiq suhbat"
+        )
+
+    def get_user_data(self):
+        with self._lock:
+            self._load()
+            return defaultdict(dict, {user_id: dict(data) for user_id, data in self._user_data.items()})
+
+    def get_chat_data(self):
+        return defaultdict(dict)
+
+    def get_bot_data(self):
+        return {}
+
+    def get_conversations(self, name):
+        with self._lock:
+            self._load()
+            return dict(self._conversations.get(name, {}))
+
+    def update_conversation(self, name, key, new_state):
+        # Holat xotiraga yozilishidan oldin kodlanadi: JSON'ga o'tmaydigan holat
+        # (masalan, range) xotira va baza o'rtasida farq qoldirmasin
+        encoded_key = json.dumps(list(key))
+        encoded_state = None if new_state is None else json.dumps(new_state)
+        with self._lock:
+            conversations = self._conversations.setdefault(name, {})
+            if conversations.get(key) == new_state:
+                return
+            if new_state is None:
+                conversations.pop(key, None)
+            else:
+                conversations[key] = new_state
+            self._pending_conversations[(name, encoded_key)] = encoded_state
+            self._schedule()
+
+    def update_user_data(self, user_id, data):
+        # Dispetcher buni har bir yangilanishda chaqiradi: kalitlar shu yerda (lock'siz)
+        # pickle qilinadi va oxirgi yozilgan ko'rinish bilan solishtiriladi
+        encoded = {}
+        for key, value in data.items():
+            try:
+                encoded[key] = _dumps(value)
+            except Exception as e:
+                logger.warning("user_data[%r] saqlanmaydi (user %s): %s", key, user_id, e)
+        with self._lock:
+            persisted = self._persisted.setdefault(user_id, {})
+            changed = False
+            for key in [key for key in persisted if key not in data]:
+                del persisted[key]
+                self._pending_user_data[(user_id, json.dumps(key))] = None
+                changed = True
+            for key, value in encoded.items():
+                if persisted.get(key) != value:
+                    persisted[key] = value
+                    self._pending_user_data[(user_id, json.dumps(key))] = value
+                    changed = True
+            if changed:
+                self._schedule()
+
+    def update_chat_data(self, chat_id, data):
+        pass
+
+    def update_bot_data(self, data):
+        pass
+
+    def _schedule(self):
+        """Yozuvchi oqimni uyg'otadi (kerak bo'lsa ishga tushiradi). _lock ostida chaqiriladi."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_forever, name="bot-persistence", daemon=True)
+            self._thread.start()
+        self._wakeup.set()
+
+    def _write_pending(self):
+        """Navbatdagi o'zgarishlarni bitta tranzaksiyada yozadi. Qaytaradi: yozilgan o'zgarishlar soni."""
+        with self._write_lock:
+            with self._lock:
+                user_data, self._pending_user_data = self._pending_user_data, {}
+                conversations, self._pending_conversations = self._pending_conversations, {}
+            if not user_data and not conversations:
+                return 0
+            try:
+                db.save_bot_persistence(user_data, conversations)
+            except Exception:
+                # Keyingi urinishda yoziladi; shu orada kelgan yangiroq qiymatlar ustun
+                with self._lock:
+                    user_data.update(self._pending_user_data)
+                    conversations.update(self._pending_conversations)
+                    self._pending_user_data, self._pending_conversations = user_data, conversations
+                raise
+            return len(user_data) + len(conversations)
+
+    def _write_forever(self):
+        while True:
+            self._wakeup.wait()
+            # Partiya: interval davomida kelgan o'zgarishlar bitta tranzaksiyaga tushadi
+            time.sleep(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                written = self._write_pending()
+                if written:
+                    logger.debug("Bot holati saqlandi: %d ta o'zgarish", written)
+            except Exception as e:
+                logger.error(f"Bot holatini saqlab bo'lmadi: {e}")
+                self._wakeup.set()
+
+    def flush(self):
+        """To'xtashda (Updater signal olganda) navbatdagini darhol yozadi."""
+        try:
+            self._write_pending()
+        except Exception as e:
+            logger.error(f"Bot holatini saqlab bo'lmadi: {e}")
@@ -5,10 +5,12 @@
     STUDENT_GROUP_NAME, STUDENT_PHONE, STUDENT_DISCOUNT
 ) = range(6, 12)
 
-(DELETE_STUDENT_ACCOUNT_ID) = range(12, 13)
+(DELETE_STUDENT_ACCOUNT_ID,) = range(12, 13)
 
 (DELETE_BRANCH_SELECT, DELETE_BRANCH_CONFIRM) = range(13, 15)
 
-PROCESSING_EXCEL_FILE = range(15, 16)
+(PROCESSING_EXCEL_FILE,) = range(15, 16)
 
-(CHANGE_STATUS_ACCOUNT_ID, CONFIRM_STATUS_CHANGE) = range(16, 18)
\ No newline at end of file
+(CHANGE_STATUS_ACCOUNT_ID, CONFIRM_STATUS_CHANGE) = range(16, 18)
+
+(BULK_ACTION, BULK_ACCOUNT_IDS, BULK_CONFIRM) = range(18, 21)
\ No newline at end of file
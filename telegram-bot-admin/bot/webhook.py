@@ -0,0 +1,113 @@
+# telegram-bot-admin/bot/webhook.py
+
+import hmac
+import logging
+import tornado.netutil
+import tornado.web
+from tornado.ioloop import IOLoop
+from telegram.ext import Updater
+from telegram.ext.utils.webhookhandler import WebhookAppClass, WebhookHandler, WebhookServer
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class SecretTokenWebhookHandler(WebhookHandler):
+    """Telegram yuborgan `X-Telegram-Bot-Api-Secret-Token` sarlavhasini tekshiradi."""
+
+    def initialize(self, bot, update_queue, secret_token=None) -> None:
+        super().initialize(bot, update_queue)
+        self.secret_token = secret_token
+
+    def _validate_post(self) -> None:
+        super()._validate_post()
+        if self.secret_token:
+            received = self.request.headers.get(SECRET_TOKEN_HEADER, "")
+            if not hmac.compare_digest(received.encode(), self.secret_token.encode()):
+                logger.warning(f"Webhook so'rovi noto'g'ri secret token bilan rad etildi ({self.request.remote_ip})")
+                raise tornado.web.HTTPError(403)
+
+
+class SecretTokenWebhookApp(WebhookAppClass):
+    def __init__(self, webhook_path, bot, update_queue, secret_token=None):
+        self.shared_objects = {"bot": bot, "update_queue": update_queue, "secret_token": secret_token}
+        handlers = [(rf"{webhook_path}/?", SecretTokenWebhookHandler, self.shared_objects)]
+        tornado.web.Application.__init__(self, handlers)
+
+
+class PreboundWebhookServer(WebhookServer):
+    """Soketlari oldindan ochilgan WebhookServer.
+
+    PTB serveri portni updater oqimida band qiladi: port band bo'lsa OSError shu
+    oqimda qoladi va start_webhook() tayyorlik signalini abadiy kutadi.
+    """
+
+    __slots__ = ('sockets',)
+
+    def __init__(self, sockets, webhook_app):
+        listen, port = sockets[0].getsockname()[:2]
+        super().__init__(listen, port, webhook_app, None)
+        self.sockets = sockets
+
+    def serve_forever(self, ready=None):
+        with self.server_lock:
+            IOLoop().make_current()
+            self.is_running = True
+            self.logger.debug('Webhook Server started.')
+            self.loop = IOLoop.current()
+            self.http_server.add_sockets(self.sockets)
+
+            if ready is not None:
+                ready.set()
+
+            self.loop.start()
+            self.logger.debug('Webhook Server stopped.')
+            self.is_running = False
+
+
+class WebhookUpdater(Updater):
+    """Secret token tekshiruvli webhook bilan ishlaydigan Updater.
+
+    PTB 13 webhook serveri secret tokenni tekshirmaydi, shuning uchun Tornado
+    ilovasi almashtiriladi. Webhook Telegram'da `set_secret_webhook()` orqali
+    oldindan o'rnatiladi, server esa faqat lokal portni tinglaydi (TLS reverse
+    proxy tomonida).
+
+    Port start_webhook() chaqirgan oqimda band qilinadi: band bo'lsa OSError
+    chaqiruvchiga ko'tariladi va u polling rejimiga o'tishi mumkin.
+    """
+
+    def __init__(self, *args, secret_token=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.secret_token = secret_token
+        self._sockets = None
+
+    def start_webhook(self, listen='127.0.0.1', port=80, *args, **kwargs):
+        if self.running:
+            return super().start_webhook(listen, port, *args, **kwargs)
+        self._sockets = tornado.netutil.bind_sockets(port, address=listen)
+        try:
+            return super().start_webhook(listen, port, *args, **kwargs)
+        except BaseException:
+            for sock in self._sockets or ():
+                sock.close()
+            self._sockets = None
+            raise
+
+    def set_secret_webhook(self, webhook_url, max_connections=40):
+        return self.bot.set_webhook(
+            url=webhook_url,
+            max_connections=max_connections,
+            secret_token=self.secret_token or None,
+        )
+
+    def _start_webhook(self, listen, port, url_path, cert, key, bootstrap_retries,
+                       drop_pending_updates, webhook_url, allowed_updates,
+                       ready=None, ip_address=None, max_connections=40):
+        if not url_path.startswith('/'):
+            url_path = f'/{url_path}'
+        app = SecretTokenWebhookApp(url_path, self.bot, self.update_queue, self.secret_token)
+        sockets, self._sockets = self._sockets, None
+        self.httpd = PreboundWebhookServer(sockets, app)
+        self.httpd.serve_forever(ready=ready)
@@ -0,0 +1,163 @@
+# telegram-bot-admin/bulk/operations.py
+"""
+Ko'p o'quvchini hisob raqamlari ro'yxati bo'yicha o'chirish yoki holatini
+o'zgartirish.
+
+Ro'yxat bitta ListStudents so'rovi bilan tekshiriladi (topilmagan, takroriy
+va holati allaqachon mos kelgan raqamlar ajratiladi), keyin amal
+DeleteStudentsBatch / UpdateStudentsBatch orqali BATCH_SIZE lik paketlarda
+bajariladi. payme-service paketni bitta tranzaksiyada bajaradi, shuning uchun
+paket xato bersa, u ikkiga bo'linib qayta yuboriladi - oxir-oqibat faqat
+xatoga sabab bo'lgan raqamlar ajralib qoladi.
+"""
+import io
+import logging
+import re
+
+from grpc_client import client as grpc_client
+
+logger = logging.getLogger(__name__)
+
+ACTION_DELETE = "delete"
+ACTION_ACTIVATE = "activate"
+ACTION_DEACTIVATE = "deactivate"
+
+BATCH_SIZE = 200
+# Yuklanadigan fayl hajmi chegarasi (bayt)
+MAX_FILE_SIZE = 2 * 1024 * 1024
+
+_ACCOUNT_ID_RE = re.compile(r"^YM\d+$", re.IGNORECASE)
+_SEPARATORS_RE = re.compile(r"[\s,;]+")
+
+
+def extract_account_ids(text, strict=True):
+    """
+    Matndan hisob raqamlarini ajratadi (tartib saqlanadi).
+    strict=True (qo'lda kiritilgan ro'yxat) bo'lsa, mos kelmagan qismlar
+    noto'g'ri deb qaytariladi; fayllarda esa boshqa ustunlar e'tiborsiz qoldiriladi.
+    Qaytaradi: (account_ids, duplicates, invalid)
+    """
+    account_ids, seen, duplicates, invalid = [], set(), 0, []
+    for token in _SEPARATORS_RE.split(text or ""):
+        token = token.strip().strip("'\"")
+        if not token:
+            continue
+        if not _ACCOUNT_ID_RE.match(token):
+            if strict:
+                invalid.append(token)
+            continue
+        account_id = token.upper()
+        if account_id in seen:
+            duplicates += 1
+            continue
+        seen.add(account_id)
+        account_ids.append(account_id)
+    return account_ids, duplicates, invalid
+
+
+def read_file_text(file_name, content: bytes):
+    """
+    .txt/.csv va .xlsx fayllar matnini qaytaradi.
+    Qaytaradi: (text, error)
+    """
+    name = (file_name or "").lower()
+    if len(content) > MAX_FILE_SIZE:
+        return None, f"Fayl juda katta (ko'pi bilan {MAX_FILE_SIZE // 1024 // 1024} MB)."
+    if name.endswith(".xlsx"):
+        try:
+            # openpyxl og'ir modul - faqat Excel fayl kelganda yuklanadi
+            import openpyxl
+
+            workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+            cells = []
+            for sheet in workbook.worksheets:
+                for row in sheet.iter_rows(values_only=True):
+                    cells.extend(str(value) for value in row if value is not None)
+            workbook.close()
+            return "\n".join(cells), None
+        except Exception as e:
+            logger.error(f"Excel faylni o'qishda xatolik: {e}")
+            return None, "Excel faylni o'qib bo'lmadi."
+    if name.endswith((".txt", ".csv")) or not name:
+        try:
+            return content.decode("utf-8-sig"), None
+        except UnicodeDecodeError:
+            return content.decode("cp1251", errors="replace"), None
+    return None, "Faqat .txt, .csv yoki .xlsx fayl yuboring."
+
+
+def plan(account_ids, action):
+    """
+    Ro'yxatni bitta ListStudents so'rovi bilan tekshiradi.
+    Qaytaradi: ({"students": [...], "not_found": [...], "unchanged": [...]}, error)
+    """
+    students, error = grpc_client.list_students()
+    if error:
+        return None, error
+    by_account = {s.account_id.upper(): s for s in students}
+
+    result = {"students": [], "not_found": [], "unchanged": []}
+    target_status = {ACTION_ACTIVATE: True, ACTION_DEACTIVATE: False}.get(action)
+    for account_id in account_ids:
+        student = by_account.get(account_id)
+        if student is None:
+            result["not_found"].append(account_id)
+        elif target_status is not None and student.status == target_status:
+            result["unchanged"].append(account_id)
+        else:
+            result["students"].append(student)
+    return result, None
+
+
+def _student_dict(student, status):
+    data = {field.name: getattr(student, field.name) for field in student.DESCRIPTOR.fields}
+    data["status"] = status
+    return data
+
+
+def _friendly_error(error):
+    if "foreign key" in (error or ""):
+        return "to'lovlar tarixi bor - o'chirib bo'lmaydi"
+    return error
+
+
+def apply(students, action):
+    """
+    Amalni paketlarda bajaradi.
+    Qaytaradi: (succeeded, failures) - muvaffaqiyatli Student'lar va {account_id: xato}.
+    """
+    if action == ACTION_DELETE:
+        def send(batch):
+            _, error = grpc_client.delete_students_batch([s.account_id for s in batch])
+            return error
+    else:
+        status = action == ACTION_ACTIVATE
+
+        def send(batch):
+            _, error = grpc_client.update_students_batch([_student_dict(s, status) for s in batch])
+            return error
+
+    succeeded, failures, rpc_calls = [], {}, 0
+    pending = [students[i:i + BATCH_SIZE] for i in range(0, len(students), BATCH_SIZE)]
+    pending.reverse()
+    while pending:
+        batch = pending.pop()
+        error = send(batch)
+        rpc_calls += 1
+        if not error:
+            succeeded.extend(batch)
+            continue
+        if grpc_client.get_breaker_state()["state"] == "open":
+            # Server ishlamayapti - qolganlarini bo'lib yuborishdan foyda yo'q
+            for item in [batch] + pending:
+                for s in item:
+                    failures[s.account_id] = error
+            break
+        if len(batch) == 1:
+            failures[batch[0].account_id] = _friendly_error(error)
+        else:
+            middle = len(batch) // 2
+            pending.extend([batch[middle:], batch[:middle]])
+
+    logger.info(f"Ommaviy amal ({action}): {len(succeeded)} ta bajarildi, {len(failures)} ta xato, {rpc_calls} ta RPC")
+    return succeeded, failures
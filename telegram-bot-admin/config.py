@@ -1,5 +1,6 @@
+from pydantic import BaseModel, field_validator
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 SHEET_COLUMNS_CONFIG = {
     "branch_name": 1,       # 'B' ustuni - Maktab (filial nomi)
@@ -17,23 +18,142 @@ SHEET_COLUMNS_CONFIG = {
 # Ma'lumotlar boshlanadigan qator raqami
 START_ROW = 3
 
+class SpreadsheetConfig(BaseModel):
+    """Sinxronlanadigan bitta jadval (GOOGLE_SPREADSHEETS ro'yxatining elementi)."""
+    id: str
+    name: str = ""
+    worksheets: List[str]
+    # SHEET_COLUMNS_CONFIG'dan farq qiladigan ustunlar (0 dan boshlangan indeks)
+    columns: Dict[str, int] = {}
+
+    @field_validator("columns")
+    @classmethod
+    def _known_columns(cls, columns):
+        unknown = set(columns) - set(SHEET_COLUMNS_CONFIG)
+        if unknown:
+            raise ValueError(f"noma'lum ustunlar: {', '.join(sorted(unknown))}")
+        return columns
+
+    @property
+    def title(self) -> str:
+        return self.name or self.id
+
+    @property
+    def column_map(self) -> Dict[str, int]:
+        return {**SHEET_COLUMNS_CONFIG, **self.columns}
+
 class Settings(BaseSettings):
     telegram_bot_token: str
     super_admin_id: int
     grpc_go_server_address: str
     grpc_bot_server_port: int
+
+    # ManagementService chaqiruvlari uchun standart deadline va zanjir uzgich
+    grpc_default_timeout: float = 15.0
+    grpc_breaker_failure_threshold: int = 5
+    grpc_breaker_reset_timeout: float = 30.0
     
     telegram_payment_group_id: str # YANGI
 
+    # Yangilanishlarni olish usuli: "polling" yoki "webhook".
+    # Webhook rejimida bot lokal portni tinglaydi, TLS esa reverse proxy'da.
+    telegram_update_mode: str = "polling"
+    telegram_webhook_url: str = ""          # Tashqi URL, masalan https://bot.example.uz/telegram
+    telegram_webhook_listen: str = "0.0.0.0"
+    telegram_webhook_port: int = 8080
+    telegram_webhook_path: str = "telegram"
+    telegram_webhook_secret: str = ""
+    telegram_workers: int = 4
+    telegram_api_base_url: str = ""         # Bo'sh bo'lsa - https://api.telegram.org/bot
+    # Suhbat holatlari va user_data (bot/persistence.py) SQLite'ga shuncha soniyalik
+    # partiyalar bilan yoziladi; har bir xabar faqat xotiradagi navbatga tushadi
+    persistence_flush_interval: float = 0.5
+
+    # To'lov xabarnomalari serveri: true - grpc.aio (runtime/aio.py tsiklida,
+    # xabarlar httpx orqali yuboriladi), false - 10 oqimli grpc.server.
+    # telegram_send_connections - Bot API'ga bir vaqtdagi ulanishlar chegarasi.
+    grpc_server_async: bool = True
+    telegram_send_connections: int = 20
+
+    # "single" - hammasi bitta jarayonda; "multi" - bot, gRPC xabarnoma serveri va
+    # sync ishchisi supervisor nazoratida alohida jarayonlarda ishlaydi
+    process_mode: str = "single"
+    # Bot jarayonini yangi xabar haqida uyg'otish uchun loopback UDP porti
+    outbox_wakeup_port: int = 50052
+
+    # Loglar: "json" yoki "text" ko'rinishida stderr'ga, navbat orqali (logging_setup.py).
+    # Har bir to'lov uchun INFO log o'rniga log_summary_interval soniyada bitta
+    # namuna va yig'indi yoziladi; batafsil loglar LOG_LEVEL=DEBUG bilan.
+    log_format: str = "json"
+    log_level: str = "INFO"
+    log_queue_size: int = 10000
+    log_summary_interval: int = 60
+
     google_spreadsheet_id: str
     google_worksheet_names: str
     google_creds_file: str
+    # Bir nechta jadval (har bir maktabning o'z jadvali), JSON ro'yxat:
+    # [{"id": "...", "name": "1-maktab", "worksheets": ["Filial A"], "columns": {"uuid": 17}}]
+    # Bo'sh bo'lsa - faqat google_spreadsheet_id (google_worksheet_names varaqlari).
+    # Jadvallar sync_spreadsheet_workers tagacha parallel sinxronlanadi; baza ro'yxati
+    # bir marta olinadi, Sheets so'rovlari esa umumiy sheets_quota_per_minute ichida.
+    google_spreadsheets: List[SpreadsheetConfig] = []
+    sync_spreadsheet_workers: int = 3
+
+    # Avtomatik sinxronizatsiya intervallari (soniya). O'zgarish bo'lsa interval
+    # sync_min_interval gacha qisqaradi, bo'lmasa sync_max_interval gacha uzayadi.
+    sync_interval: int = 3600
+    sync_min_interval: int = 900
+    sync_max_interval: int = 14400
+    # O'zgarmagan varaqlar ham shu muddatda kamida bir marta to'liq sinxronlanadi
+    sync_full_interval: int = 86400
+    # Qatorlarni SyncStudents oqimi orqali yuborish; o'chirilsa yoki server
+    # oqimni qo'llab-quvvatlamasa, eski batch RPC'lar ishlatiladi
+    sync_streaming: bool = True
+    # Varaqlar shuncha qatorli oynalar bilan o'qiladi va har bir oyna o'qish -> RPC ->
+    # UUID yozish konveyeridan o'tadi (0 - eski usul: barcha varaqlar bitta so'rovda).
+    # sync_pipeline_depth - bosqichlar orasida navbatda turadigan oynalar soni.
+    sync_window_rows: int = 2000
+    sync_pipeline_depth: int = 2
+
+    # Google Sheets API: foydalanuvchi (service account) uchun daqiqalik so'rovlar kvotasi
+    sheets_quota_per_minute: int = 60
+
+    # To'lovlar jurnali varag'i (google_spreadsheet_id ichida); bo'sh bo'lsa o'chirilgan.
+    # Xabarnomalar SQLite buferida yig'iladi va ledger_batch_size ga yetganda yoki eng
+    # eskisi ledger_flush_interval soniyadan oshganda bitta append_rows bilan yoziladi.
+    ledger_worksheet_name: str = ""
+    ledger_flush_interval: int = 60
+    ledger_batch_size: int = 200
+    # Yozilgan qatorlar kalitlari takroriy xabarnomalarni aniqlash uchun shuncha kun saqlanadi
+    ledger_retention_days: int = 7
+
+    # "🏢 Filiallar" / "🎓 O'quvchilar" matni keshi va bitta adminning takroriy bosishlari oralig'i
+    dashboard_cache_ttl: float = 15.0
+    dashboard_throttle_seconds: float = 3.0
+
+    # O'quvchilar qidiruv indeksi shu muddatdan (soniya) eski bo'lsa yangilanadi
+    search_index_ttl: int = 600
+    search_results_limit: int = 10
+
+    # /hisobot: kunlar shu mintaqa vaqti bo'yicha ajratiladi (Toshkent, UTC+5).
+    # Kun tugaganidan keyin shuncha soat o'tsa, u yopilgan hisoblanadi va keshlanadi
+    # (Payme kutilayotgan tranzaksiyalarni 12 soatgacha ushlab turadi).
+    report_utc_offset_hours: int = 5
+    report_day_close_hours: int = 24
 
     @property
     def google_worksheet_name_list(self) -> List[str]:
         """Varaq nomlari satrini toza ro'yxatga o'giradi."""
         return [name.strip() for name in self.google_worksheet_names.split(',') if name.strip()]
 
+    @property
+    def spreadsheet_list(self) -> List[SpreadsheetConfig]:
+        """Sinxronlanadigan jadvallar (google_spreadsheets bo'sh bo'lsa - asosiy jadval)."""
+        if self.google_spreadsheets:
+            return self.google_spreadsheets
+        return [SpreadsheetConfig(id=self.google_spreadsheet_id, worksheets=self.google_worksheet_name_list)]
+
     class Config:
         env_file = '.env'
         env_file_encoding = 'utf-8'
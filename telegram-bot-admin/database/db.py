@@ -1,5 +1,7 @@
+import json
 import sqlite3
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 DB_NAME = '/app/database_files/admins.db'
@@ -8,11 +10,141 @@ def init_db():
     try:
         conn = sqlite3.connect(DB_NAME)
         cursor = conn.cursor()
+        # WAL: ko'p jarayonli rejimda o'qishlar yozuvlar tugashini kutmaydi
+        cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS admins (
                 user_id INTEGER PRIMARY KEY
             )
         ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                trigger TEXT NOT NULL,
+                forced INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                duration REAL NOT NULL,
+                sheets_changed INTEGER NOT NULL DEFAULT 0,
+                sheets_skipped INTEGER NOT NULL DEFAULT 0,
+                rows_read INTEGER NOT NULL DEFAULT 0,
+                created INTEGER NOT NULL DEFAULT 0,
+                updated INTEGER NOT NULL DEFAULT 0,
+                cells_written INTEGER NOT NULL DEFAULT 0,
+                phases TEXT NOT NULL,
+                errors TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sheet_sync_state (
+                sheet_name TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                synced_at REAL NOT NULL
+            )
+        ''')
+        # Ko'p jarayonli rejimda Telegram'ga chiquvchi xabarlar navbati. Yuborilmagan
+        # xabar o'chirilmaydi: attempts oshadi va next_attempt_at'gacha kutadi
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                parse_mode TEXT,
+                message_thread_id INTEGER,
+                enqueued_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT
+            )
+        ''')
+        # Eski bazalarda outbox jadvali qayta urinish ustunlarisiz yaratilgan
+        outbox_columns = {row[1] for row in cursor.execute("PRAGMA table_info(outbox)")}
+        for column, definition in [
+            ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+            ("next_attempt_at", "REAL NOT NULL DEFAULT 0"),
+            ("last_error", "TEXT"),
+        ]:
+            if column not in outbox_columns:
+                cursor.execute(f"ALTER TABLE outbox ADD COLUMN {column} {definition}")
+        # Barcha urinishlardan keyin ham yuborilmagan xabarlar (qo'lda ko'rib chiqish uchun)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox_dead (
+                id INTEGER PRIMARY KEY,
+                chat_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                parse_mode TEXT,
+                message_thread_id INTEGER,
+                enqueued_at REAL NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                failed_at REAL NOT NULL
+            )
+        ''')
+        # /hisobot keshi: to'liq yopilgan kunlar va ularning filial (merchant) bo'yicha yig'indilari
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS statement_days (
+                day TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS statement_totals (
+                day TEXT NOT NULL,
+                merchant_id TEXT NOT NULL,
+                amount INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (day, merchant_id)
+            )
+        ''')
+        # Google Sheets API so'rovlari (barcha jarayonlardan) - daqiqalik kvotani kuzatish uchun
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sheets_api_calls (
+                at REAL NOT NULL,
+                status INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sheets_api_calls_at ON sheets_api_calls (at)")
+        # Telegram bot holati (bot/persistence.py): adminlarning user_data kalitlari
+        # (pickle) va ConversationHandler holatlari - qayta ishga tushishda tiklanadi
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bot_user_data (
+                user_id INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                PRIMARY KEY (user_id, key)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bot_conversations (
+                name TEXT NOT NULL,
+                conv_key TEXT NOT NULL,
+                state TEXT NOT NULL,
+                PRIMARY KEY (name, conv_key)
+            )
+        ''')
+        # To'lovlar jurnali (Sheets'dagi ledger varag'i) uchun yozilmagan qatorlar buferi.
+        # payment_key takroriy xabarnomani qayta qo'shishga yo'l qo'ymaydi; yozilgan
+        # qatorlar (flushed_at) shu maqsadda bir muddat saqlanadi. in_doubt - append
+        # natijasi noma'lum (timeout, 5xx): keyingi urinishdan oldin varaq tekshiriladi.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ledger_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payment_key TEXT NOT NULL UNIQUE,
+                row_json TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                in_doubt INTEGER NOT NULL DEFAULT 0,
+                flushed_at REAL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ledger_queue_pending ON ledger_queue (flushed_at, id)")
+        # /diag yozish tekshiruvi uchun bitta qatorli jadval
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS diag_probe (
+                id INTEGER PRIMARY KEY,
+                at REAL NOT NULL
+            )
+        ''')
         conn.commit()
         conn.close()
         logger.info("Ma'lumotlar bazasi muvaffaqiyatli ishga tushirildi.")
@@ -55,4 +187,388 @@ def get_all_admins() -> list[int]:
 
 
 def is_admin(user_id: int) -> bool:
-    return user_id in get_all_admins()
\ No newline at end of file
+    return user_id in get_all_admins()
+
+
+def get_sheet_fingerprints() -> dict:
+    """Oxirgi sinxronizatsiyadagi varaq xeshlari: {varaq_nomi: fingerprint}."""
+    try:
+        conn = sqlite3.connect(DB_NAME)
+        cursor = conn.cursor()
+        cursor.execute("SELECT sheet_name, fingerprint FROM sheet_sync_state")
+        fingerprints = dict(cursor.fetchall())
+        conn.close()
+        return fingerprints
+    except Exception as e:
+        logger.error(f"Varaq xeshlarini olishda xatolik: {e}")
+        return {}
+
+
+def set_sheet_fingerprint(sheet_name: str, fingerprint: str):
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO sheet_sync_state (sheet_name, fingerprint, synced_at) VALUES (?, ?, ?)",
+            (sheet_name, fingerprint, time.time()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+_SYNC_RUN_COLUMNS = [
+    "started_at", "finished_at", "trigger", "forced", "status", "duration",
+    "sheets_changed", "sheets_skipped", "rows_read", "created", "updated", "cells_written",
+]
+
+
+def record_sync_run(run: dict):
+    """Sinxronizatsiya natijasini (sync.metrics.SyncRun.to_dict()) saqlaydi."""
+    values = [run[c] for c in _SYNC_RUN_COLUMNS] + [json.dumps(run["phases"]), json.dumps(run["errors"], ensure_ascii=False)]
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        conn.execute(
+            f"INSERT INTO sync_runs ({', '.join(_SYNC_RUN_COLUMNS)}, phases, errors) "
+            f"VALUES ({', '.join('?' * (len(_SYNC_RUN_COLUMNS) + 2))})",
+            values,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_recent_sync_runs(limit: int = 10) -> list[dict]:
+    """Oxirgi sinxronizatsiyalar (eng yangisi birinchi)."""
+    try:
+        conn = sqlite3.connect(DB_NAME)
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {', '.join(_SYNC_RUN_COLUMNS)}, phases, errors FROM sync_runs ORDER BY id DESC LIMIT ?",
+            (limit,),
+        )
+        runs = []
+        for row in cursor.fetchall():
+            run = dict(zip(_SYNC_RUN_COLUMNS, row[:-2]))
+            run["phases"] = json.loads(row[-2])
+            run["errors"] = json.loads(row[-1])
+            runs.append(run)
+        conn.close()
+        return runs
+    except Exception as e:
+        logger.error(f"Sinxronizatsiya tarixini olishda xatolik: {e}")
+        return []
+
+
+def get_last_sync_finished_at() -> float:
+    """Oxirgi muvaffaqiyatsiz bo'lmagan sinxronizatsiya tugagan vaqt (bo'lmasa 0)."""
+    try:
+        conn = sqlite3.connect(DB_NAME)
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(finished_at) FROM sync_runs WHERE status != 'failed'")
+        finished_at = cursor.fetchone()[0]
+        conn.close()
+        return finished_at or 0.0
+    except Exception as e:
+        logger.error(f"Oxirgi sinxronizatsiya vaqtini olishda xatolik: {e}")
+        return 0.0
+
+
+def enqueue_outbox_message(chat_id, text: str, parse_mode=None, message_thread_id=None):
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        conn.execute(
+            "INSERT INTO outbox (chat_id, text, parse_mode, message_thread_id, enqueued_at) VALUES (?, ?, ?, ?, ?)",
+            (str(chat_id), text, parse_mode, message_thread_id, time.time()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def fetch_outbox_messages(limit: int = 50) -> list[dict]:
+    """Yuborish vaqti kelgan navbatdagi xabarlar (eng eskisi birinchi)."""
+    try:
+        conn = sqlite3.connect(DB_NAME)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM outbox WHERE next_attempt_at <= ? ORDER BY id LIMIT ?",
+            (time.time(), limit),
+        )
+        messages = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return messages
+    except Exception as e:
+        logger.error(f"Xabarlar navbatini o'qishda xatolik: {e}")
+        return []
+
+
+def delete_outbox_message(message_id: int):
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        conn.execute("DELETE FROM outbox WHERE id = ?", (message_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def defer_outbox_message(message_id: int, error: str, next_attempt_at: float):
+    """Yuborilmagan xabar navbatda qoladi: urinishlar soni oshadi, keyingi urinish next_attempt_at'da."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        conn.execute(
+            "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+            (next_attempt_at, error, message_id),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def bury_outbox_message(message_id: int, error: str):
+    """Xabarni navbatdan outbox_dead jadvaliga (bitta tranzaksiyada) ko'chiradi."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        with conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO outbox_dead
+                    (id, chat_id, text, parse_mode, message_thread_id, enqueued_at, attempts, last_error, failed_at)
+                SELECT id, chat_id, text, parse_mode, message_thread_id, enqueued_at, attempts + 1, ?, ?
+                FROM outbox WHERE id = ?
+                """,
+                (error, time.time(), message_id),
+            )
+            conn.execute("DELETE FROM outbox WHERE id = ?", (message_id,))
+    finally:
+        conn.close()
+
+
+def load_bot_user_data() -> list:
+    """Saqlangan user_data: [(user_id, key, value_bytes)]."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        return conn.execute("SELECT user_id, key, value FROM bot_user_data").fetchall()
+    finally:
+        conn.close()
+
+
+def load_bot_conversations() -> list:
+    """Saqlangan suhbat holatlari: [(name, conv_key, state)]."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        return conn.execute("SELECT name, conv_key, state FROM bot_conversations").fetchall()
+    finally:
+        conn.close()
+
+
+def save_bot_persistence(user_data_changes: dict, conversation_changes: dict):
+    """
+    Bot holatidagi o'zgarishlarni bitta tranzaksiyada yozadi.
+    user_data_changes: {(user_id, key): value_bytes yoki None (o'chirish)}
+    conversation_changes: {(name, conv_key): state yoki None (suhbat tugagan)}
+    """
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO bot_user_data (user_id, key, value) VALUES (?, ?, ?)",
+                [(user_id, key, value) for (user_id, key), value in user_data_changes.items() if value is not None],
+            )
+            conn.executemany(
+                "DELETE FROM bot_user_data WHERE user_id = ? AND key = ?",
+                [(user_id, key) for (user_id, key), value in user_data_changes.items() if value is None],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO bot_conversations (name, conv_key, state) VALUES (?, ?, ?)",
+                [(name, key, state) for (name, key), state in conversation_changes.items() if state is not None],
+            )
+            conn.executemany(
+                "DELETE FROM bot_conversations WHERE name = ? AND conv_key = ?",
+                [(name, key) for (name, key), state in conversation_changes.items() if state is None],
+            )
+    finally:
+        conn.close()
+
+
+def enqueue_ledger_row(payment_key: str, row: list) -> bool:
+    """Jurnal qatorini buferga qo'shadi. Shu kalit avval qo'shilgan bo'lsa False."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO ledger_queue (payment_key, row_json, enqueued_at) VALUES (?, ?, ?)",
+            (payment_key, json.dumps(row, ensure_ascii=False), time.time()),
+        )
+        conn.commit()
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+def fetch_ledger_rows(limit: int) -> list[dict]:
+    """Yozilmagan jurnal qatorlari (eng eskisi birinchi): [{id, payment_key, row, in_doubt}]."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        cursor = conn.execute(
+            "SELECT id, payment_key, row_json, in_doubt FROM ledger_queue WHERE flushed_at IS NULL ORDER BY id LIMIT ?",
+            (limit,),
+        )
+        return [
+            {"id": row_id, "payment_key": key, "row": json.loads(row_json), "in_doubt": bool(in_doubt)}
+            for row_id, key, row_json, in_doubt in cursor.fetchall()
+        ]
+    finally:
+        conn.close()
+
+
+def get_ledger_pending() -> dict:
+    """Yozilmagan qatorlar soni va eng eskisining qo'shilgan vaqti: {count, oldest}."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        count, oldest = conn.execute(
+            "SELECT COUNT(*), MIN(enqueued_at) FROM ledger_queue WHERE flushed_at IS NULL"
+        ).fetchone()
+        return {"count": count, "oldest": oldest}
+    finally:
+        conn.close()
+
+
+def mark_ledger_rows(ids: list[int], flushed: bool):
+    """flushed=True - qatorlar varaqqa yozildi; False - natija noma'lum (in_doubt)."""
+    if not ids:
+        return
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        placeholders = ",".join("?" * len(ids))
+        if flushed:
+            conn.execute(f"UPDATE ledger_queue SET flushed_at = ?, in_doubt = 0 WHERE id IN ({placeholders})", (time.time(), *ids))
+        else:
+            conn.execute(f"UPDATE ledger_queue SET in_doubt = 1 WHERE id IN ({placeholders})", ids)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def clear_ledger_in_doubt(ids: list[int]):
+    """Qatorlar varaqqa yozilmagani aniq (4xx): keyingi urinishda varaq o'qilmaydi."""
+    if not ids:
+        return
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        placeholders = ",".join("?" * len(ids))
+        conn.execute(f"UPDATE ledger_queue SET in_doubt = 0 WHERE id IN ({placeholders})", ids)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def prune_ledger_rows(older_than: float):
+    """older_than (unix vaqt) dan oldin yozilgan qatorlarni o'chiradi."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        conn.execute("DELETE FROM ledger_queue WHERE flushed_at IS NOT NULL AND flushed_at < ?", (older_than,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_cached_statement_days(from_day: str, to_day: str) -> set:
+    """Keshdagi yopilgan kunlar (YYYY-MM-DD) to'plami."""
+    try:
+        conn = sqlite3.connect(DB_NAME)
+        cursor = conn.cursor()
+        cursor.execute("SELECT day FROM statement_days WHERE day BETWEEN ? AND ?", (from_day, to_day))
+        days = {row[0] for row in cursor.fetchall()}
+        conn.close()
+        return days
+    except Exception as e:
+        logger.error(f"Ko'chirma keshini o'qishda xatolik: {e}")
+        return set()
+
+
+def get_statement_totals(from_day: str, to_day: str) -> list[tuple]:
+    """Keshdagi yig'indilar: [(day, merchant_id, amount, count), ...]."""
+    try:
+        conn = sqlite3.connect(DB_NAME)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT day, merchant_id, amount, count FROM statement_totals WHERE day BETWEEN ? AND ?",
+            (from_day, to_day),
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+    except Exception as e:
+        logger.error(f"Ko'chirma keshini o'qishda xatolik: {e}")
+        return []
+
+
+def save_statement_days(days: list[str], totals: list[tuple]):
+    """Yopilgan kunlarni yig'indilari bilan bitta tranzaksiyada keshga yozadi."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        with conn:
+            conn.executemany("DELETE FROM statement_totals WHERE day = ?", [(d,) for d in days])
+            conn.executemany(
+                "INSERT INTO statement_totals (day, merchant_id, amount, count) VALUES (?, ?, ?, ?)",
+                totals,
+            )
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO statement_days (day, fetched_at) VALUES (?, ?)",
+                [(d, now) for d in days],
+            )
+    finally:
+        conn.close()
+
+
+def record_sheets_api_call(status: int):
+    """Sheets API so'rovini qayd etadi; bir soatdan eski yozuvlar o'chiriladi."""
+    now = time.time()
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        with conn:
+            conn.execute("INSERT INTO sheets_api_calls (at, status) VALUES (?, ?)", (now, status))
+            conn.execute("DELETE FROM sheets_api_calls WHERE at < ?", (now - 3600,))
+    finally:
+        conn.close()
+
+
+def get_recent_sheets_api_calls(window: float = 60.0) -> list:
+    """Oxirgi window soniyadagi Sheets so'rovlari vaqtlari (eskisi birinchi)."""
+    try:
+        conn = sqlite3.connect(DB_NAME)
+        cursor = conn.cursor()
+        cursor.execute("SELECT at FROM sheets_api_calls WHERE at >= ? ORDER BY at", (time.time() - window,))
+        calls = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return calls
+    except Exception as e:
+        logger.error(f"Sheets so'rovlari tarixini olishda xatolik: {e}")
+        return []
+
+
+def get_sheets_api_usage(window: float = 60.0) -> dict:
+    """Oxirgi window soniyadagi Sheets so'rovlari va oxirgi soatdagi 429 javoblar soni."""
+    try:
+        now = time.time()
+        conn = sqlite3.connect(DB_NAME)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM sheets_api_calls WHERE at >= ?", (now - window,))
+        calls = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM sheets_api_calls WHERE status = 429 AND at >= ?", (now - 3600,))
+        throttled = cursor.fetchone()[0]
+        conn.close()
+        return {"calls": calls, "throttled": throttled}
+    except Exception as e:
+        logger.error(f"Sheets so'rovlari statistikasini olishda xatolik: {e}")
+        return {"calls": 0, "throttled": 0}
+
+
+def write_diag_probe():
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        conn.execute("INSERT OR REPLACE INTO diag_probe (id, at) VALUES (1, ?)", (time.time(),))
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,141 @@
+# telegram-bot-admin/diag/probes.py
+"""
+/diag: har bir tashqi bog'liqlikka bir necha marta murojaat qilib, kechikishni
+o'lchaydi (min/median/max). Bog'liqliklar parallel, har birining o'lchovlari
+ketma-ket bajariladi - shunda bitta sekin xizmat boshqalarning natijasiga
+ta'sir qilmaydi va umumiy vaqt eng sekin bog'liqlik bilan cheklanadi.
+"""
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+
+from config import settings
+from database import db
+from grpc_client import client as grpc_client
+from grpc_server.server import HEALTH_CHECK_METHOD, HEALTH_SERVING
+from sync import engine as sync_engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBES = 5
+MAX_PROBES = 20
+# Lokal health tekshiruvi deadline'i (soniya)
+HEALTH_TIMEOUT = 2.0
+
+
+def _payme_probe():
+    _, error = grpc_client.list_branches()
+    return error
+
+
+def _sheets_probe():
+    # Avtorizatsiya (token olish) o'lchovga kirmaydi - faqat metadata so'rovi
+    client, error = sync_engine.get_gsheet_client()
+    if error:
+        return None, error
+
+    def probe():
+        client.open_by_key(settings.google_spreadsheet_id)
+
+    return probe, None
+
+
+def _telegram_probe(bot):
+    def probe():
+        bot.get_me()
+    return probe
+
+
+def _sqlite_read_probe():
+    db.get_all_admins()
+
+
+def _sqlite_write_probe():
+    db.write_diag_probe()
+
+
+def _health_probe():
+    channel = grpc.insecure_channel(f"127.0.0.1:{settings.grpc_bot_server_port}")
+
+    def probe():
+        response = channel.unary_unary(HEALTH_CHECK_METHOD)(b"", timeout=HEALTH_TIMEOUT)
+        if response != HEALTH_SERVING:
+            return "SERVING emas"
+
+    return probe, channel
+
+
+def _measure(probe, count):
+    timings, errors = [], []
+    for _ in range(count):
+        started_at = time.perf_counter()
+        try:
+            error = probe()
+        except grpc.RpcError as e:
+            error = f"{e.code().name}: {e.details()}"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        elapsed = time.perf_counter() - started_at
+        if error:
+            errors.append(error)
+        else:
+            timings.append(elapsed)
+    return timings, errors
+
+
+def _summary(name, timings, errors, count):
+    result = {"name": name, "count": count, "ok": len(timings), "errors": errors}
+    if timings:
+        result.update(min=min(timings), median=statistics.median(timings), max=max(timings))
+    return result
+
+
+def _run(name, probe, count):
+    timings, errors = _measure(probe, count)
+    return _summary(name, timings, errors, count)
+
+
+def _run_sheets(count):
+    probe, error = _sheets_probe()
+    if error:
+        return _summary("Google Sheets (metadata)", [], [error], count)
+    return _run("Google Sheets (metadata)", probe, count)
+
+
+def run_diagnostics(bot, count=DEFAULT_PROBES):
+    """
+    Barcha bog'liqliklarni count martadan o'lchaydi.
+    Qaytaradi: {"results": [...], "sheets_quota": {...}, "elapsed": soniya}
+    """
+    started_at = time.perf_counter()
+    health_probe, health_channel = _health_probe()
+    tasks = [
+        lambda: _run("payme-service (ListBranches)", _payme_probe, count),
+        lambda: _run_sheets(count),
+        lambda: _run("Telegram (getMe)", _telegram_probe(bot), count),
+        lambda: _run("SQLite o'qish", _sqlite_read_probe, count),
+        lambda: _run("SQLite yozish", _sqlite_write_probe, count),
+        lambda: _run("gRPC xabarnoma serveri (health)", health_probe, count),
+    ]
+    try:
+        with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="diag") as pool:
+            results = list(pool.map(lambda task: task(), tasks))
+    finally:
+        health_channel.close()
+
+    # Kvota o'lchovlardan keyin hisoblanadi - ular ham kvotadan foydalanadi
+    usage = db.get_sheets_api_usage()
+    quota = {
+        "limit": settings.sheets_quota_per_minute,
+        "used": usage["calls"],
+        "remaining": max(settings.sheets_quota_per_minute - usage["calls"], 0),
+        "throttled_last_hour": usage["throttled"],
+    }
+    elapsed = time.perf_counter() - started_at
+    logger.info(f"Diagnostika {elapsed:.2f}s da tugadi: " + ", ".join(
+        f"{r['name']}={r['median'] * 1000:.0f}ms" if r["ok"] else f"{r['name']}=xato" for r in results
+    ))
+    return {"results": results, "sheets_quota": quota, "elapsed": elapsed}
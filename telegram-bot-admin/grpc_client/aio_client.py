@@ -0,0 +1,126 @@
+# telegram-bot-admin/grpc_client/aio_client.py
+"""
+ManagementService'ning grpc.aio klienti (runtime/aio.py tsiklida ishlaydi).
+
+Deadline'lar, qayta urinish siyosati va zanjir uzgich sinxron klient
+(client.py) bilan umumiy. Bir-biriga bog'liq bo'lmagan so'rovlar (filiallar
+va o'quvchilar ro'yxati) parallel yuboriladi - umumiy kechikish ikkalasining
+yig'indisi emas, eng sekini bilan cheklanadi.
+"""
+import asyncio
+import logging
+
+import grpc
+from generated import payment_pb2, payment_pb2_grpc
+from google.protobuf import empty_pb2
+from config import settings
+from runtime import aio
+from . import client
+from .singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+coalescer = AsyncSingleFlight()
+
+# get_students_by_account_ids: bir vaqtdagi so'rovlar chegarasi
+LOOKUP_CONCURRENCY = 16
+
+# Kanal tsiklga bog'lanadi, shuning uchun u tsikl ichida (birinchi so'rovda) yaratiladi
+_stub = None
+
+
+def _get_stub():
+    global _stub
+    if _stub is None:
+        channel = grpc.aio.insecure_channel(settings.grpc_go_server_address, options=client.CHANNEL_OPTIONS)
+        _stub = payment_pb2_grpc.ManagementServiceStub(channel)
+    return _stub
+
+
+async def _call(method: str, request):
+    """RPC'ni deadline, zanjir uzgich va so'rovlarni birlashtirish bilan chaqiradi (client._call kabi)."""
+    if method in client.IDEMPOTENT_READS:
+        key = (method, request.SerializeToString(deterministic=True))
+        return await coalescer.do(key, lambda: _call_once(method, request))
+    return await _call_once(method, request)
+
+
+async def _call_once(method: str, request):
+    client.breaker.before_call()
+    timeout = client.RPC_DEADLINES.get(method, settings.grpc_default_timeout)
+    try:
+        response = await getattr(_get_stub(), method)(request, timeout=timeout)
+    except grpc.RpcError as e:
+        client.breaker.record_failure(e)
+        raise
+    except BaseException:
+        # CancelledError (vazifa bekor qilindi) ham - half_open sinov joyi band qolmasin
+        client.breaker.release_probe()
+        raise
+    client.breaker.record_success()
+    return response
+
+
+async def list_branches():
+    try:
+        response = await _call('ListBranches', empty_pb2.Empty())
+        return response.branches, None
+    except grpc.RpcError as e:
+        logger.error(f"Filiallar ro'yxatini olishda gRPC xatoligi: {e.details()}")
+        return None, f"gRPC xatoligi: {e.details()}"
+
+
+async def list_students(branch_id: str = ""):
+    """branch_id berilsa - faqat shu filial o'quvchilari."""
+    try:
+        response = await _call('ListStudents', payment_pb2.ListRequest(branch_id=branch_id))
+        return response.students, None
+    except grpc.RpcError as e:
+        logger.error(f"O'quvchilar ro'yxatini olishda gRPC xatoligi: {e.details()}")
+        return None, f"gRPC xatoligi: {e.details()}"
+
+
+async def list_students_of_branches(branch_ids):
+    """Bir nechta filial o'quvchilari (har biri alohida, parallel so'rov). Qaytaradi: (students, error)"""
+    results = await asyncio.gather(*(list_students(branch_id) for branch_id in branch_ids))
+    students = []
+    for branch_students, error in results:
+        if error:
+            return None, error
+        students.extend(branch_students)
+    return students, None
+
+
+async def get_students_by_account_ids(account_ids, concurrency=LOOKUP_CONCURRENCY):
+    """
+    Hisob raqamlari bo'yicha o'quvchilar (topilmaganlari tashlab ketiladi).
+    Bir vaqtda ko'pi bilan `concurrency` ta GetStudentByAccountId yuboriladi.
+    Qaytaradi: (students, error)
+    """
+    slots = asyncio.Semaphore(concurrency)
+
+    async def lookup(account_id):
+        async with slots:
+            try:
+                return await _call('GetStudentByAccountId', payment_pb2.ByAccountIdRequest(account_id=account_id)), None
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.NOT_FOUND:
+                    return None, None
+                logger.error(f"O'quvchini olishda gRPC xatoligi: {e.details()}")
+                return None, f"gRPC xatoligi: {e.details()}"
+
+    results = await asyncio.gather(*(lookup(account_id) for account_id in account_ids))
+    errors = [error for _, error in results if error]
+    if errors:
+        return None, errors[0]
+    return [student for student, _ in results if student is not None], None
+
+
+async def list_branches_and_students():
+    """Qaytaradi: ((branches, error), (students, error))"""
+    return tuple(await asyncio.gather(list_branches(), list_students()))
+
+
+def fetch_branches_and_students():
+    """Sinxron kod (dispetcher oqimlari, sinxronizatsiya) uchun list_branches_and_students()."""
+    return aio.run(list_branches_and_students())
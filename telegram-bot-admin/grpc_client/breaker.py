@@ -0,0 +1,127 @@
+# telegram-bot-admin/grpc_client/breaker.py
+
+import threading
+import time
+import grpc
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Faqat server/tarmoq nosozligini bildiradigan kodlar hisobga olinadi.
+# NOT_FOUND, INVALID_ARGUMENT kabi biznes xatolari zanjirni uzmaydi.
+FAILURE_CODES = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.INTERNAL,
+    grpc.StatusCode.UNKNOWN,
+})
+
+
+class CircuitOpenError(grpc.RpcError):
+    """Zanjir ochiq bo'lganda RPC yuborilmasdan ko'tariladi.
+
+    grpc.RpcError'dan meros olgani uchun mavjud `except grpc.RpcError` bloklari
+    uni oddiy gRPC xatosi sifatida ushlaydi va `details()` adminga ko'rsatiladi.
+    """
+
+    def __init__(self, retry_in: float, failures: int):
+        super().__init__()
+        self.retry_in = retry_in
+        self.failures = failures
+
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return (
+            f"payme-service vaqtincha javob bermayapti ({self.failures} ta ketma-ket xato). "
+            f"Qayta urinish {max(int(self.retry_in), 1)} soniyadan keyin mumkin."
+        )
+
+    def __str__(self):
+        return self.details()
+
+
+class CircuitBreaker:
+    """Ketma-ket xatolardan keyin so'rovlarni darhol rad etuvchi oddiy zanjir uzgich.
+
+    closed -> (failure_threshold ta xato) -> open -> (reset_timeout o'tgach) -> half_open
+    half_open holatida bitta sinov so'rovi o'tkaziladi: muvaffaqiyatli bo'lsa closed,
+    aks holda yana open.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._last_error = None
+        self._rejected = 0
+
+    def before_call(self):
+        """So'rov yuborishdan oldin chaqiriladi; zanjir ochiq bo'lsa CircuitOpenError."""
+        with self._lock:
+            if self._state == OPEN:
+                elapsed = self._clock() - self._opened_at
+                if elapsed < self.reset_timeout:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.reset_timeout - elapsed, self._failures)
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.reset_timeout, self._failures)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """
+        So'rov natijasiz tugadi (bekor qilindi, oqim erta yopildi, gRPC'dan boshqa
+        xatolik): holat o'zgarmaydi, lekin half_open sinov joyi bo'shatiladi - aks
+        holda zanjir qayta ishga tushguncha barcha so'rovlarni rad etardi.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self, error: grpc.RpcError):
+        code = error.code() if callable(getattr(error, "code", None)) else None
+        with self._lock:
+            if code not in FAILURE_CODES:
+                # Server javob berdi - demak u ishlayapti
+                self._state = CLOSED
+                self._failures = 0
+                self._probe_in_flight = False
+                return
+            self._failures += 1
+            self._last_error = f"{code.name}: {error.details()}" if code else str(error)
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        """Joriy holatni (monitoring va admin buyrug'i uchun) qaytaradi."""
+        with self._lock:
+            retry_in = 0.0
+            if self._state == OPEN:
+                retry_in = max(self.reset_timeout - (self._clock() - self._opened_at), 0.0)
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_in": retry_in,
+                "rejected": self._rejected,
+                "last_error": self._last_error,
+            }
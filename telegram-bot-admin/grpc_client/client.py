@@ -1,50 +1,155 @@
 # telegram-bot-admin/grpc_client/client.py
 
+import json
+import threading
 import grpc
 from generated import payment_pb2, payment_pb2_grpc
 from google.protobuf import empty_pb2
 from config import settings
+from .breaker import CircuitBreaker
+from .singleflight import SingleFlight
 import logging
 
 logger = logging.getLogger(__name__)
 
+MANAGEMENT_SERVICE = "school.ManagementService"
+PAYMENT_SERVICE = "school.PaymentService"
+
+# Har bir RPC uchun deadline (soniya). Ro'yxatda yo'q metodlar uchun
+# settings.grpc_default_timeout ishlatiladi.
+RPC_DEADLINES = {
+    "ListBranches": 5.0,
+    "GetStudentByAccountId": 5.0,
+    "ListStudents": 30.0,
+    "CreateStudentsBatch": 60.0,
+    "UpdateStudentsBatch": 60.0,
+    "DeleteStudentsBatch": 30.0,
+    # Oqim butun sinxronizatsiya davomida ochiq turadi
+    "SyncStudents": 300.0,
+    # Ko'p kunlik ko'chirma minglab tranzaksiya qaytarishi mumkin
+    "GetStatement": 60.0,
+}
+
+# Faqat idempotent o'qish so'rovlari qayta yuboriladi (gRPC service config orqali).
+IDEMPOTENT_READS = ["ListBranches", "ListStudents", "GetStudentByAccountId"]
+
+SERVICE_CONFIG = {
+    "methodConfig": [{
+        "name": [{"service": MANAGEMENT_SERVICE, "method": m} for m in IDEMPOTENT_READS]
+                + [{"service": PAYMENT_SERVICE, "method": "GetStatement"}],
+        "retryPolicy": {
+            "maxAttempts": 3,
+            "initialBackoff": "0.2s",
+            "maxBackoff": "2s",
+            "backoffMultiplier": 2,
+            "retryableStatusCodes": ["UNAVAILABLE"],
+        },
+    }]
+}
+
+CHANNEL_OPTIONS = [
+    ("grpc.enable_retries", 1),
+    ("grpc.service_config", json.dumps(SERVICE_CONFIG)),
+]
+
+breaker = CircuitBreaker(
+    failure_threshold=settings.grpc_breaker_failure_threshold,
+    reset_timeout=settings.grpc_breaker_reset_timeout,
+)
+
+# Bir xil parallel o'qish so'rovlari (masalan, bir vaqtda bosilgan dashboard
+# tugmalari) payme-service'ga bitta RPC bo'lib boradi va natijani bo'lishadi
+coalescer = SingleFlight()
+
+_channel = None
+_channel_lock = threading.Lock()
+
+def _get_channel():
+    global _channel
+    with _channel_lock:
+        if _channel is None:
+            _channel = grpc.insecure_channel(settings.grpc_go_server_address, options=CHANNEL_OPTIONS)
+        return _channel
+
 def get_management_stub():
     try:
-        channel = grpc.insecure_channel(settings.grpc_go_server_address)
-        return payment_pb2_grpc.ManagementServiceStub(channel)
+        return payment_pb2_grpc.ManagementServiceStub(_get_channel())
     except Exception as e:
         logger.error(f"gRPC kanalini yaratishda xatolik: {e}")
         return None
 
+def get_payment_stub():
+    try:
+        return payment_pb2_grpc.PaymentServiceStub(_get_channel())
+    except Exception as e:
+        logger.error(f"gRPC kanalini yaratishda xatolik: {e}")
+        return None
+
+def _call(stub, method: str, request):
+    """RPC'ni deadline va zanjir uzgich (circuit breaker) bilan chaqiradi.
+
+    Idempotent o'qishlar (IDEMPOTENT_READS) bir xil so'rov bilan parallel
+    chaqirilsa, bitta RPC yuboriladi va javob hammaga qaytariladi.
+    """
+    if method in IDEMPOTENT_READS:
+        key = (method, request.SerializeToString(deterministic=True))
+        return coalescer.do(key, lambda: _call_once(stub, method, request))
+    return _call_once(stub, method, request)
+
+def _call_once(stub, method: str, request):
+    breaker.before_call()
+    timeout = RPC_DEADLINES.get(method, settings.grpc_default_timeout)
+    try:
+        response = getattr(stub, method)(request, timeout=timeout)
+    except grpc.RpcError as e:
+        breaker.record_failure(e)
+        raise
+    except BaseException:
+        breaker.release_probe()
+        raise
+    breaker.record_success()
+    return response
+
+def get_breaker_state() -> dict:
+    return breaker.snapshot()
+
+def get_coalescing_stats() -> dict:
+    # Sinxron va grpc.aio klientlari (aio_client.py) yig'indisi
+    from . import aio_client
+    stats = coalescer.snapshot()
+    for key, value in aio_client.coalescer.snapshot().items():
+        stats[key] += value
+    return stats
+
 def list_branches():
     stub = get_management_stub()
     if not stub:
         return None, "gRPC serveriga ulanib bo'lmadi."
     try:
-        response = stub.ListBranches(empty_pb2.Empty())
+        response = _call(stub, 'ListBranches', empty_pb2.Empty())
         return response.branches, None
     except grpc.RpcError as e:
         logger.error(f"Filiallar ro'yxatini olishda gRPC xatoligi: {e.details()}")
         return None, f"gRPC xatoligi: {e.details()}"
 
 def list_branches_with_student_counts():
-    stub = get_management_stub()
-    if not stub:
-        return None, "gRPC serveriga ulanib bo'lmadi."
-    try:
-        branches_response = stub.ListBranches(empty_pb2.Empty())
-        students_response = stub.ListStudents(payment_pb2.ListRequest())
-        student_counts = {}
-        for student in students_response.students:
-            student_counts[student.branch_id] = student_counts.get(student.branch_id, 0) + 1
-        result = []
-        for branch in branches_response.branches:
-            count = student_counts.get(branch.id, 0)
-            result.append({"branch": branch, "student_count": count})
-        return result, None
-    except grpc.RpcError as e:
-        logger.error(f"Filiallar ro'yxatini olishda gRPC xatoligi: {e.details()}")
-        return None, f"gRPC xatoligi: {e.details()}"
+    # Ikkala ro'yxat grpc.aio klienti orqali parallel olinadi
+    from . import aio_client
+    (branches, branch_error), (students, student_error) = aio_client.fetch_branches_and_students()
+    if branch_error or student_error:
+        return None, branch_error or student_error
+    return count_students_by_branch(branches, students), None
+
+def count_students_by_branch(branches, students):
+    """[{"branch": Branch, "student_count": int}] - filiallar tartibida."""
+    student_counts = {}
+    for student in students:
+        student_counts[student.branch_id] = student_counts.get(student.branch_id, 0) + 1
+    result = []
+    for branch in branches:
+        count = student_counts.get(branch.id, 0)
+        result.append({"branch": branch, "student_count": count})
+    return result
 
 def create_branch(data):
     stub = get_management_stub()
@@ -60,7 +165,7 @@ def create_branch(data):
             merchant_id=data['merchant_id'],
             topic_id=int(data.get('topic_id', 0)) 
         )
-        response = stub.CreateBranch(request)
+        response = _call(stub, 'CreateBranch', request)
         return response, None
     except grpc.RpcError as e:
         logger.error(f"Filial yaratishda gRPC xatoligi: {e.details()}")
@@ -72,7 +177,7 @@ def delete_branch(branch_id: str):
         return False, "gRPC serveriga ulanib bo'lmadi."
     try:
         request = payment_pb2.ByIdRequest(id=branch_id)
-        stub.DeleteBranch(request)
+        _call(stub, 'DeleteBranch', request)
         return True, None
     except grpc.RpcError as e:
         logger.error(f"Filialni o'chirishda gRPC xatoligi: {e.details()}")
@@ -80,12 +185,13 @@ def delete_branch(branch_id: str):
             return False, "Bu filialga o'quvchilar biriktirilgan. Avval o'quvchilarni o'chiring yoki boshqa filialga o'tkazing."
         return False, f"gRPC xatoligi: {e.details()}"
 
-def list_students():
+def list_students(branch_id: str = ""):
+    """branch_id berilsa - faqat shu filial o'quvchilari."""
     stub = get_management_stub()
     if not stub:
         return None, "gRPC serveriga ulanib bo'lmadi."
     try:
-        response = stub.ListStudents(payment_pb2.ListRequest())
+        response = _call(stub, 'ListStudents', payment_pb2.ListRequest(branch_id=branch_id))
         return response.students, None
     except grpc.RpcError as e:
         logger.error(f"O'quvchilar ro'yxatini olishda gRPC xatoligi: {e.details()}")
@@ -106,7 +212,7 @@ def create_student(data):
             discount_percent=data['discount_percent'],
             contract_number=data.get('contract_number', "")
         )
-        response = stub.CreateStudent(request)
+        response = _call(stub, 'CreateStudent', request)
         return response, None
     except grpc.RpcError as e:
         logger.error(f"O'quvchi yaratishda gRPC xatoligi: {e.details()}")
@@ -118,7 +224,7 @@ def delete_student_by_account_id(account_id: str):
         return None, "gRPC serveriga ulanib bo'lmadi."
     try:
         request = payment_pb2.ByAccountIdRequest(account_id=account_id)
-        stub.DeleteStudentByAccountId(request)
+        _call(stub, 'DeleteStudentByAccountId', request)
         return True, None
     except grpc.RpcError as e:
         logger.error(f"O'quvchini o'chirishda gRPC xatoligi: {e.details()}")
@@ -132,7 +238,7 @@ def get_student_by_account_id(account_id: str):
         return None, "gRPC serveriga ulanib bo'lmadi."
     try:
         request = payment_pb2.ByAccountIdRequest(account_id=account_id)
-        response = stub.GetStudentByAccountId(request)
+        response = _call(stub, 'GetStudentByAccountId', request)
         return response, None
     except grpc.RpcError as e:
         if e.code() == grpc.StatusCode.NOT_FOUND:
@@ -146,7 +252,7 @@ def update_student(student_data):
         return None, "gRPC serveriga ulanib bo'lmadi."
     try:
         request = payment_pb2.Student(**student_data)
-        response = stub.UpdateStudent(request)
+        response = _call(stub, 'UpdateStudent', request)
         return response, None
     except grpc.RpcError as e:
         logger.error(f"O'quvchini yangilashda gRPC xatoligi: {e.details()}")
@@ -175,7 +281,7 @@ def create_students_batch(students_data: list):
         ]
         
         request = payment_pb2.CreateStudentsBatchRequest(students=grpc_students)
-        response = stub.CreateStudentsBatch(request)
+        response = _call(stub, 'CreateStudentsBatch', request)
         return response.students, None
         
     except grpc.RpcError as e:
@@ -196,7 +302,7 @@ def update_students_batch(students_data: list):
     try:
         grpc_students = [payment_pb2.Student(**s) for s in students_data]
         request = payment_pb2.UpdateStudentsBatchRequest(students=grpc_students)
-        stub.UpdateStudentsBatch(request)
+        _call(stub, 'UpdateStudentsBatch', request)
         return True, None
     except grpc.RpcError as e:
         logger.error(f"O'quvchilarni ommaviy yangilashda gRPC xatoligi: {e.details()}")
@@ -212,11 +318,56 @@ def delete_students_batch(account_ids: list):
     
     try:
         request = payment_pb2.DeleteStudentsBatchRequest(account_ids=account_ids)
-        stub.DeleteStudentsBatch(request)
+        _call(stub, 'DeleteStudentsBatch', request)
         return True, None
     except grpc.RpcError as e:
         logger.error(f"O'quvchilarni ommaviy o'chirishda gRPC xatoligi: {e.details()}")
         return False, f"gRPC xatoligi: {e.details()}"
     except Exception as e:
         logger.error(f"O'quvchilarni ommaviy o'chirishda kutilmagan xatolik: {e}")
-        return False, str(e)
\ No newline at end of file
+        return False, str(e)
+
+def get_statement(from_ms: int, to_ms: int):
+    """[from_ms, to_ms] oralig'ida yaratilgan tranzaksiyalar (Payme vaqti, millisekund)."""
+    stub = get_payment_stub()
+    if not stub:
+        return None, "gRPC serveriga ulanib bo'lmadi."
+    try:
+        request = payment_pb2.GetStatementRequest(to=to_ms, **{"from": from_ms})
+        response = _call(stub, 'GetStatement', request)
+        return response.transactions, None
+    except grpc.RpcError as e:
+        logger.error(f"Ko'chirmani olishda gRPC xatoligi: {e.details()}")
+        return None, f"gRPC xatoligi: {e.details()}"
+
+def sync_students(rows):
+    """
+    SyncStudents ikki tomonlama oqimi.
+    rows: (row_ref, student_dict) juftliklari iteratori - qatorlar o'qilishi bilan
+    serverga yuboriladi. Natijalar (SyncStudentResult) server qaytarishi bilan yield qilinadi.
+    Xatolar grpc.RpcError sifatida ko'tariladi; eski serverda kod UNIMPLEMENTED bo'ladi.
+    """
+    stub = get_management_stub()
+    if not stub:
+        raise RuntimeError("gRPC serveriga ulanib bo'lmadi.")
+
+    breaker.before_call()
+    requests = (
+        payment_pb2.SyncStudentRow(row_ref=row_ref, student=payment_pb2.Student(**data))
+        for row_ref, data in rows
+    )
+    try:
+        call = stub.SyncStudents(requests, timeout=RPC_DEADLINES["SyncStudents"])
+        try:
+            for result in call:
+                yield result
+        finally:
+            call.cancel()
+    except grpc.RpcError as e:
+        breaker.record_failure(e)
+        raise
+    except BaseException:
+        # Oqim erta yopildi (GeneratorExit) yoki boshqa xatolik - sinov joyi bo'shaydi
+        breaker.release_probe()
+        raise
+    breaker.record_success()
@@ -0,0 +1,85 @@
+# telegram-bot-admin/grpc_client/singleflight.py
+
+import asyncio
+import threading
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Bir xil kalitli parallel chaqiruvlarni bitta bajarilishga birlashtiradi.
+
+    Birinchi chaqiruvchi funksiyani bajaradi, u tugaguncha kelgan boshqalari
+    uning natijasini (yoki xatosini) kutib oladi. Natija keshlanmaydi: chaqiruv
+    tugagach, keyingisi yana funksiyani bajaradi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, func):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executed += 1
+            else:
+                flight.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._flights), "executed": self.executed, "shared": self.shared}
+
+
+class AsyncSingleFlight:
+    """SingleFlight'ning asyncio varianti (bitta tsikl ichida ishlatiladi, qulf kerak emas).
+
+    Bajarilish alohida Task'da: birinchi chaqiruvchi bekor qilinsa ham, qolganlari
+    natijani oladi.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key, func):
+        task = self._flights.get(key)
+        if task is None:
+            self.executed += 1
+            task = self._flights[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def snapshot(self) -> dict:
+        return {"in_flight": len(self._flights), "executed": self.executed, "shared": self.shared}
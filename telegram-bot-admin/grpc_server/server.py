@@ -1,3 +1,4 @@
+import asyncio
 import grpc
 from concurrent import futures
 import logging
@@ -5,45 +6,57 @@ from generated import bot_admin_pb2, bot_admin_pb2_grpc
 from database import db
 from config import settings
 from google.protobuf import empty_pb2
+from logging_setup import SampledLog
+from runtime import aio, telegram_aio
+from ledger import writer as ledger_writer
 import html  # <--- Muhim: HTML kutubxonasi qo'shildi
 
 logger = logging.getLogger(__name__)
+# Har bir to'lov INFO darajasida emas - davriy namuna va yig'indi
+payment_log = SampledLog(logger, settings.log_summary_interval)
+
+def _format_payment_message(request):
+    """To'lov xabarnomasi matni (HTML)."""
+    # Summani formatlash (tiyindan so'mga o'tkazish va probel qo'shish)
+    amount_in_som = request.amount / 100
+    formatted_amount = f"{amount_in_som:,.2f}".replace(',', ' ').replace('.', ',')
+
+    # HTML formatida xatolik bo'lmasligi uchun maxsus belgilarni zararsizlantiramiz
+    # Masalan: <, >, &, " va ' belgilari
+    safe_student_name = html.escape(request.student_name)
+    safe_branch_name = html.escape(request.branch_name)
+    safe_group_name = html.escape(request.group_name)
+    safe_contract = html.escape(request.contract_number)
+    safe_account_id = html.escape(request.account_id)
+
+    # Xabarni HTML formatida tayyorlaymiz
+    # <b> - qalin yozuv
+    # <code> - nusxalash uchun qulay format (monospaced)
+    return (
+        f"💸 <b>Yangi To'lov!</b>\n\n"
+        f"👤 <b>O'quvchi:</b> {safe_student_name}\n"
+        f"🆔 <b>ID:</b> <code>{safe_account_id}</code>\n"
+        f"📄 <b>Shartnoma №:</b> <code>{safe_contract}</code>\n"
+        f"🏢 <b>Filial:</b> {safe_branch_name}\n"
+        f"👨‍🏫 <b>Guruh:</b> {safe_group_name}\n"
+        f"💰 <b>Summa:</b> {formatted_amount} so'm\n"
+        f"⏰ <b>Vaqt:</b> {request.payment_time}"
+    )
 
 class BotAdminService(bot_admin_pb2_grpc.BotAdminServiceServicer):
+    """Oqimli (ThreadPoolExecutor) server varianti - GRPC_SERVER_ASYNC=false bo'lganda."""
+
     def __init__(self, bot_instance):
         self.bot = bot_instance
 
     def NotifyPaymentSuccess(self, request, context):
-        logger.info(f"To'lov haqida gRPC xabarnomasi keldi: {request}")
-        
-        # Summani formatlash (tiyindan so'mga o'tkazish va probel qo'shish)
-        amount_in_som = request.amount / 100
-        formatted_amount = f"{amount_in_som:,.2f}".replace(',', ' ').replace('.', ',')
-
-        # HTML formatida xatolik bo'lmasligi uchun maxsus belgilarni zararsizlantiramiz
-        # Masalan: <, >, &, " va ' belgilari
-        safe_student_name = html.escape(request.student_name)
-        safe_branch_name = html.escape(request.branch_name)
-        safe_group_name = html.escape(request.group_name)
-        safe_contract = html.escape(request.contract_number)
-        safe_account_id = html.escape(request.account_id)
-
-        # Xabarni HTML formatida tayyorlaymiz
-        # <b> - qalin yozuv
-        # <code> - nusxalash uchun qulay format (monospaced)
-        message = (
-            f"💸 <b>Yangi To'lov!</b>\n\n"
-            f"👤 <b>O'quvchi:</b> {safe_student_name}\n"
-            f"🆔 <b>ID:</b> <code>{safe_account_id}</code>\n"
-            f"📄 <b>Shartnoma №:</b> <code>{safe_contract}</code>\n"
-            f"🏢 <b>Filial:</b> {safe_branch_name}\n"
-            f"👨‍🏫 <b>Guruh:</b> {safe_group_name}\n"
-            f"💰 <b>Summa:</b> {formatted_amount} so'm\n"
-            f"⏰ <b>Vaqt:</b> {request.payment_time}"
-        )
+        logger.debug("To'lov haqida gRPC xabarnomasi keldi: %s", request)
+        ledger_writer.enqueue_payment(request)
+        message = _format_payment_message(request)
 
         target_group_id = settings.telegram_payment_group_id
-        
+        sent = False
+
         if self.bot and target_group_id:
             try:
                 # Agar topic_id 0 bo'lsa, umumiy chatga, aks holda topicga boradi
@@ -55,19 +68,120 @@ class BotAdminService(bot_admin_pb2_grpc.BotAdminServiceServicer):
                     parse_mode='HTML',  # <--- O'ZGARISH: Markdown o'rniga HTML
                     message_thread_id=thread_id 
                 )
-                logger.info(f"Xabar guruhga ({target_group_id}) Topic: {thread_id} yuborildi.")
+                sent = True
+                logger.debug("Xabar guruhga (%s) Topic: %s yuborildi.", target_group_id, thread_id)
             except Exception as e:
                 logger.error(f"Guruhga xabar yuborishda xatolik: {e}")
-        
+
+        payment_log.record("To'lov xabarnomasi: %s, %d tiyin", request.account_id, request.amount, failed=not sent)
         return empty_pb2.Empty()
 
-def serve(bot_instance):
+class AioBotAdminService(bot_admin_pb2_grpc.BotAdminServiceServicer):
+    """grpc.aio varianti: Telegram javobini kutish oqimni band qilmaydi.
+
+    sender - runtime/telegram_aio.py'dagi yuboruvchi (korutina send_message).
+    """
+
+    def __init__(self, sender):
+        self.sender = sender
+
+    async def NotifyPaymentSuccess(self, request, context):
+        logger.debug("To'lov haqida gRPC xabarnomasi keldi: %s", request)
+        if ledger_writer.is_enabled():
+            await asyncio.to_thread(ledger_writer.enqueue_payment, request)
+        message = _format_payment_message(request)
+
+        target_group_id = settings.telegram_payment_group_id
+        sent = False
+
+        if self.sender and target_group_id:
+            # Agar topic_id 0 bo'lsa, umumiy chatga, aks holda topicga boradi
+            thread_id = request.topic_id if request.topic_id > 0 else None
+            try:
+                await self.sender.send_message(
+                    chat_id=target_group_id,
+                    text=message,
+                    parse_mode='HTML',
+                    message_thread_id=thread_id,
+                )
+                sent = True
+                logger.debug("Xabar guruhga (%s) Topic: %s yuborildi.", target_group_id, thread_id)
+            except Exception as e:
+                logger.error(f"Guruhga xabar yuborishda xatolik: {e}")
+
+        payment_log.record("To'lov xabarnomasi: %s, %d tiyin", request.account_id, request.amount, failed=not sent)
+        return empty_pb2.Empty()
+
+# grpc.health.v1.Health/Check: so'rov maydoni (service) e'tiborga olinmaydi,
+# javob HealthCheckResponse{status: SERVING} ning tayyor baytlari
+HEALTH_CHECK_METHOD = "/grpc.health.v1.Health/Check"
+HEALTH_SERVING = b"\x08\x01"
+
+async def _health_check_async(request, context):
+    return HEALTH_SERVING
+
+def _health_handler(asynchronous=False):
+    """
+    Standart gRPC health tekshiruvi (grpc_health_probe va /diag uchun).
+    Javob server xabarnomalarni bajaradigan joyda (ishchi pul yoki tsikl)
+    qaytariladi, shuning uchun ular band bo'lsa kechikish shu yerda ham ko'rinadi.
+    """
+    check = _health_check_async if asynchronous else (lambda request, context: HEALTH_SERVING)
+    return grpc.method_handlers_generic_handler("grpc.health.v1.Health", {
+        "Check": grpc.unary_unary_rpc_method_handler(check),
+    })
+
+class _AioServer:
+    """grpc.aio serverini sinxron koddan boshqarish uchun (grpc.server bilan bir xil stop/wait)."""
+
+    def __init__(self, server, sender):
+        self._server = server
+        self._sender = sender
+
+    def stop(self, grace=None):
+        async def stop():
+            await self._server.stop(grace)
+            if self._sender:
+                await self._sender.aclose()
+        aio.run(stop())
+
+    def wait_for_termination(self, timeout=None):
+        return aio.run(self._server.wait_for_termination(timeout))
+
+async def _start_aio_server(bot_instance, port):
+    sender = telegram_aio.sender_for(bot_instance)
+    server = grpc.aio.server()
+    bot_admin_pb2_grpc.add_BotAdminServiceServicer_to_server(AioBotAdminService(sender), server)
+    server.add_generic_rpc_handlers((_health_handler(asynchronous=True),))
+    server.add_insecure_port(f'[::]:{port}')
+    await server.start()
+    return _AioServer(server, sender)
+
+def _start_threaded_server(bot_instance, port):
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
     bot_admin_pb2_grpc.add_BotAdminServiceServicer_to_server(
         BotAdminService(bot_instance), server
     )
-    port = settings.grpc_bot_server_port
+    server.add_generic_rpc_handlers((_health_handler(),))
     server.add_insecure_port(f'[::]:{port}')
     server.start()
-    logger.info(f"gRPC server {port}-portda ishga tushdi.")
-    server.wait_for_termination()
\ No newline at end of file
+    return server
+
+def start_server(bot_instance, port=None):
+    """gRPC serverni portga bog'lab ishga tushiradi va darhol qaytaradi.
+
+    port berilmasa settings.grpc_bot_server_port ishlatiladi. Standart holatda
+    grpc.aio server umumiy tsiklda (runtime/aio.py) ishlaydi; GRPC_SERVER_ASYNC=false
+    bo'lsa - eski 10 oqimli server.
+    """
+    port = port or settings.grpc_bot_server_port
+    if settings.grpc_server_async:
+        server = aio.run(_start_aio_server(bot_instance, port))
+    else:
+        server = _start_threaded_server(bot_instance, port)
+    logger.info(f"gRPC server {port}-portda ishga tushdi ({'asyncio' if settings.grpc_server_async else 'oqimli'}).")
+    return server
+
+def serve(bot_instance):
+    server = start_server(bot_instance)
+    server.wait_for_termination()
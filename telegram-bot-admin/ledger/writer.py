@@ -0,0 +1,203 @@
+# telegram-bot-admin/ledger/writer.py
+"""
+To'lovlar jurnali: har bir NotifyPaymentSuccess Google Sheets'dagi alohida
+varaqqa (LEDGER_WORKSHEET_NAME) qator bo'lib yoziladi.
+
+Xabarnoma serveri qatorni faqat SQLite buferiga (ledger_queue) qo'yadi - Sheets
+API'ga har bir to'lov uchun so'rov yuborilmaydi. Bitta flusher oqimi buferni
+ledger_batch_size ga yetganda yoki eng eski qator ledger_flush_interval dan
+oshganda bitta append_rows bilan yozadi. Bufer diskda, shuning uchun qayta
+ishga tushishda qatorlar yo'qolmaydi.
+
+Takrorlanmaslik: har bir qatorning birinchi ustuni - to'lov kaliti (ID).
+Partiya append_rows'dan OLDIN in_doubt deb belgilanadi, shuning uchun jarayon
+append va "yozildi" belgisi orasida o'ldirilsa ham keyingi urinishdan oldin
+varaqdagi ID'lar o'qiladi va yozilganlari chiqarib tashlanadi.
+  429 / 4xx     - so'rov bajarilmagani aniq: in_doubt olib tashlanadi, qatorlar
+                  buferda qoladi va keyinroq qayta yuboriladi
+  timeout / 5xx - natija noma'lum: qatorlar in_doubt bo'lib qoladi
+"""
+import hashlib
+import logging
+import threading
+import time
+
+from config import settings
+from database import db
+
+logger = logging.getLogger(__name__)
+
+LEDGER_HEADER = ["ID", "Vaqt", "Account ID", "Shartnoma", "O'quvchi", "Filial", "Guruh", "Summa (so'm)"]
+
+# Flusher buferni shu oraliqda tekshiradi (soniya)
+POLL_INTERVAL = 2.0
+# Xatolikdan keyingi kutish: 5s dan boshlab ikki barobar, ko'pi bilan 5 daqiqa
+BACKOFF_MIN = 5.0
+BACKOFF_MAX = 300.0
+
+
+def is_enabled():
+    return bool(settings.ledger_worksheet_name)
+
+
+def payment_key(request):
+    """
+    Bitta to'lov uchun barqaror kalit (Go serveri xabarnomani qayta yuborsa ham bir xil).
+
+    Xabarnomada tranzaksiya ID'si yo'q, payment_time esa soniya aniqligida:
+    bitta o'quvchining bir soniya ichidagi bir xil summali ikki to'lovi bitta
+    kalitga tushadi va jurnalga faqat birinchisi yoziladi (Telegram xabari
+    ikkalasiga ham yuboriladi).
+    """
+    raw = f"{request.account_id}|{request.amount}|{request.payment_time}|{request.contract_number}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def ledger_row(request, key):
+    return [
+        key,
+        request.payment_time,
+        request.account_id,
+        request.contract_number,
+        request.student_name,
+        request.branch_name,
+        request.group_name,
+        request.amount / 100,
+    ]
+
+
+def enqueue_payment(request):
+    """To'lovni jurnal buferiga qo'yadi (xabarnoma serveridan chaqiriladi, xatolik tashlamaydi)."""
+    if not is_enabled():
+        return
+    try:
+        key = payment_key(request)
+        if not db.enqueue_ledger_row(key, ledger_row(request, key)):
+            logger.debug("To'lov %s jurnal buferida allaqachon bor.", key)
+    except Exception as e:
+        logger.error(f"To'lovni jurnal buferiga yozib bo'lmadi ({request.account_id}): {e}")
+
+
+def _get_worksheet(client):
+    """Jurnal varag'ini qaytaradi; yo'q bo'lsa sarlavha bilan yaratadi."""
+    import gspread
+
+    spreadsheet = client.open_by_key(settings.google_spreadsheet_id)
+    try:
+        return spreadsheet.worksheet(settings.ledger_worksheet_name)
+    except gspread.exceptions.WorksheetNotFound:
+        worksheet = spreadsheet.add_worksheet(settings.ledger_worksheet_name, rows=1, cols=len(LEDGER_HEADER))
+        worksheet.update([LEDGER_HEADER], "A1", value_input_option="RAW")
+        logger.info(f"'{settings.ledger_worksheet_name}' jurnal varag'i yaratildi.")
+        return worksheet
+
+
+def _is_retryable(error):
+    """True - so'rov bajarilmagani aniq (429 va boshqa 4xx); False - natija noma'lum."""
+    import gspread
+
+    if isinstance(error, gspread.exceptions.APIError):
+        status = getattr(error.response, "status_code", None) or getattr(error, "code", None)
+        return status is not None and 400 <= status < 500
+    return False
+
+
+def flush_once(worksheet):
+    """
+    Buferdagi bir partiya qatorni bitta append_rows bilan yozadi.
+    Qaytaradi: (yozilgan qatorlar soni, error). Xatolikda qatorlar buferda qoladi.
+    """
+    pending = db.fetch_ledger_rows(settings.ledger_batch_size)
+    if not pending:
+        return 0, None
+
+    if any(item["in_doubt"] for item in pending):
+        # Oldingi append natijasi noma'lum: varaqqa tushgan qatorlar qayta yozilmaydi
+        try:
+            written = set(worksheet.col_values(1))
+        except Exception as e:
+            return 0, f"Jurnal varag'ini o'qib bo'lmadi: {e}"
+        already = [item["id"] for item in pending if item["payment_key"] in written]
+        db.mark_ledger_rows(already, flushed=True)
+        if already:
+            logger.info(f"Jurnal: {len(already)} ta qator varaqda allaqachon bor (oldingi urinish yozgan).")
+        pending = [item for item in pending if item["payment_key"] not in written]
+        if not pending:
+            return 0, None
+
+    ids = [item["id"] for item in pending]
+    # Jarayon append bilan quyidagi flushed belgisi orasida to'xtasa, qatorlar
+    # qayta ishga tushgandan keyin varaq bilan solishtiriladi
+    db.mark_ledger_rows(ids, flushed=False)
+    try:
+        worksheet.append_rows(
+            [item["row"] for item in pending],
+            value_input_option="RAW",
+            insert_data_option="INSERT_ROWS",
+        )
+    except Exception as e:
+        if _is_retryable(e):
+            db.clear_ledger_in_doubt(ids)
+        return 0, f"Jurnalga yozib bo'lmadi ({len(ids)} ta qator): {e}"
+
+    db.mark_ledger_rows(ids, flushed=True)
+    return len(ids), None
+
+
+def _due(pending):
+    if not pending["count"]:
+        return False
+    if pending["count"] >= settings.ledger_batch_size:
+        return True
+    return time.time() - pending["oldest"] >= settings.ledger_flush_interval
+
+
+def start_flusher(stop_event):
+    """Jurnal yoqilgan bo'lsa flusher oqimini ishga tushiradi va qaytaradi (aks holda None)."""
+    if not is_enabled():
+        return None
+    thread = threading.Thread(target=flush_forever, args=(stop_event,), name="ledger-flusher", daemon=True)
+    thread.start()
+    logger.info(f"To'lovlar jurnali yoqilgan: '{settings.ledger_worksheet_name}' varag'i.")
+    return thread
+
+
+def flush_forever(stop_event):
+    """Buferni davriy ravishda varaqqa yozadi (alohida oqimda, bitta jarayonda)."""
+    from sync import engine as sync_engine
+
+    worksheet = None
+    backoff = BACKOFF_MIN
+    retry_at = 0.0
+    last_prune = 0.0
+
+    while not stop_event.wait(POLL_INTERVAL):
+        now = time.time()
+        if now - last_prune >= 3600:
+            db.prune_ledger_rows(now - settings.ledger_retention_days * 86400)
+            last_prune = now
+        if now < retry_at:
+            continue
+        try:
+            if not _due(db.get_ledger_pending()):
+                continue
+            if worksheet is None:
+                client, error = sync_engine.get_gsheet_client()
+                if error:
+                    raise RuntimeError(error)
+                worksheet = _get_worksheet(client)
+            # Bufer partiyadan katta bo'lsa, ketma-ket partiyalar bilan bo'shatiladi
+            while not stop_event.is_set():
+                written, error = flush_once(worksheet)
+                if error:
+                    raise RuntimeError(error)
+                if not written:
+                    break
+                logger.info(f"Jurnal: {written} ta to'lov '{settings.ledger_worksheet_name}' varag'iga yozildi.")
+                if db.get_ledger_pending()["count"] < settings.ledger_batch_size:
+                    break
+            backoff = BACKOFF_MIN
+        except Exception as e:
+            logger.error(f"Jurnal: {e}. {backoff:.0f}s dan keyin qayta uriniladi.")
+            retry_at = time.time() + backoff
+            backoff = min(backoff * 2, BACKOFF_MAX)
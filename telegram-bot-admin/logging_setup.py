@@ -0,0 +1,175 @@
+# telegram-bot-admin/logging_setup.py
+"""
+Yagona logging sozlamasi.
+
+Barcha loglar chegaralangan navbatga (QueueHandler) qo'yiladi va alohida
+QueueListener oqimi ularni formatlab stderr'ga yozadi. Shuning uchun gRPC va
+dispetcher oqimlari hech qachon log I/O'sini kutmaydi: sekin disk yoki
+to'lgan pipe faqat listener oqimini sekinlashtiradi, navbat to'lsa esa
+yozuvlar tashlab yuboriladi va ularning soni keyinroq logga chiqariladi.
+
+Xabar argumentlari (logger.info("...%s", x)) ham listener oqimida
+formatlanadi - shu sababli argument sifatida keyin o'zgartiriladigan
+obyektlarni berish kerak emas.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from config import settings
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord'ning standart atributlari - qolganlari extra={...} orqali kelgan maydonlar
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "role"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Har bir yozuvni bir qatorli JSON obyektiga aylantiradi."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        role = getattr(record, "role", None)
+        if role:
+            entry["role"] = role
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Navbat to'lsa kutmaydi: yozuvni tashlaydi va tashlanganlarni sanaydi."""
+
+    def __init__(self, log_queue, role=None):
+        super().__init__(log_queue)
+        self.role = role
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Standart QueueHandler xabarni shu (chaqiruvchi) oqimda formatlaydi.
+        # Biz faqat traceback'ni matnga aylantiramiz, qolgani listener'da.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if self.role:
+            record.role = self.role
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            self._report_dropped()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _report_dropped(self):
+        with self._dropped_lock:
+            if not self.dropped:
+                return
+            warning = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                "Log navbati to'lgan: %d ta yozuv tashlab yuborildi", (self.dropped,), None,
+            )
+            warning.role = self.role
+            try:
+                self.queue.put_nowait(warning)
+            except queue.Full:
+                return
+            self.dropped = 0
+
+
+def setup_logging(role=None, stream=None):
+    """
+    Root logger'ni navbat orqali ishlashga sozlaydi (har bir jarayonda bir marta
+    chaqiriladi; qayta chaqirilsa oldingi sozlama almashtiriladi).
+    role: ko'p jarayonli rejimda jarayon nomi (bot/notify/sync).
+    """
+    global _listener
+    _stop_listener()
+
+    if settings.log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        fmt = TEXT_FORMAT.replace('%(name)s', f'[{role}] %(name)s') if role else TEXT_FORMAT
+        formatter = logging.Formatter(fmt)
+    sink = logging.StreamHandler(stream or sys.stderr)
+    sink.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=settings.log_queue_size)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_NonBlockingQueueHandler(log_queue, role))
+    root.setLevel(settings.log_level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, sink, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def _stop_listener():
+    # Navbatda qolgan yozuvlarni yozib chiqaramiz (jarayon tugashida ham)
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+class SampledLog:
+    """
+    Tez-tez takrorlanadigan hodisalar (masalan, har bir to'lov) uchun log:
+    har bir hodisa sanaladi, lekin interval soniyada ko'pi bilan bitta namuna
+    INFO darajasida yoziladi va oldingi davr bo'yicha yig'indi qo'shiladi.
+    Qolgan hodisalar faqat DEBUG darajasida (o'chirilgan bo'lsa - formatlanmasdan).
+    """
+
+    def __init__(self, logger, interval):
+        self.logger = logger
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._window_started = time.monotonic()
+        self._count = 0
+        self._failed = 0
+        self._next_sample = 0.0
+
+    def record(self, msg, *args, failed=False):
+        now = time.monotonic()
+        with self._lock:
+            self._count += 1
+            self._failed += int(failed)
+            sample = now >= self._next_sample
+            if sample:
+                count, failed_count, window = self._count, self._failed, now - self._window_started
+                self._count = self._failed = 0
+                self._window_started = now
+                self._next_sample = now + self.interval
+        if sample:
+            self.logger.info(
+                msg + " (oxirgi %.0fs: %d ta, xato %d)", *args, window, count, failed_count,
+            )
+        else:
+            self.logger.debug(msg, *args)
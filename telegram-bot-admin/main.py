@@ -1,16 +1,35 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from contextlib import contextmanager
+
+_BOOT_STARTED_AT = time.perf_counter()
+
 from database import db
 from config import settings
-from grpc_server import server as grpc_server
-from bot import core as bot_core
+from logging_setup import setup_logging
 
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
+# Ishga tushish bosqichlari va ularning davomiyligi (soniyada)
+startup_timings = []
+
+@contextmanager
+def startup_phase(name):
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings.append((name, time.perf_counter() - started_at))
+
+def log_startup_report():
+    """Ishga tushish vaqti hisobotini logga chiqaradi."""
+    total = time.perf_counter() - _BOOT_STARTED_AT
+    lines = [f"  {name:<28} {duration * 1000:8.1f} ms" for name, duration in startup_timings]
+    lines.append(f"  {'JAMI':<28} {total * 1000:8.1f} ms")
+    logger.info("Ishga tushish vaqti hisoboti:\n" + "\n".join(lines))
+
 def initialize_database():
     """Ma'lumotlar bazasini va super adminni sozlaydi."""
     db.init_db()
@@ -19,13 +38,44 @@ def initialize_database():
         logger.info(f"Super admin {settings.super_admin_id} bazaga qo'shildi.")
 
 if __name__ == '__main__':
-    initialize_database()
+    with startup_phase("Ma'lumotlar bazasi"):
+        initialize_database()
+
+    if settings.process_mode == "multi":
+        # Bot, gRPC server va sync ishchisi alohida jarayonlarda (runtime/supervisor.py)
+        from runtime import supervisor
+        supervisor.run()
+        raise SystemExit(0)
+
+    # To'lov xabarnomalari kechikmasligi uchun gRPC server Telegram polling'dan
+    # oldin portga bog'lanadi; unga faqat Bot obyekti kerak.
+    with startup_phase("Telegram Updater"):
+        from bot import core as bot_core
+        updater = bot_core.create_updater()
+
+    with startup_phase("gRPC server (bind)"):
+        from grpc_server import server as grpc_server
+        notification_server = grpc_server.start_server(updater.bot)
+
+    # Dashboard'lar birinchi so'rovda diskdagi ro'yxat nusxasidan javob beradi,
+    # jonli ro'yxat esa fonda olinadi
+    with startup_phase("Ro'yxat nusxasi"):
+        from roster import service as roster_service
+        roster_service.warm_start()
+
+    # To'lovlar jurnali buferini Sheets'ga yozuvchi oqim (LEDGER_WORKSHEET_NAME bo'lsa)
+    from ledger import writer as ledger_writer
+    ledger_stop = threading.Event()
+    ledger_writer.start_flusher(ledger_stop)
+
+    with startup_phase("Handlerlar va polling"):
+        bot_instance, bot_idle_func = bot_core.run_bot(updater)
 
-    bot_instance, bot_idle_func = bot_core.run_bot()
-    
     logger.info("Telegram bot ishga tushdi...")
+    log_startup_report()
 
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        executor.submit(grpc_server.serve, bot_instance)
-        
-        bot_idle_func()
\ No newline at end of file
+    try:
+        bot_idle_func()
+    finally:
+        notification_server.stop(grace=5)
+        ledger_stop.set()
@@ -0,0 +1,209 @@
+# telegram-bot-admin/reports/statement.py
+"""
+/hisobot uchun GetStatement ko'chirmasini filial, kun va oy bo'yicha yig'ish.
+
+To'langan (bajarilgan) tranzaksiyalar kun va qabul qiluvchi merchant (filial)
+bo'yicha yig'iladi. To'liq yopilgan kunlarning yig'indilari SQLite'da
+keshlanadi, shuning uchun takroriy hisobotda serverdan faqat keshda yo'q
+kunlar - odatda oraliqning ochiq "dumi" - so'raladi.
+
+Yig'indilar ustunli ko'rinishda saqlanadi (kun, merchant, summa va soni
+alohida ro'yxatlarda); filial, kun va oy kesimlari shu ustunlar ustidan
+bitta o'tishda hisoblanadi.
+"""
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from config import settings
+from database import db
+from grpc_client import client as grpc_client
+
+logger = logging.getLogger(__name__)
+
+# Payme tranzaksiya holati: bajarilgan (to'langan)
+STATE_PERFORMED = 2
+# Bitta GetStatement so'rovi qamrab oladigan kunlar chegarasi
+FETCH_MAX_DAYS = 31
+# Bitta hisobot oralig'i chegarasi
+MAX_RANGE_DAYS = 366
+DAY_MS = 86400 * 1000
+
+
+def _tz():
+    return timezone(timedelta(hours=settings.report_utc_offset_hours))
+
+
+def today() -> date:
+    return datetime.now(_tz()).date()
+
+
+def _day_start_ms(day: date) -> int:
+    return int(datetime(day.year, day.month, day.day, tzinfo=_tz()).timestamp() * 1000)
+
+
+def _is_closed(day: date, now_ms: int) -> bool:
+    """Kun tugab, ustiga report_day_close_hours o'tgan bo'lsa - u endi o'zgarmaydi."""
+    return _day_start_ms(day) + DAY_MS + settings.report_day_close_hours * 3600 * 1000 <= now_ms
+
+
+def _days(first: date, last: date) -> list:
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def _fetch_ranges(days: list) -> list:
+    """Ketma-ket kunlarni ko'pi bilan FETCH_MAX_DAYS kunlik oraliqlarga birlashtiradi."""
+    ranges = []
+    for day in days:
+        if ranges and (day - ranges[-1][1]).days == 1 and (day - ranges[-1][0]).days < FETCH_MAX_DAYS:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return ranges
+
+
+def parse_period(args: list):
+    """
+    /hisobot argumentlari: [] - joriy oy, ["YYYY-MM"] - oy, ["YYYY-MM-DD", "YYYY-MM-DD"] - oraliq.
+    Qaytaradi: ((first, last), error)
+    """
+    try:
+        if not args:
+            last = today()
+            first = last.replace(day=1)
+        elif len(args) == 1:
+            first = datetime.strptime(args[0], "%Y-%m").date()
+            next_month = (first + timedelta(days=32)).replace(day=1)
+            last = next_month - timedelta(days=1)
+        elif len(args) == 2:
+            first = datetime.strptime(args[0], "%Y-%m-%d").date()
+            last = datetime.strptime(args[1], "%Y-%m-%d").date()
+        else:
+            raise ValueError
+    except ValueError:
+        return None, "Noto'g'ri format. Ishlatish: /hisobot [YYYY-MM] yoki /hisobot YYYY-MM-DD YYYY-MM-DD"
+    if first > last:
+        return None, "Boshlanish sanasi tugash sanasidan keyin bo'lishi mumkin emas."
+    if (last - first).days >= MAX_RANGE_DAYS:
+        return None, f"Oraliq {MAX_RANGE_DAYS} kundan oshmasligi kerak."
+    return (first, last), None
+
+
+def format_amount(amount: int) -> str:
+    """Tiyindagi summani "1 234 567,00" ko'rinishiga keltiradi."""
+    return f"{amount / 100:,.2f}".replace(',', ' ').replace('.', ',')
+
+
+class StatementColumns:
+    """Kun x merchant yig'indilari ustunlar ko'rinishida."""
+
+    def __init__(self):
+        self.day = []
+        self.merchant_id = []
+        self.amount = []
+        self.count = []
+
+    def __len__(self):
+        return len(self.day)
+
+    def extend(self, rows):
+        """rows: (day, merchant_id, amount, count) qatorlari."""
+        for day, merchant_id, amount, count in rows:
+            self.day.append(day)
+            self.merchant_id.append(merchant_id)
+            self.amount.append(amount)
+            self.count.append(count)
+
+    def total(self):
+        return sum(self.amount), sum(self.count)
+
+    def sum_by(self, keys) -> dict:
+        """keys ustuni (yoki undan hosil qilingan ro'yxat) bo'yicha {kalit: [summa, soni]}."""
+        totals = defaultdict(lambda: [0, 0])
+        for key, amount, count in zip(keys, self.amount, self.count):
+            bucket = totals[key]
+            bucket[0] += amount
+            bucket[1] += count
+        return dict(totals)
+
+    def by_branch(self):
+        return self.sum_by(self.merchant_id)
+
+    def by_day(self):
+        return self.sum_by(self.day)
+
+    def by_month(self):
+        return self.sum_by([day[:7] for day in self.day])
+
+
+def _fetch_days(first: date, last: date):
+    """
+    [first, last] kunlari ko'chirmasini olib, kun va merchant bo'yicha yig'adi.
+    Qaytaradi: ([(day, merchant_id, amount, count), ...], error)
+    """
+    transactions, error = grpc_client.get_statement(_day_start_ms(first), _day_start_ms(last) + DAY_MS - 1)
+    if error:
+        return None, error
+
+    tz = _tz()
+    totals = defaultdict(lambda: [0, 0])
+    for tx in transactions:
+        if tx.state != STATE_PERFORMED:
+            continue
+        # Server ham oraliqni create_time bo'yicha tanlaydi
+        day = datetime.fromtimestamp(tx.create_time / 1000, tz).date().isoformat()
+        merchant_id = tx.receivers[0].id if tx.receivers else ""
+        bucket = totals[(day, merchant_id)]
+        bucket[0] += tx.amount
+        bucket[1] += 1
+    return [(day, merchant_id, amount, count) for (day, merchant_id), (amount, count) in totals.items()], None
+
+
+def build_report(first: date, last: date):
+    """
+    [first, last] oralig'i uchun yig'indilar.
+    Qaytaradi: (report, error). report: columns (StatementColumns), cached_days,
+    fetched_days, fetch_calls, elapsed (soniya).
+    """
+    started_at = time.perf_counter()
+    first_key, last_key = first.isoformat(), last.isoformat()
+
+    cached = db.get_cached_statement_days(first_key, last_key)
+    columns = StatementColumns()
+    columns.extend(db.get_statement_totals(first_key, last_key))
+
+    # Keshda yo'q kunlar; kelajakdagi kunlar so'ralmaydi
+    current_day = today()
+    missing = [d for d in _days(first, min(last, current_day)) if d.isoformat() not in cached]
+
+    now_ms = int(time.time() * 1000)
+    fetch_calls = 0
+    for range_first, range_last in _fetch_ranges(missing):
+        rows, error = _fetch_days(range_first, range_last)
+        fetch_calls += 1
+        if error:
+            return None, error
+        columns.extend(rows)
+
+        closed = {d.isoformat() for d in _days(range_first, range_last) if _is_closed(d, now_ms)}
+        if not closed:
+            continue
+        try:
+            db.save_statement_days(sorted(closed), [row for row in rows if row[0] in closed])
+        except Exception as e:
+            # Kesh ixtiyoriy: hisobot baribir to'liq
+            logger.error(f"Ko'chirma keshini yozishda xatolik: {e}")
+
+    report = {
+        "columns": columns,
+        "cached_days": len(cached),
+        "fetched_days": len(missing),
+        "fetch_calls": fetch_calls,
+        "elapsed": time.perf_counter() - started_at,
+    }
+    logger.info(
+        f"Hisobot {first_key}..{last_key}: keshdan {len(cached)} kun, serverdan {len(missing)} kun "
+        f"({fetch_calls} so'rov), {report['elapsed'] * 1000:.0f} ms"
+    )
+    return report, None
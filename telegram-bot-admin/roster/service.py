@@ -0,0 +1,268 @@
+# telegram-bot-admin/roster/service.py
+"""
+Dashboard'lar va sinxronizatsiya uchun filiallar/o'quvchilar ro'yxati.
+
+Qayta ishga tushgandan keyin birinchi so'rov to'liq ListStudents'ni kutmasligi
+uchun oxirgi ma'lum ro'yxat diskdagi nusxadan (snapshot.py) beriladi va shu
+paytda fon yangilanishi ishga tushadi. Jonli ro'yxat bir marta kelgach
+("tekshirildi"), so'rovlar odatdagidek ManagementService'ga boradi, har bir
+muvaffaqiyatli javob esa nusxaga yoziladi. ManagementService javob bermasa,
+nusxa (yoshi ko'rsatilgan holda) zaxira sifatida ishlatiladi.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from database import db
+from grpc_client import aio_client
+from . import snapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(db.DB_NAME), "roster.snapshot")
+
+_lock = threading.Lock()
+_snapshot = None
+_loaded = False
+_reconciled = False
+_refresh = None
+# Nusxa javobni kechiktirmaslik uchun alohida oqimda, navbat bilan yoziladi;
+# fon tekshiruvi ham dispetcher oqimini band qilmasligi uchun o'z oqimida
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="roster-snapshot")
+_refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="roster-refresh")
+
+
+def format_age(seconds):
+    if seconds < 90:
+        return f"{seconds:.0f} soniya"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f} daqiqa"
+    if seconds < 48 * 3600:
+        return f"{seconds / 3600:.0f} soat"
+    return f"{seconds / 86400:.0f} kun"
+
+
+def _load():
+    """Nusxani (bir marta) ochadi. _lock ostida chaqiriladi."""
+    global _snapshot, _loaded
+    if _loaded:
+        return _snapshot
+    _loaded = True
+    started_at = time.perf_counter()
+    loaded, error = snapshot.load(SNAPSHOT_PATH)
+    if error:
+        logger.warning(f"Ro'yxat nusxasini o'qib bo'lmadi ({SNAPSHOT_PATH}): {error}")
+    elif loaded:
+        logger.info(
+            f"Ro'yxat nusxasi ochildi: {loaded.branch_count} ta filial, {loaded.student_count} ta o'quvchi, "
+            f"{format_age(loaded.age)} oldin saqlangan ({(time.perf_counter() - started_at) * 1000:.1f} ms)"
+        )
+    _snapshot = loaded
+    return _snapshot
+
+
+def _stale_roster():
+    """Nusxadagi (branches, students, age); nusxa yo'q yoki buzilgan bo'lsa None. _lock ostida."""
+    global _snapshot
+    stale = _load()
+    if stale is None:
+        return None
+    try:
+        return stale.branches, stale.students, stale.age
+    except snapshot.SnapshotError as e:
+        logger.warning(f"Ro'yxat nusxasi ishlatilmaydi: {e}")
+        _snapshot = None
+        return None
+
+
+def _save(branches, students):
+    global _loaded
+    try:
+        started_at = time.perf_counter()
+        size = snapshot.save(SNAPSHOT_PATH, branches, students)
+        # Zaxira kerak bo'lsa yangi fayl ochiladi
+        with _lock:
+            _loaded = False
+        logger.debug("Ro'yxat nusxasi saqlandi: %d bayt, %.1f ms", size, (time.perf_counter() - started_at) * 1000)
+    except OSError as e:
+        logger.error(f"Ro'yxat nusxasini saqlab bo'lmadi: {e}")
+
+
+def remember(branches, students):
+    """Jonli ro'yxatni tekshirilgan deb belgilaydi va nusxaga yozadi (fonda)."""
+    global _reconciled
+    with _lock:
+        _reconciled = True
+    _writer.submit(_save, list(branches), list(students))
+
+
+def is_reconciled():
+    return _reconciled
+
+
+def _fetch_live():
+    started_at = time.perf_counter()
+    (branches, branch_error), (students, student_error) = aio_client.fetch_branches_and_students()
+    error = branch_error or student_error
+    if not error:
+        remember(branches, students)
+    return branches, students, error, (time.perf_counter() - started_at) * 1000
+
+
+def _background_refresh():
+    branches, students, error, rpc_ms = _fetch_live()
+    if error:
+        logger.warning(f"Ro'yxat nusxasini fonda tekshirib bo'lmadi: {error}")
+        return
+    stale = _snapshot
+    if stale is not None:
+        logger.info(
+            f"Ro'yxat nusxasi tekshirildi: nusxada {stale.student_count}, bazada {len(students)} ta o'quvchi "
+            f"(nusxani o'qish {stale.decode_ms:.1f} ms, RPC {rpc_ms:.0f} ms)"
+        )
+    else:
+        logger.info(f"Ro'yxat bazadan olindi va nusxaga yozildi: {len(students)} ta o'quvchi (RPC {rpc_ms:.0f} ms)")
+
+
+def _start_refresh():
+    """Fon yangilanishini (ishlamayotgan bo'lsa) ishga tushiradi. _lock ostida chaqiriladi."""
+    global _refresh
+    if _refresh is None or _refresh.done():
+        _refresh = _refresher.submit(_background_refresh)
+
+
+def warm_start():
+    """Ishga tushishda: nusxani ochadi va jonli ro'yxat bilan fonda tekshiradi."""
+    with _lock:
+        if _reconciled:
+            return
+        _load()
+        _start_refresh()
+
+
+def get_roster():
+    """
+    Qaytaradi: ((branches, students, snapshot_age), error).
+    snapshot_age - ro'yxat diskdagi nusxadan berilgan bo'lsa uning yoshi (soniya), jonli bo'lsa None.
+    """
+    with _lock:
+        if not _reconciled:
+            stale = _stale_roster()
+            if stale is not None:
+                _start_refresh()
+                return stale, None
+
+    branches, students, error, _ = _fetch_live()
+    if not error:
+        return (branches, students, None), None
+
+    with _lock:
+        stale = _stale_roster()
+    if stale is None:
+        return None, error
+    logger.warning(f"Ro'yxatni olib bo'lmadi ({error}) - {format_age(stale[2])} oldingi nusxa ishlatiladi.")
+    return stale, None
+
+
+class _LiveRoster:
+    """Sinxronizatsiyaning jonli ro'yxat so'rovi (Future) natijasi, kerak bo'lganda bir marta kutiladi."""
+
+    def __init__(self, future, normalize):
+        self._future = future
+        self._normalize = normalize
+        self._result = None
+        self._lock = threading.Lock()
+
+    def ready(self):
+        return self._result is not None or self._future.done()
+
+    def get(self):
+        with self._lock:
+            if self._result is None:
+                (branches, branch_error), (students, student_error) = self._future.result()
+                if branch_error or student_error:
+                    raise RuntimeError(f"Bazadan ma'lumot olib bo'lmadi: {branch_error or student_error}")
+                self._result = (
+                    {self._normalize(b.name): b.id for b in branches},
+                    {s.id: s for s in students},
+                )
+            return self._result
+
+
+class WarmBranchMap:
+    """Filial nomi -> id: nusxada topilmasa jonli ro'yxatdan."""
+
+    def __init__(self, branches, live, normalize):
+        self._snapshot = {normalize(b.name): b.id for b in branches}
+        self._live = live
+
+    def get(self, name, default=None):
+        if self._live.ready():
+            return self._live.get()[0].get(name, default)
+        branch_id = self._snapshot.get(name)
+        if branch_id is None:
+            return self._live.get()[0].get(name, default)
+        return branch_id
+
+
+class WarmStudentMap:
+    """
+    UUID -> o'quvchi: jonli ro'yxat kelguncha nusxadan. Nusxada yo'q UUID
+    (nusxadan keyin yaratilgan o'quvchi) uchun jonli ro'yxat kutiladi - aks
+    holda u yangi o'quvchi deb qayta yaratilib qolardi. Nusxadan keyin
+    o'chirilgan o'quvchining yangilanishi esa xatolik bilan qaytadi va keyingi
+    sinxronizatsiyada (jonli ro'yxat bilan) tuzatiladi.
+    """
+
+    def __init__(self, students, live):
+        self._snapshot = {s.id: s for s in students}
+        self._live = live
+        self._added = {}
+
+    def _current(self, key):
+        if key in self._added:
+            return self._added
+        if self._live.ready() or key not in self._snapshot:
+            return self._live.get()[1]
+        return self._snapshot
+
+    def __contains__(self, key):
+        return key in self._current(key)
+
+    def __getitem__(self, key):
+        return self._current(key)[key]
+
+    def __setitem__(self, key, value):
+        self._added[key] = value
+
+    def get(self, key, default=None):
+        return self._current(key).get(key, default)
+
+
+def _remember_result(future):
+    if future.cancelled() or future.exception():
+        return
+    (branches, branch_error), (students, student_error) = future.result()
+    if not (branch_error or student_error):
+        remember(branches, students)
+
+
+def warm_lookups(live_future, normalize):
+    """
+    Sinxronizatsiya uchun (branch_map, students_by_uuid, snapshot_age) - ro'yxat hali
+    tekshirilmagan va nusxa bo'lsa; aks holda None (jonli ro'yxat kutiladi).
+    live_future - aio_client.list_branches_and_students() natijasi (concurrent Future),
+    normalize - filial nomini branch_map kalitiga aylantiruvchi funksiya.
+    """
+    with _lock:
+        if _reconciled:
+            return None
+        stale = _stale_roster()
+    if stale is None:
+        return None
+    branches, students, age = stale
+    live_future.add_done_callback(_remember_result)
+    live = _LiveRoster(live_future, normalize)
+    return WarmBranchMap(branches, live, normalize), WarmStudentMap(students, live), age
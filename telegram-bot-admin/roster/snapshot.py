@@ -0,0 +1,111 @@
+# telegram-bot-admin/roster/snapshot.py
+"""
+Filiallar va o'quvchilar ro'yxatining diskdagi nusxasi (database_files/roster.snapshot).
+
+Format (little-endian):
+  sarlavha  - MAGIC, saqlangan vaqt (double), filiallar soni, o'quvchilar soni,
+              o'quvchilar bo'limining boshlanish joyi (HEADER struct)
+  filiallar - ketma-ket [teg][varint uzunlik][Branch protobuf baytlari]
+  o'quvchilar - ketma-ket [teg][varint uzunlik][Student protobuf baytlari]
+
+Har bir bo'lim aynan ListBranchesResponse / ListStudentsResponse'ning wire
+ko'rinishi (repeated maydon 1), shuning uchun u bitta FromString chaqiruvi
+bilan dekodlanadi. Fayl mmap qilinadi va faqat sarlavhasi darhol o'qiladi;
+filiallar va o'quvchilar birinchi murojaatda dekodlanadi. Yozish vaqtinchalik
+faylga va os.replace bilan (o'quvchi jarayonlar yarim yozilgan faylni ko'rmaydi).
+"""
+import mmap
+import os
+import struct
+import time
+
+from generated import payment_pb2
+from google.protobuf.message import DecodeError
+
+MAGIC = b"YRS1"
+HEADER = struct.Struct("<4sdIIQ")
+
+
+class SnapshotError(Exception):
+    """Nusxa fayli buzilgan yoki boshqa formatda."""
+
+
+def save(path, branches, students, saved_at=None):
+    """Ro'yxatni nusxa fayliga yozadi. Qaytaradi: fayl hajmi (bayt)."""
+    branch_bytes = payment_pb2.ListBranchesResponse(branches=branches).SerializeToString()
+    student_bytes = payment_pb2.ListStudentsResponse(students=students).SerializeToString()
+    header = HEADER.pack(
+        MAGIC, saved_at or time.time(), len(branches), len(students), HEADER.size + len(branch_bytes),
+    )
+    # Bir nechta jarayon (bot va sync) bir vaqtda yozishi mumkin - har biri o'z vaqtinchalik fayliga
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(branch_bytes)
+        f.write(student_bytes)
+    os.replace(tmp_path, path)
+    return HEADER.size + len(branch_bytes) + len(student_bytes)
+
+
+class RosterSnapshot:
+    """mmap qilingan nusxa: sarlavha darhol, ro'yxatlar birinchi murojaatda o'qiladi."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._buffer) < HEADER.size:
+            raise SnapshotError("nusxa fayli kutilganidan qisqa")
+        magic, self.saved_at, self.branch_count, self.student_count, self._students_offset = (
+            HEADER.unpack_from(self._buffer, 0)
+        )
+        if magic != MAGIC:
+            raise SnapshotError(f"noma'lum format: {magic!r}")
+        if self._students_offset > len(self._buffer):
+            raise SnapshotError("nusxa fayli kutilganidan qisqa")
+        self._branches = None
+        self._students = None
+        # Ro'yxatlarni dekodlashga ketgan vaqt (ms) - RPC bilan solishtirish uchun
+        self.decode_ms = 0.0
+
+    @property
+    def age(self):
+        return max(time.time() - self.saved_at, 0.0)
+
+    def _decode(self, message_class, start, end, field, count):
+        started_at = time.perf_counter()
+        try:
+            items = getattr(message_class.FromString(self._buffer[start:end]), field)
+        except DecodeError as e:
+            raise SnapshotError(f"nusxa fayli buzilgan: {e}")
+        finally:
+            self.decode_ms += (time.perf_counter() - started_at) * 1000
+        if len(items) != count:
+            raise SnapshotError(f"nusxada {count} ta {field} kutilgan, {len(items)} ta topildi")
+        return items
+
+    @property
+    def branches(self):
+        if self._branches is None:
+            self._branches = self._decode(
+                payment_pb2.ListBranchesResponse, HEADER.size, self._students_offset, "branches", self.branch_count,
+            )
+        return self._branches
+
+    @property
+    def students(self):
+        if self._students is None:
+            self._students = self._decode(
+                payment_pb2.ListStudentsResponse, self._students_offset, len(self._buffer), "students",
+                self.student_count,
+            )
+        return self._students
+
+
+def load(path):
+    """Qaytaradi: (RosterSnapshot, error). Fayl yo'q bo'lsa (None, None)."""
+    if not os.path.exists(path):
+        return None, None
+    try:
+        return RosterSnapshot(path), None
+    except (OSError, ValueError, struct.error, SnapshotError) as e:
+        return None, str(e)
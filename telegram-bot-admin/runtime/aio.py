@@ -0,0 +1,44 @@
+# telegram-bot-admin/runtime/aio.py
+"""
+Umumiy asyncio hodisalar tsikli (event loop).
+
+Tarmoq I/O'si - grpc.aio xabarnoma serveri, ManagementService'ning grpc.aio
+klienti va Telegram'ga xabar yuborish - alohida oqimdagi bitta tsiklda
+bajariladi. Sekin javob oqimni emas, faqat korutinani kutdiradi, shuning
+uchun parallellik oqimlar soniga bog'liq emas.
+
+PTB 13 dispetcheri va sinxronizatsiya o'z oqimlarida qoladi va tsikldagi
+korutinalarni run()/submit() orqali chaqiradi.
+"""
+import asyncio
+import threading
+
+_loop = None
+_thread = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """Tsiklni (birinchi chaqiruvda ishga tushirib) qaytaradi."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=loop.run_forever, name="aio-loop", daemon=True)
+            _thread.start()
+            _loop = loop
+        return _loop
+
+
+def submit(coro):
+    """Korutinani tsiklga topshiradi va concurrent.futures.Future qaytaradi (kutmaydi)."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(coro, timeout=None):
+    """Korutinani tsiklda bajaradi va natijasini kutadi (boshqa oqimlardan chaqiriladi)."""
+    loop = get_loop()
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("aio.run() tsikl oqimining o'zidan chaqirildi - await ishlating")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
@@ -0,0 +1,135 @@
+# telegram-bot-admin/runtime/outbox.py
+"""
+Ko'p jarayonli rejimda Telegram'ga chiquvchi xabarlar navbati.
+
+Xabarlar SQLite'dagi `outbox` jadvalida saqlanadi, loopback'dagi UDP datagramma
+esa bot jarayonini darhol uyg'otadi. multiprocessing.Queue/Event ishlatilmaydi:
+kutish paytida o'ldirilgan jarayon ularning qulfini (yoki kutuvchilar hisobini)
+buzib qoldiradi va qayta ishga tushgan bot yoki xabar qo'yayotgan gRPC jarayoni
+abadiy kutib qoladi. Datagramma holatsiz, jadval esa bot jarayoni (yoki butun
+konteyner) qayta ishga tushganda ham xabarlarni saqlab qoladi.
+
+Yetkazish "kamida bir marta": xabar faqat yuborilgandan keyin o'chiriladi;
+yuborilgan, lekin o'chirilmay qolgan xabar qayta ishga tushgandan keyin yana
+yuboriladi. Yuborilmagan xabar navbatda qoladi va tobora uzayuvchi oraliq
+bilan qayta yuboriladi; MAX_DELIVERY_ROUNDS urinishdan keyin outbox_dead
+jadvaliga ko'chiriladi.
+"""
+import logging
+import socket
+import time
+from config import settings
+from database import db
+
+logger = logging.getLogger(__name__)
+
+# Tarmoq xatolarida bitta xabarni qayta yuborishlar soni
+MAX_SEND_ATTEMPTS = 5
+
+# Yuborilmagan xabar navbatda necha marta qayta urinilishi va urinishlar
+# orasidagi oraliq (soniya): 1, 2, 4, ... daqiqa, ko'pi bilan 1 soat
+MAX_DELIVERY_ROUNDS = 10
+RETRY_BASE_DELAY = 60
+RETRY_MAX_DELAY = 3600
+
+
+def _wakeup_address():
+    return ("127.0.0.1", settings.outbox_wakeup_port)
+
+
+class OutboxBot:
+    """Bot o'rnini bosuvchi obyekt: send_message xabarni navbatga qo'yadi.
+
+    gRPC xabarnoma jarayoni Telegram'ga o'zi murojaat qilmaydi - xabarni bot
+    jarayoniga topshiradi va darhol javob qaytaradi.
+    """
+
+    def __init__(self):
+        self._wakeup = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send_message(self, chat_id, text, parse_mode=None, message_thread_id=None, **kwargs):
+        db.enqueue_outbox_message(chat_id, text, parse_mode, message_thread_id)
+        try:
+            self._wakeup.sendto(b"1", _wakeup_address())
+        except OSError:
+            # Bot jarayoni ishlamayapti - xabar navbatda kutadi
+            pass
+
+
+def _send_with_retry(bot, message):
+    """Qaytaradi: (yuborildi, xatolik matni)"""
+    from telegram.error import NetworkError, RetryAfter, TimedOut
+
+    error = None
+    for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+        try:
+            bot.send_message(
+                chat_id=message["chat_id"],
+                text=message["text"],
+                parse_mode=message["parse_mode"],
+                message_thread_id=message["message_thread_id"],
+            )
+            return True, None
+        except RetryAfter as e:
+            # Telegram cheklovi: ko'rsatilgan vaqtni kutib qayta yuboramiz
+            logger.warning(f"Telegram 429: {e.retry_after} soniya kutilmoqda")
+            error = str(e)
+            time.sleep(e.retry_after)
+        except (TimedOut, NetworkError) as e:
+            error = str(e)
+            if attempt == MAX_SEND_ATTEMPTS:
+                break
+            logger.warning(f"Xabar yuborishda tarmoq xatoligi ({attempt}-urinish): {e}")
+            time.sleep(min(2 ** attempt, 30))
+        except Exception as e:
+            logger.error(f"Guruhga xabar yuborishda xatolik: {e}")
+            return False, str(e)
+    logger.error(f"Xabar {MAX_SEND_ATTEMPTS} urinishdan keyin ham yuborilmadi ({message['chat_id']})")
+    return False, error
+
+
+def _defer_or_bury(message, error):
+    """Yuborilmagan xabarni keyinroq qayta urinish uchun qoldiradi yoki outbox_dead'ga ko'chiradi."""
+    attempts = message["attempts"] + 1
+    if attempts >= MAX_DELIVERY_ROUNDS:
+        db.bury_outbox_message(message["id"], error)
+        logger.error(
+            f"Xabar {attempts} urinishdan keyin yuborilmadi va outbox_dead'ga ko'chirildi "
+            f"(id {message['id']}, guruh {message['chat_id']}): {error}"
+        )
+        return
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    db.defer_outbox_message(message["id"], error, time.time() + delay)
+    logger.warning(
+        f"Xabar yuborilmadi (id {message['id']}, {attempts}-urinish) - "
+        f"{delay} soniyadan keyin qayta yuboriladi: {error}"
+    )
+
+
+def deliver_forever(bot, stop_event):
+    """Navbatdagi xabarlarni bot orqali Telegram'ga yetkazadi (bot jarayonida alohida oqimda)."""
+    wakeup = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    wakeup.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    wakeup.bind(_wakeup_address())
+    # Datagramma yo'qolsa ham navbat har soniyada tekshiriladi
+    wakeup.settimeout(1.0)
+
+    while not stop_event.is_set():
+        messages = db.fetch_outbox_messages()
+        if not messages:
+            try:
+                wakeup.recv(16)
+            except socket.timeout:
+                pass
+            continue
+
+        for message in messages:
+            if stop_event.is_set():
+                return
+            sent, error = _send_with_retry(bot, message)
+            if not sent:
+                _defer_or_bury(message, error)
+                continue
+            lag = time.time() - message["enqueued_at"]
+            logger.debug("Xabar guruhga (%s) Topic: %s yuborildi (navbatda %.2fs).", message['chat_id'], message['message_thread_id'], lag)
+            db.delete_outbox_message(message["id"])
@@ -0,0 +1,164 @@
+# telegram-bot-admin/runtime/supervisor.py
+"""
+Ko'p jarayonli rejim (PROCESS_MODE=multi).
+
+Har bir rol alohida jarayonda ishlaydi, shuning uchun katta sinxronizatsiya
+GIL'ni egallab to'lov xabarnomalarini kechiktirmaydi:
+  bot    - Telegram dispetcheri va chiquvchi xabarlar navbatini yetkazuvchi
+  notify - BotAdminService gRPC serveri (xabarlarni navbatga qo'yadi)
+  sync   - rejalashtirilgan Google Sheets sinxronizatsiyasi va to'lovlar jurnali
+
+Jarayonlar holatni SQLite (admins.db) orqali bo'lishadi. Telegram'ga chiquvchi
+xabarlar SQLite'dagi navbatga yoziladi va bot jarayoni loopback UDP orqali
+uyg'otiladi (runtime/outbox.py). Har bir rol mustaqil ravishda qayta
+ishga tushiriladi.
+"""
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Qayta ishga tushirish oralig'i: 1s dan boshlab ikki barobar, ko'pi bilan 60s.
+# Rol shu muddatdan uzoq ishlagan bo'lsa, oraliq qayta 1s ga tushadi.
+RESTART_BACKOFF_MIN = 1.0
+RESTART_BACKOFF_MAX = 60.0
+STABLE_RUN_SECONDS = 60.0
+
+
+def _setup_logging(role):
+    from logging_setup import setup_logging
+    setup_logging(role)
+
+
+def _stop_event():
+    """SIGTERM/SIGINT kelganda o'rnatiladigan Event."""
+    stop_event = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop_event.set())
+    return stop_event
+
+
+def bot_role():
+    _setup_logging("bot")
+    from bot import core as bot_core
+    from .outbox import deliver_forever
+
+    updater = bot_core.create_updater()
+    stop_event = threading.Event()
+    sender = threading.Thread(
+        target=deliver_forever, args=(updater.bot, stop_event),
+        name="outbox-sender", daemon=True,
+    )
+    sender.start()
+
+    from roster import service as roster_service
+    roster_service.warm_start()
+
+    _, idle = bot_core.run_bot(updater, schedule_sync=False)
+    try:
+        idle()
+    finally:
+        stop_event.set()
+        sender.join(timeout=5)
+
+
+def notify_role():
+    _setup_logging("notify")
+    from grpc_server import server as grpc_server
+    from .outbox import OutboxBot
+
+    stop_event = _stop_event()
+    server = grpc_server.start_server(OutboxBot())
+    stop_event.wait()
+    server.stop(grace=5)
+
+
+def sync_role():
+    _setup_logging("sync")
+    from config import settings
+    from sync import engine as sync_engine
+    from ledger import writer as ledger_writer
+
+    stop_event = _stop_event()
+    # Jurnal buferini faqat shu jarayon yozadi (bitta yozuvchi - takrorlanish yo'q)
+    ledger_writer.start_flusher(stop_event)
+
+    # JobQueue bilan bir xil: birinchi tekshiruv 60 soniyadan keyin
+    interval, last_full_sync = settings.sync_interval, 0.0
+    delay = 60
+    while not stop_event.wait(delay):
+        interval, last_full_sync = sync_engine.run_scheduled_sync(interval, last_full_sync)
+        logger.info(f"[AUTO-SYNC] Keyingi tekshiruv {interval} soniyadan keyin.")
+        delay = interval
+
+
+# To'lov xabarnomalari birinchi bo'lib portga bog'lanadi
+ROLES = {
+    "notify": notify_role,
+    "bot": bot_role,
+    "sync": sync_role,
+}
+
+
+class _RoleState:
+    def __init__(self, name, target):
+        self.name = name
+        self.target = target
+        self.process = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.backoff = RESTART_BACKOFF_MIN
+        self.restart_at = 0.0
+
+
+def run():
+    """Rollarni ishga tushiradi va to'xtaganlarini qayta ishga tushiradi (bloklaydi)."""
+    # grpc fork'dan keyin ishlamaydi, shuning uchun jarayonlar "spawn" bilan yaratiladi
+    ctx = multiprocessing.get_context("spawn")
+    roles = [_RoleState(name, target) for name, target in ROLES.items()]
+
+    stopping = _stop_event()
+
+    def start(role):
+        role.process = ctx.Process(target=role.target, name=role.name)
+        role.process.start()
+        role.started_at = time.monotonic()
+        suffix = f", {role.restarts}-qayta ishga tushirish" if role.restarts else ""
+        logger.info(f"'{role.name}' jarayoni ishga tushdi (pid {role.process.pid}{suffix}).")
+
+    for role in roles:
+        start(role)
+
+    while not stopping.wait(1.0):
+        now = time.monotonic()
+        for role in roles:
+            if role.process is not None:
+                if role.process.is_alive():
+                    continue
+                uptime = now - role.started_at
+                if uptime >= STABLE_RUN_SECONDS:
+                    role.backoff = RESTART_BACKOFF_MIN
+                logger.error(
+                    f"'{role.name}' jarayoni to'xtadi (kod {role.process.exitcode}, {uptime:.0f}s ishladi). "
+                    f"{role.backoff:.0f}s dan keyin qayta ishga tushiriladi."
+                )
+                role.process = None
+                role.restart_at = now + role.backoff
+                role.backoff = min(role.backoff * 2, RESTART_BACKOFF_MAX)
+            elif now >= role.restart_at:
+                role.restarts += 1
+                start(role)
+
+    logger.info("Jarayonlar to'xtatilmoqda...")
+    for role in roles:
+        if role.process is not None and role.process.is_alive():
+            role.process.terminate()
+    for role in roles:
+        if role.process is not None:
+            role.process.join(timeout=10)
+            if role.process.is_alive():
+                logger.warning(f"'{role.name}' jarayoni to'xtamadi - majburan o'ldirilmoqda.")
+                role.process.kill()
@@ -0,0 +1,98 @@
+# telegram-bot-admin/runtime/telegram_aio.py
+"""
+grpc.aio xabarnoma serveri uchun Telegram'ga xabar yuboruvchilar.
+
+PTB 13 Bot'i sinxron (urllib3): uning send_message'ini tsiklda chaqirish
+butun tsiklni to'xtatib qo'yadi. Shuning uchun Bot API manzili ma'lum bo'lsa,
+sendMessage to'g'ridan-to'g'ri httpx.AsyncClient (keep-alive ulanishlar puli)
+orqali yuboriladi. OutboxBot kabi mahalliy "bot"lar esa tsiklning standart
+oqimlar pulida chaqiriladi.
+"""
+import asyncio
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# PTB Request bilan bir xil (connect_timeout=20, read_timeout=20)
+SEND_TIMEOUT = 20.0
+
+
+class TelegramAPIError(Exception):
+    """Bot API ok=false javobi (masalan, 429 yoki noto'g'ri chat_id)."""
+
+    def __init__(self, description, error_code=None):
+        super().__init__(description)
+        self.error_code = error_code
+
+
+class AsyncTelegramSender:
+    """sendMessage'ni httpx orqali asinxron chaqiradi (faqat tsikl ichida ishlatiladi)."""
+
+    def __init__(self, bot_url, max_connections=None):
+        # bot_url: "https://api.telegram.org/bot<token>" (PTB Bot.base_url bilan bir xil)
+        self.bot_url = bot_url.rstrip("/")
+        self.max_connections = max_connections or settings.telegram_send_connections
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            # httpx faqat asinxron server ishga tushganda kerak
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                timeout=SEND_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def send_message(self, chat_id, text, parse_mode=None, message_thread_id=None):
+        payload = {"chat_id": chat_id, "text": text}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+        if message_thread_id:
+            payload["message_thread_id"] = message_thread_id
+
+        response = await self._get_client().post(f"{self.bot_url}/sendMessage", json=payload)
+        try:
+            data = response.json()
+        except ValueError:
+            raise TelegramAPIError(f"HTTP {response.status_code}: JSON bo'lmagan javob", response.status_code)
+        if not data.get("ok"):
+            raise TelegramAPIError(data.get("description") or f"HTTP {response.status_code}", data.get("error_code"))
+        return data.get("result")
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class ThreadSender:
+    """Sinxron bot.send_message'ni tsiklni to'xtatmasdan (oqimlar pulida) chaqiradi."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def send_message(self, chat_id, text, parse_mode=None, message_thread_id=None):
+        return await asyncio.to_thread(
+            self.bot.send_message,
+            chat_id=chat_id, text=text, parse_mode=parse_mode, message_thread_id=message_thread_id,
+        )
+
+    async def aclose(self):
+        pass
+
+
+def sender_for(bot):
+    """PTB Bot uchun AsyncTelegramSender, boshqa obyektlar (OutboxBot) uchun ThreadSender."""
+    if bot is None:
+        return None
+    bot_url = getattr(bot, "base_url", None)
+    if isinstance(bot_url, str) and bot_url:
+        return AsyncTelegramSender(bot_url)
+    return ThreadSender(bot)
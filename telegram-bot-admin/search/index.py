@@ -0,0 +1,347 @@
+# telegram-bot-admin/search/index.py
+"""
+O'quvchilarni ism, telefon, shartnoma raqami yoki hisob raqami bo'yicha qidirish
+uchun xotiradagi indeks.
+
+- Ismlar (full_name va parent_name) normallashtirilgan tokenlarga bo'linadi:
+  kichik harf, apostroflarsiz, kirill -> lotin. Tokenlar lug'ati ustidan
+  trigram indeksi quriladi - xato yozilgan so'rovlar ham topiladi.
+- Telefon (mahalliy 9 raqam), shartnoma va hisob raqamlari tartiblangan
+  ro'yxatlarda saqlanadi va bisect orqali prefiks bo'yicha qidiriladi.
+- Indeks ListStudents natijasi bilan farq bo'yicha (faqat o'zgargan
+  o'quvchilar) yangilanadi.
+"""
+import bisect
+import heapq
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+_CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo", "ж": "j",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "x", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "", "ы": "i", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya", "ў": "o", "қ": "q", "ғ": "g", "ҳ": "h",
+}
+_TRANSLATE = str.maketrans(_CYRILLIC_TO_LATIN)
+_APOSTROPHES = re.compile(r"['`´ʻʼ‘’]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Ism maydonlari vazni: o'quvchi ismi ota-ona ismidan muhimroq
+FULL_NAME_WEIGHT = 1.0
+PARENT_NAME_WEIGHT = 0.6
+
+# Token mos kelish baholari
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.6
+MIN_TRIGRAM_SIMILARITY = 0.4
+# Qisqa so'rov tokeni (masalan "a") butun lug'atga yoyilib ketmasligi uchun
+MAX_PREFIX_EXPANSION = 200
+
+
+def normalize_name(text):
+    """Ismni qidiruv tokenlariga aylantiradi."""
+    text = _APOSTROPHES.sub("", (text or "").lower()).translate(_TRANSLATE)
+    return [token for token in _NON_WORD.split(text) if token]
+
+
+def normalize_phone(phone):
+    """Telefonning mahalliy qismi: +998 90 123-45-67 -> 901234567."""
+    digits = re.sub(r"\D", "", phone or "")
+    if len(digits) >= 12 and digits.startswith("998"):
+        digits = digits[3:]
+    return digits
+
+
+def normalize_code(code):
+    """Shartnoma/hisob raqami: katta harf, faqat harf va raqamlar."""
+    return re.sub(r"[^0-9A-Z]", "", (code or "").upper())
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _PrefixIndex:
+    """Tartiblangan (kalit, id) ro'yxati ustida prefiks qidiruvi."""
+
+    def __init__(self):
+        self._entries = []
+
+    def rebuild(self, pairs):
+        self._entries = sorted(pairs)
+
+    def add(self, key, doc_id):
+        if key:
+            bisect.insort(self._entries, (key, doc_id))
+
+    def remove(self, key, doc_id):
+        if not key:
+            return
+        i = bisect.bisect_left(self._entries, (key, doc_id))
+        if i < len(self._entries) and self._entries[i] == (key, doc_id):
+            del self._entries[i]
+
+    def search(self, prefix, limit):
+        """Qaytaradi: [(id, to'liq_mos_kelish)] - avval to'liq mos kelganlar."""
+        if not prefix:
+            return []
+        result = []
+        i = bisect.bisect_left(self._entries, (prefix, ""))
+        while i < len(self._entries) and len(result) < limit:
+            key, doc_id = self._entries[i]
+            if not key.startswith(prefix):
+                break
+            result.append((doc_id, key == prefix))
+            i += 1
+        return result
+
+
+class StudentIndex:
+    """O'quvchilar qidiruv indeksi (oqimlar uchun xavfsiz)."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.students = {}              # id -> Student
+        self._keys = {}                 # id -> indekslangan maydonlar (o'zgarishni aniqlash uchun)
+        self._doc_tokens = {}           # id -> {token: vazn}
+        self._postings = {}             # token -> {id: vazn}
+        self._vocabulary = []           # tartiblangan tokenlar (prefiks qidiruvi uchun)
+        self._trigrams = defaultdict(set)  # trigram -> tokenlar
+        self._phones = _PrefixIndex()
+        self._codes = _PrefixIndex()    # shartnoma va hisob raqamlari
+        self.refreshed_at = 0.0
+
+    def __len__(self):
+        return len(self.students)
+
+    @staticmethod
+    def _index_key(student):
+        return (student.full_name, student.parent_name, student.phone,
+                student.contract_number, student.account_id)
+
+    def _name_weights(self, student):
+        weights = {}
+        for token in normalize_name(student.parent_name):
+            weights[token] = PARENT_NAME_WEIGHT
+        for token in normalize_name(student.full_name):
+            weights[token] = FULL_NAME_WEIGHT
+        return weights
+
+    def _code_keys(self, student):
+        return {normalize_code(student.contract_number), normalize_code(student.account_id)} - {""}
+
+    def _add_tokens(self, student_id, weights):
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+                for gram in trigrams(token):
+                    self._trigrams[gram].add(token)
+            postings[student_id] = weight
+
+    def _remove_tokens(self, student_id, weights):
+        for token in weights:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(student_id, None)
+            if not postings:
+                del self._postings[token]
+                i = bisect.bisect_left(self._vocabulary, token)
+                if i < len(self._vocabulary) and self._vocabulary[i] == token:
+                    del self._vocabulary[i]
+                for gram in trigrams(token):
+                    self._trigrams[gram].discard(token)
+
+    def _remove(self, student_id):
+        student = self.students.pop(student_id, None)
+        if student is None:
+            return
+        self._keys.pop(student_id, None)
+        self._remove_tokens(student_id, self._doc_tokens.pop(student_id, {}))
+        self._phones.remove(normalize_phone(student.phone), student_id)
+        for code in self._code_keys(student):
+            self._codes.remove(code, student_id)
+
+    def upsert(self, student):
+        """Bitta o'quvchini qo'shadi yoki yangilaydi (masalan, bot orqali tahrirdan keyin)."""
+        with self._lock:
+            key = self._index_key(student)
+            if self._keys.get(student.id) == key:
+                self.students[student.id] = student  # status kabi maydonlar yangilanadi
+                return False
+            self._remove(student.id)
+            self.students[student.id] = student
+            self._keys[student.id] = key
+            self._doc_tokens[student.id] = self._name_weights(student)
+            self._add_tokens(student.id, self._doc_tokens[student.id])
+            self._phones.add(normalize_phone(student.phone), student.id)
+            for code in self._code_keys(student):
+                self._codes.add(code, student.id)
+            return True
+
+    def remove_account(self, account_id):
+        with self._lock:
+            for student_id, student in list(self.students.items()):
+                if student.account_id == account_id:
+                    self._remove(student_id)
+
+    def build(self, students):
+        """Indeksni noldan quradi (tartiblash bir marta bajariladi)."""
+        with self._lock:
+            self._reset()
+            phones, codes = [], []
+            for student in students:
+                self.students[student.id] = student
+                self._keys[student.id] = self._index_key(student)
+                self._doc_tokens[student.id] = self._name_weights(student)
+                for token, weight in self._doc_tokens[student.id].items():
+                    self._postings.setdefault(token, {})[student.id] = weight
+                phone = normalize_phone(student.phone)
+                if phone:
+                    phones.append((phone, student.id))
+                codes.extend((code, student.id) for code in self._code_keys(student))
+            self._vocabulary = sorted(self._postings)
+            for token in self._vocabulary:
+                for gram in trigrams(token):
+                    self._trigrams[gram].add(token)
+            self._phones.rebuild(phones)
+            self._codes.rebuild(codes)
+            self.refreshed_at = time.time()
+
+    def refresh(self, students):
+        """
+        Indeksni yangi ro'yxat bilan farq bo'yicha yangilaydi.
+        Qaytaradi: {"added_or_changed": n, "removed": m}
+        """
+        with self._lock:
+            if not self.students:
+                self.build(students)
+                return {"added_or_changed": len(self.students), "removed": 0}
+            seen = set()
+            changed = 0
+            for student in students:
+                seen.add(student.id)
+                if self.upsert(student):
+                    changed += 1
+            removed = [student_id for student_id in self.students if student_id not in seen]
+            for student_id in removed:
+                self._remove(student_id)
+            self.refreshed_at = time.time()
+            return {"added_or_changed": changed, "removed": len(removed)}
+
+    def _match_token(self, token, enough):
+        """
+        So'rov tokeni uchun {lug'at_tokeni: baho}.
+        Trigram (xato yozilgan) mosliklari faqat aniq va prefiks mosliklar
+        `enough` tadan kam o'quvchini qamraganda qidiriladi.
+        """
+        matches = {}
+        covered = 0
+        if token in self._postings:
+            matches[token] = EXACT_SCORE
+            covered += len(self._postings[token])
+        i = bisect.bisect_left(self._vocabulary, token)
+        end = min(i + MAX_PREFIX_EXPANSION, len(self._vocabulary))
+        while i < end and self._vocabulary[i].startswith(token):
+            if self._vocabulary[i] not in matches:
+                matches[self._vocabulary[i]] = PREFIX_SCORE
+                covered += len(self._postings[self._vocabulary[i]])
+            i += 1
+        if len(token) >= 3 and covered < enough:
+            grams = trigrams(token)
+            counts = defaultdict(int)
+            for gram in grams:
+                for candidate in self._trigrams.get(gram, ()):
+                    counts[candidate] += 1
+            for candidate, common in counts.items():
+                if candidate in matches:
+                    continue
+                similarity = common / (len(grams) + len(candidate) + 1 - common)
+                if similarity >= MIN_TRIGRAM_SIMILARITY:
+                    matches[candidate] = FUZZY_SCORE * similarity
+        return matches
+
+    def _search_names(self, tokens, limit):
+        """
+        Eng kam o'quvchini qamragan so'rov tokeni nomzodlarni beradi, qolgan
+        tokenlar faqat shu nomzodlarning o'z tokenlari bilan solishtiriladi -
+        shunda keng tarqalgan ismlar (masalan "ali") qidiruvni sekinlashtirmaydi.
+        Hech narsaga mos kelmagan so'rov tokenlari e'tiborga olinmaydi.
+        """
+        token_matches = []
+        for token in tokens:
+            matches = self._match_token(token, enough=limit)
+            if matches:
+                covered = sum(len(self._postings[vocab_token]) for vocab_token in matches)
+                token_matches.append((covered, matches))
+        if not token_matches:
+            return {}
+        token_matches.sort(key=lambda item: item[0])
+
+        scores = {}
+        for vocab_token, token_score in token_matches[0][1].items():
+            for student_id, weight in self._postings[vocab_token].items():
+                score = token_score * weight
+                if score > scores.get(student_id, 0.0):
+                    scores[student_id] = score
+        hits = dict.fromkeys(scores, 1)
+
+        for _, matches in token_matches[1:]:
+            for student_id in scores:
+                best = 0.0
+                for doc_token, weight in self._doc_tokens[student_id].items():
+                    token_score = matches.get(doc_token)
+                    if token_score and token_score * weight > best:
+                        best = token_score * weight
+                if best:
+                    scores[student_id] += best
+                    hits[student_id] += 1
+        # Ko'proq so'rov tokeni mos kelganlar birinchi
+        return {student_id: hits[student_id] * 10 + score for student_id, score in scores.items()}
+
+    def search(self, query, limit=10):
+        """
+        Qaytaradi: bahosi bo'yicha tartiblangan [(Student, baho)] ro'yxati.
+        Raqamli so'rov telefon, shartnoma va hisob raqamlaridan, matnli so'rov
+        ismlardan qidiriladi.
+        """
+        with self._lock:
+            scores = defaultdict(float)
+            digits = re.sub(r"\D", "", query)
+            code = normalize_code(query)
+
+            if len(digits) >= 3 and len(digits) >= len(code) - 1:
+                # "+998 90 12" kabi qisman yozilgan xalqaro raqam ham mahalliy qism bo'yicha qidiriladi
+                variants = {normalize_phone(digits)}
+                if digits.startswith("998") and len(digits) > 3:
+                    variants.add(digits[3:])
+                for variant in variants:
+                    for student_id, exact in self._phones.search(variant, limit * 5):
+                        scores[student_id] = max(scores[student_id], 20.0 if exact else 15.0)
+            if len(code) >= 2 and any(ch.isdigit() for ch in code):
+                for student_id, exact in self._codes.search(code, limit * 5):
+                    scores[student_id] = max(scores[student_id], 30.0 if exact else 16.0)
+
+            tokens = [token for token in normalize_name(query) if not token.isdigit()]
+            if tokens:
+                for student_id, score in self._search_names(tokens, limit).items():
+                    scores[student_id] += score
+
+            ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self.students[item[0]].full_name))
+            return [(self.students[student_id], score) for student_id, score in ranked[:limit]]
+
+
+student_index = StudentIndex()
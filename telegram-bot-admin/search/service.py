@@ -0,0 +1,45 @@
+# telegram-bot-admin/search/service.py
+
+import logging
+import threading
+import time
+from config import settings
+from database import db
+from grpc_client import client as grpc_client
+from .index import student_index
+
+logger = logging.getLogger(__name__)
+
+_refresh_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Qidiruv indeksini kerak bo'lsa yangilab qaytaradi.
+    Indeks oxirgi sinxronizatsiyadan (boshqa jarayonda bo'lsa ham - sync_runs
+    jadvali orqali) oldin qurilgan yoki search_index_ttl dan eski bo'lsa,
+    ListStudents natijasi bilan farq bo'yicha yangilanadi.
+    Qaytaradi: (index, error)
+    """
+    with _refresh_lock:
+        last_sync = db.get_last_sync_finished_at()
+        age = time.time() - student_index.refreshed_at
+        if student_index.refreshed_at >= last_sync and age < settings.search_index_ttl:
+            return student_index, None
+
+        started_at = time.perf_counter()
+        students, error = grpc_client.list_students()
+        if error:
+            # Eski indeks bo'lsa u bilan ishlashda davom etamiz
+            if student_index.refreshed_at:
+                logger.warning(f"Qidiruv indeksini yangilab bo'lmadi, eskisi ishlatiladi: {error}")
+                return student_index, None
+            return None, error
+
+        stats = student_index.refresh(students)
+        logger.info(
+            f"Qidiruv indeksi yangilandi: {len(student_index)} ta o'quvchi, "
+            f"o'zgargan {stats['added_or_changed']}, o'chirilgan {stats['removed']} "
+            f"({(time.perf_counter() - started_at) * 1000:.0f} ms)"
+        )
+        return student_index, None
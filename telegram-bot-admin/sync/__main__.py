@@ -0,0 +1,36 @@
+# telegram-bot-admin/sync/__main__.py
+"""
+Google Sheets sinxronizatsiyasini Telegram botsiz ishga tushiradi (cron / k8s CronJob uchun).
+
+Ishlatish:
+    python -m sync                 # to'liq sinxronizatsiya
+    python -m sync --changed-only  # faqat o'zgargan varaqlar
+
+Natija (bosqich vaqtlari bilan) stdout'ga JSON ko'rinishida chiqadi, loglar stderr'ga.
+Chiqish kodi: 0 - muvaffaqiyatli, 1 - qisman (ba'zi varaqlarda xato), 2 - muvaffaqiyatsiz.
+"""
+import argparse
+import json
+import sys
+
+from database import db
+from logging_setup import setup_logging
+from . import engine
+
+EXIT_CODES = {"ok": 0, "partial": 1, "failed": 2}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sync", description="Google Sheets -> payme-service sinxronizatsiyasi")
+    parser.add_argument("--changed-only", action="store_true", help="o'zgarmagan varaqlarni o'tkazib yuborish")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    db.init_db()
+    result = engine.execute_sync(lambda text: None, force=not args.changed_only, trigger="cli")
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return EXIT_CODES.get(result["status"], 2)
+
+if __name__ == "__main__":
+    sys.exit(main())
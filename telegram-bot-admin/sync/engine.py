@@ -0,0 +1,914 @@
+# telegram-bot-admin/sync/engine.py
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import grpc
+from config import settings, SpreadsheetConfig, SHEET_COLUMNS_CONFIG, START_ROW
+from database import db
+from generated import payment_pb2
+from grpc_client import client as grpc_client
+from grpc_client import aio_client
+from runtime import aio
+from roster import service as roster_service
+from .metrics import SyncRun
+from .pipeline import BackgroundWorker, prefetch
+from .quota import SheetsQuota
+
+logger = logging.getLogger(__name__)
+
+# --- Yordamchi Funksiyalar ---
+def get_gsheet_client(quota=None):
+    """quota - SheetsQuota: berilsa, har bir API so'rovi shu byudjet ichida yuboriladi."""
+    # gspread va google-auth og'ir modullar: ular faqat birinchi sinxronizatsiyada
+    # yuklanadi, shunda bot va gRPC server ishga tushishi kechikmaydi.
+    try:
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        scopes = ["https://www.googleapis.com/auth/spreadsheets"]
+        creds = Credentials.from_service_account_file(settings.google_creds_file, scopes=scopes)
+        client = gspread.authorize(creds)
+        # gspread 6: client.http_client.session, eski versiyalarda client.session
+        session = getattr(getattr(client, "http_client", None), "session", None) or getattr(client, "session", None)
+        if session is not None:
+            session.hooks["response"].append(_record_sheets_response)
+            if quota is not None:
+                session.request = quota.wrap(session.request)
+        return client, None
+    except Exception as e:
+        logger.error(f"Google Sheets'ga ulanishda xatolik: {e}")
+        return None, str(e)
+
+def _record_sheets_response(response, *args, **kwargs):
+    """Har bir Sheets API javobini kvota hisobi uchun qayd etadi (/diag)."""
+    try:
+        db.record_sheets_api_call(response.status_code)
+    except Exception as e:
+        logger.debug("Sheets so'rovini qayd etib bo'lmadi: %s", e)
+
+def normalize_text(s):
+    return (s or "").strip().lower().replace(" ", "")
+
+def safe_get(row, index):
+    """Ro'yxatdan indeks bo'yicha xavfsiz olish"""
+    try:
+        val = row[index]
+        return str(val).strip() if val else ""
+    except IndexError:
+        return ""
+
+class _Fingerprint:
+    """
+    Varaq qatorlari xeshi, qismlab (oynalab) hisoblanadi. Sheets API diapazon
+    oxiridagi bo'sh qatorlarni qaytarmaydi, shuning uchun bo'sh qatorlar keyin
+    ma'lumotli qator kelgandagina xeshga qo'shiladi - natija butun varaqni bir
+    marta o'qigandagi bilan bir xil.
+    """
+
+    def __init__(self):
+        self._digest = hashlib.sha1()
+        self._pending_blank = 0
+
+    def add(self, rows, window_rows=None):
+        """window_rows - oyna uzunligi (oxiridagi qaytarilmagan bo'sh qatorlar bilan)."""
+        for row in rows:
+            if not row:
+                self._pending_blank += 1
+                continue
+            self._digest.update(b"\x1e" * self._pending_blank)
+            self._pending_blank = 0
+            self._digest.update("\x1f".join(str(c).strip() for c in row).rstrip("\x1f").encode("utf-8"))
+            self._digest.update(b"\x1e")
+        if window_rows is not None:
+            self._pending_blank += max(window_rows - len(rows), 0)
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+def _sheet_fingerprint(rows):
+    """Varaq ma'lumotlar diapazonining barqaror xeshi (o'zgarishni aniqlash uchun)."""
+    fingerprint = _Fingerprint()
+    fingerprint.add(rows)
+    return fingerprint.hexdigest()
+
+def _data_range(sheet_name, first_row=START_ROW, last_row=None, columns=SHEET_COLUMNS_CONFIG):
+    last_col = max(columns.values()) + 1
+    safe_name = sheet_name.replace("'", "''")
+    return f"'{safe_name}'!A{first_row}:{_column_letter(last_col)}{last_row or ''}"
+
+def _column_letter(col):
+    letters = ""
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+def _read_sheets(spreadsheet, sheet_names, first_row=START_ROW, last_row=None, columns=SHEET_COLUMNS_CONFIG):
+    """Barcha varaqlarning ma'lumotlar diapazonini bitta API so'rovi bilan o'qiydi.
+
+    first_row/last_row berilsa, faqat shu qatorlar o'qiladi.
+    Natija: {varaq_nomi: (worksheet, rows)}; mavjud bo'lmagan varaqlar tashlab ketiladi.
+    """
+    worksheets = {ws.title: ws for ws in spreadsheet.worksheets()}
+    existing = []
+    for name in sheet_names:
+        if name in worksheets:
+            existing.append(name)
+        else:
+            logger.error(f"Varaq topilmadi: {name}")
+    if not existing:
+        return {}
+
+    response = spreadsheet.values_batch_get([_data_range(name, first_row, last_row, columns) for name in existing])
+    value_ranges = response.get("valueRanges", [])
+    return {
+        name: (worksheets[name], value_range.get("values", []))
+        for name, value_range in zip(existing, value_ranges)
+    }
+
+def _parse_rows(rows, branch_map, db_students_by_uuid, start_row=START_ROW, columns=SHEET_COLUMNS_CONFIG):
+    """
+    Varaq qatorlarini o'quvchi ma'lumotlariga aylantiradi (rows[0] - start_row-qator).
+    columns - ustunlar xaritasi (jadvalning o'z ustunlari bo'lsa SpreadsheetConfig.column_map).
+    Yield: (qator_raqami, student_data). Yangilanadiganlarda 'id' bo'ladi.
+    """
+    for i, row in enumerate(rows):
+        row_num = i + start_row
+
+        student_name_raw = safe_get(row, columns["student_name"])
+        if not student_name_raw:
+            continue
+
+        b_name_raw = safe_get(row, columns["branch_name"])
+        b_name_norm = normalize_text(b_name_raw)
+        b_id = branch_map.get(b_name_norm)
+
+        if not b_id:
+            continue
+
+        acc_id = safe_get(row, columns["account_id"]).upper().replace(" ", "")
+        uuid_val = safe_get(row, columns["uuid"])
+
+        try:
+            discount_str = safe_get(row, columns["discount"]).replace('%', '')
+            discount_val = float(discount_str) if discount_str else 0.0
+        except:
+            discount_val = 0.0
+
+        # Statusni aniqlash: Sheetda 'amalda' bo'lsa -> True
+        is_active = True
+        student_data = {
+            'branch_id': b_id,
+            'account_id': acc_id,
+            'full_name': student_name_raw,
+            'parent_name': safe_get(row, columns["parent_name"]),
+            'phone': safe_get(row, columns["phone"]),
+            'group_name': f"{safe_get(row, columns['class'])}-sinf",
+            'contract_number': safe_get(row, columns["contract_number"]),
+            'discount_percent': discount_val,
+            'status': is_active
+        }
+
+        if uuid_val and uuid_val in db_students_by_uuid:
+            student_data['id'] = uuid_val
+
+        yield row_num, student_data
+
+def _created_cells(row_num, student_data, student_id, account_id, columns=SHEET_COLUMNS_CONFIG):
+    """Yangi yaratilgan o'quvchi uchun varaqqa yoziladigan UUID (va Account ID) kataklari."""
+    import gspread
+
+    cells = [gspread.Cell(row_num, columns["uuid"] + 1, student_id)]
+    if not student_data['account_id']:
+        cells.append(gspread.Cell(row_num, columns["account_id"] + 1, account_id))
+    return cells
+
+# Server SyncStudents'ni qo'llab-quvvatlamasa (UNIMPLEMENTED), jarayon qayta
+# ishga tushguncha batch RPC'lar ishlatiladi.
+_streaming_unsupported = False
+
+def _sync_sheet_rows(
+    worksheet, rows, branch_map, db_students_by_uuid, run, start_row=START_ROW, columns=SHEET_COLUMNS_CONFIG,
+):
+    """
+    Bitta varaq qatorlarini (rows[0] - start_row-qator) bazaga sinxronlaydi.
+    Qaytaradi: varaqqa yozilgan kataklar ro'yxati (sonlar `run` ga yoziladi)
+    """
+    updates_for_sheet = _send_sheet_rows(worksheet, rows, branch_map, db_students_by_uuid, run, start_row, columns)
+    _write_back(worksheet, updates_for_sheet, run)
+    return updates_for_sheet
+
+def _write_back(worksheet, cells, run):
+    if cells:
+        logger.debug("Varaqqa %d ta katak yozilmoqda", len(cells))
+        with run.phase("write_back"):
+            worksheet.update_cells(cells, value_input_option='USER_ENTERED')
+        run.add("cells_written", len(cells))
+
+def _send_sheet_rows(
+    worksheet, rows, branch_map, db_students_by_uuid, run, start_row=START_ROW, columns=SHEET_COLUMNS_CONFIG,
+):
+    """
+    Qatorlarni bazaga yuboradi (SyncStudents oqimi yoki batch RPC'lar).
+    Qaytaradi: varaqqa yozilishi kerak bo'lgan kataklar ro'yxati.
+    """
+    global _streaming_unsupported
+
+    updates_for_sheet = None
+    if settings.sync_streaming and not _streaming_unsupported:
+        try:
+            updates_for_sheet = _stream_sheet_rows(
+                worksheet, rows, branch_map, db_students_by_uuid, run, start_row, columns,
+            )
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                raise
+            _streaming_unsupported = True
+            logger.warning("payme-service SyncStudents oqimini qo'llab-quvvatlamaydi - batch RPC'larga o'tildi.")
+
+    if updates_for_sheet is None:
+        updates_for_sheet = _batch_sheet_rows(
+            worksheet, rows, branch_map, db_students_by_uuid, run, start_row, columns,
+        )
+    return updates_for_sheet
+
+def _stream_sheet_rows(
+    worksheet, rows, branch_map, db_students_by_uuid, run, start_row=START_ROW, columns=SHEET_COLUMNS_CONFIG,
+):
+    """
+    Qatorlarni SyncStudents oqimi orqali yuboradi: qatorlar tahlil qilinishi bilan
+    serverga ketadi, server esa ularni partiyalab yozib, natijani qator bo'yicha qaytaradi.
+    Partiya yozilmasa server qatorlarni birma-bir qayta yozadi, shuning uchun REJECTED
+    faqat o'zi yozilmagan qatorga qaytadi.
+
+    Oqim yarmida uzilsa (RpcError), serverda allaqachon yaratilgan qatorlarning
+    kataklari baribir qaytariladi - aks holda ular varaqqa yozilmay qolib, keyingi
+    sinxronlashda takror yaratilardi. Xato `run` ga yoziladi.
+    Qaytaradi: varaqqa yoziladigan kataklar ro'yxati.
+    """
+    sent = {}
+
+    def row_stream():
+        parsed = _parse_rows(rows, branch_map, db_students_by_uuid, start_row, columns)
+        while True:
+            # gRPC so'rovlarni alohida oqimda o'qiydi - tahlil vaqti shu yerda o'lchanadi
+            with run.phase("reconcile"):
+                item = next(parsed, None)
+            if item is None:
+                return
+            row_num, student_data = item
+            sent[row_num] = student_data
+            yield row_num, student_data
+
+    updates_for_sheet = []
+    created = updated = rejected = 0
+    try:
+        with run.phase("batch_rpc"):
+            for result in grpc_client.sync_students(row_stream()):
+                if result.outcome == payment_pb2.SyncStudentResult.CREATED:
+                    created += 1
+                    updates_for_sheet.extend(
+                        _created_cells(result.row_ref, sent[result.row_ref], result.id, result.account_id, columns)
+                    )
+                elif result.outcome == payment_pb2.SyncStudentResult.UPDATED:
+                    updated += 1
+                else:
+                    rejected += 1
+                    run.error(f"{worksheet.title}: {result.row_ref}-qator - {result.reason}")
+    except grpc.RpcError as e:
+        # Hech narsa olinmagan bo'lsa UNIMPLEMENTED batch RPC'larga o'tish uchun yuqoriga chiqadi
+        if e.code() == grpc.StatusCode.UNIMPLEMENTED and not (created or updated or rejected):
+            raise
+        logger.error(f"SyncStudents oqimi uzildi ({created} ta yaratilgan qator varaqqa yoziladi): {e.details()}")
+        run.error(f"{worksheet.title}: SyncStudents - {e.details()}")
+    finally:
+        logger.debug("Oqim natijasi: yaratildi %d, yangilandi %d, rad etildi %d", created, updated, rejected)
+        run.add("created", created)
+        run.add("updated", updated)
+    return updates_for_sheet
+
+def _batch_sheet_rows(
+    worksheet, rows, branch_map, db_students_by_uuid, run, start_row=START_ROW, columns=SHEET_COLUMNS_CONFIG,
+):
+    """Eski yo'l: qatorlar yig'ilib, CreateStudentsBatch/UpdateStudentsBatch bilan yuboriladi."""
+    to_create = []
+    to_update = []
+    updates_for_sheet = []
+
+    with run.phase("reconcile"):
+        for row_num, student_data in _parse_rows(rows, branch_map, db_students_by_uuid, start_row, columns):
+            if 'id' in student_data:
+                to_update.append(student_data)
+            else:
+                student_data['row_number'] = row_num
+                to_create.append(student_data)
+
+    if to_update:
+        logger.debug("Yangilanmoqda: %d ta", len(to_update))
+        with run.phase("batch_rpc"):
+            _, err = grpc_client.update_students_batch(to_update)
+        if err:
+            run.error(f"{worksheet.title}: update batch - {err}")
+        else:
+            run.add("updated", len(to_update))
+
+    if to_create:
+        logger.debug("Yaratilmoqda: %d ta", len(to_create))
+        clean_create_list = [{k: v for k, v in s.items() if k != 'row_number'} for s in to_create]
+
+        with run.phase("batch_rpc"):
+            created_students, err = grpc_client.create_students_batch(clean_create_list)
+        if err:
+            logger.error(f"Create batch error: {err}")
+            run.error(f"{worksheet.title}: create batch - {err}")
+        else:
+            run.add("created", len(created_students))
+            with run.phase("reconcile"):
+                created_map = {s.account_id: s for s in created_students}
+
+                for item in to_create:
+                    res = created_map.get(item['account_id'])
+                    # Agar account_id bo'sh bo'lsa, ism va filial orqali topishga harakat qilamiz
+                    if not res:
+                         for s in created_students:
+                             if s.branch_id == item['branch_id'] and normalize_text(s.full_name) == normalize_text(item['full_name']):
+                                 res = s
+                                 break
+
+                    if res:
+                        updates_for_sheet.extend(
+                            _created_cells(item['row_number'], item, res.id, res.account_id, columns)
+                        )
+
+    return updates_for_sheet
+
+def _apply_cells(rows, cells, start_row=START_ROW):
+    """Varaqqa yozilgan kataklarni xotiradagi qatorlarga (rows[0] - start_row-qator) ham qo'llaydi (fingerprint uchun)."""
+    for cell in cells:
+        idx = cell.row - start_row
+        while len(rows) <= idx:
+            rows.append([])
+        row = rows[idx]
+        while len(row) < cell.col:
+            row.append("")
+        row[cell.col - 1] = cell.value
+
+def execute_sync(status_callback, force=True, trigger="manual"):
+    """
+    Asosiy sinxronizatsiya logikasi.
+    status_callback: (str) -> None funksiyasi (xabar berish uchun)
+    force: False bo'lsa, oxirgi sinxronizatsiyadan beri o'zgarmagan varaqlar o'tkazib yuboriladi.
+    trigger: ishga tushirish manbai ("manual", "auto", "cli") - tarixda saqlanadi.
+
+    Har bir ishga tushirish bosqich vaqtlari bilan sync_runs jadvaliga yoziladi.
+    Qaytaradi: SyncRun.to_dict() natijasi.
+    """
+    run = SyncRun(trigger, force)
+    return _finish_run(run, _run_sync(run, status_callback, force))
+
+def _finish_run(run, status):
+    run.finish(status)
+    try:
+        db.record_sync_run(run.to_dict())
+    except Exception as e:
+        logger.error(f"Sinxronizatsiya tarixini saqlashda xatolik: {e}")
+    return run.to_dict()
+
+def _resolve_roster(run, status_callback, roster=None):
+    """
+    Sinxronizatsiya uchun (branch_map, db_students_by_uuid). roster - oldindan
+    boshlangan list_branches_and_students() (Future) yoki None.
+    Xatolikda None (xabar status_callback orqali yuborilgan).
+    """
+    try:
+        with run.phase("roster_fetch"):
+            if roster is None:
+                roster = aio.submit(aio_client.list_branches_and_students())
+            # Qayta ishga tushgandan keyingi birinchi sinxronizatsiya jonli ro'yxatni
+            # kutmaydi: qidiruvlar diskdagi nusxadan, nusxada yo'qlari jonli ro'yxatdan
+            warm = roster_service.warm_lookups(roster, normalize_text)
+            if warm is None:
+                status_callback("⏳ Bazadan ma'lumotlar olinmoqda...")
+                (all_branches, branch_err), (all_students, student_err) = roster.result()
+            else:
+                branch_map, db_students_by_uuid, snapshot_age = warm
+                status_callback(
+                    f"⏳ Ro'yxat nusxasidan ({roster_service.format_age(snapshot_age)} oldin saqlangan) "
+                    f"ishlanmoqda, baza fonda tekshirilmoqda..."
+                )
+
+        if warm is None:
+            if branch_err or student_err:
+                run.error(f"gRPC: {branch_err or student_err}")
+                status_callback(f"❌ Bazadan ma'lumot olib bo'lmadi: {branch_err or student_err}")
+                return None
+
+            if not all_branches:
+                run.error("Bazada filial yo'q")
+                status_callback("❌ DIQQAT: Bazada hech qanday filial yo'q! Avval bot orqali filial yarating.")
+                return None
+
+            branch_map = {normalize_text(b.name): b.id for b in all_branches}
+            db_students_by_uuid = {s.id: s for s in all_students}
+    except Exception as e:
+        run.error(f"Boshlang'ich xatolik: {e}")
+        status_callback(f"❌ Boshlang'ich xatolik: {e}")
+        logger.error(f"Sync init error: {e}")
+        return None
+
+    return branch_map, db_students_by_uuid
+
+class _RosterUnavailable(Exception):
+    """Baza ro'yxatini olib bo'lmadi (xabar allaqachon yuborilgan)."""
+
+class _LazyRoster:
+    """
+    Baza ro'yxati faqat birinchi o'zgargan varaq/oynada olinadi (hech narsa o'zgarmasa -
+    umuman olinmaydi). Bir nechta jadval parallel sinxronlanganda ular bitta
+    _LazyRoster'ni bo'lishadi - ro'yxat bir marta olinadi.
+    """
+
+    def __init__(self, run, status_callback, roster=None):
+        self._run = run
+        self._status_callback = status_callback
+        self._roster = roster
+        self._maps = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._maps is None and not self._failed:
+                self._maps = _resolve_roster(self._run, self._status_callback, self._roster)
+                self._failed = self._maps is None
+            if self._failed:
+                raise _RosterUnavailable()
+            return self._maps
+
+def _state_key(source, sheet_name):
+    """
+    sheet_sync_state kaliti: asosiy jadval (google_spreadsheet_id) varaqlari uchun varaq
+    nomi (avvalgidek), boshqa jadvallar uchun - jadval id'si bilan (nomlar takrorlanishi mumkin).
+    """
+    if source.id == settings.google_spreadsheet_id:
+        return sheet_name
+    return f"{source.id}/{sheet_name}"
+
+def _run_sync(run, status_callback, force):
+    # Jadvallar parallel sinxronlansa ham Sheets so'rovlari bitta daqiqalik byudjetda
+    quota = SheetsQuota(settings.sheets_quota_per_minute)
+    gspread_client, err = get_gsheet_client(quota)
+    if err:
+        run.error(f"Google Sheets: {err}")
+        status_callback(f"❌ Google Sheets xatosi: {err}")
+        return "failed"
+
+    # Majburiy sinxronizatsiyada baza ro'yxatlari albatta kerak bo'ladi - ular
+    # varaqlarni o'qish bilan parallel (tsiklda) olinadi
+    roster = aio.submit(aio_client.list_branches_and_students()) if force else None
+
+    sources = settings.spreadsheet_list
+    if len(sources) == 1:
+        lazy_roster = _LazyRoster(run, status_callback, roster)
+        return _sync_spreadsheet(run, status_callback, gspread_client, sources[0], force, lazy_roster)
+    return _run_parallel_sync(run, status_callback, gspread_client, sources, force, roster, quota)
+
+def _sync_spreadsheet(run, status_callback, gspread_client, source, force, roster):
+    """Bitta jadvalning varaqlarini sinxronlaydi. roster - _LazyRoster. Qaytaradi: holat."""
+    if settings.sync_window_rows > 0:
+        return _run_windowed_sync(run, status_callback, gspread_client, source, force, roster)
+
+    columns = source.column_map
+    try:
+        status_callback("⏳ Varaqlar o'qilmoqda...")
+        with run.phase("sheets_read"):
+            spreadsheet = gspread_client.open_by_key(source.id)
+            sheets = _read_sheets(spreadsheet, source.worksheets, columns=columns)
+    except Exception as e:
+        run.error(f"Sheets o'qish: {e}")
+        status_callback(f"❌ Google Sheets'dan o'qishda xatolik: {e}")
+        logger.error(f"Sync read error: {e}")
+        return "failed"
+
+    run.add("rows_read", sum(len(rows) for _, rows in sheets.values()))
+    stored = db.get_sheet_fingerprints()
+    fingerprints = {name: _sheet_fingerprint(rows) for name, (_, rows) in sheets.items()}
+    changed = [name for name in sheets if force or stored.get(_state_key(source, name)) != fingerprints[name]]
+    run.add("sheets_changed", len(changed))
+    run.add("sheets_skipped", len(sheets) - len(changed))
+
+    if not changed:
+        final_msg = f"✅ O'zgarish yo'q - {len(sheets)} ta varaq o'tkazib yuborildi."
+        logger.info(final_msg)
+        status_callback(final_msg)
+        return "ok"
+
+    try:
+        branch_map, db_students_by_uuid = roster.get()
+    except _RosterUnavailable:
+        return "failed"
+
+    for sheet_name in changed:
+        worksheet, rows = sheets[sheet_name]
+        try:
+            status_callback(f"⏳ '{sheet_name}' varag'i sinxronlanmoqda...")
+            logger.debug("Varaq sinxronlanmoqda: %s", sheet_name)
+
+            errors_before = len(run.errors)
+            written_cells = _sync_sheet_rows(
+                worksheet, rows, branch_map, db_students_by_uuid, run, columns=columns,
+            )
+
+            # Bot yozgan UUID/ID kataklari keyingi tekshiruvda "o'zgarish" sanalmasligi uchun.
+            # Xatolik bo'lgan varaq xeshi saqlanmaydi - keyingi safar qayta urinib ko'riladi.
+            if len(run.errors) == errors_before:
+                _apply_cells(rows, written_cells)
+                db.set_sheet_fingerprint(_state_key(source, sheet_name), _sheet_fingerprint(rows))
+
+        except Exception as e:
+            logger.error(f"Sheet loop error: {e}", exc_info=True)
+            run.error(f"{sheet_name}: {e}")
+            status_callback(f"⚠️ Xatolik varaqda: {e}")
+
+    return _report_result(run, status_callback)
+
+def _run_parallel_sync(run, status_callback, gspread_client, sources, force, roster, quota):
+    """
+    Bir nechta jadvalni sync_spreadsheet_workers tagacha parallel sinxronlaydi.
+    Har bir jadval o'z SyncRun'ida hisoblanadi: biridagi xatolik boshqalarini
+    to'xtatmaydi, natijalar esa umumiy `run` ga jadvallar bo'yicha vaqtlar bilan qo'shiladi.
+    """
+    callback_lock = threading.Lock()
+
+    def shared_callback(text):
+        with callback_lock:
+            status_callback(text)
+
+    lazy_roster = _LazyRoster(run, shared_callback, roster)
+    shared_callback(f"⏳ {len(sources)} ta jadval sinxronlanmoqda...")
+
+    def sync_one(source):
+        source_run = SyncRun(run.trigger, run.forced)
+        try:
+            status = _sync_spreadsheet(
+                source_run, lambda text: shared_callback(f"[{source.title}] {text}"),
+                gspread_client, source, force, lazy_roster,
+            )
+        except Exception as e:
+            logger.error(f"Spreadsheet sync error ({source.title}): {e}", exc_info=True)
+            source_run.error(str(e))
+            status = "failed"
+        return source_run.finish(status)
+
+    workers = max(min(settings.sync_spreadsheet_workers, len(sources)), 1)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="spreadsheet-sync") as pool:
+        source_runs = list(pool.map(sync_one, sources))
+
+    for source, source_run in zip(sources, source_runs):
+        run.merge(source.title, source_run)
+
+    if all(source_run.status == "failed" for source_run in source_runs):
+        status = "failed"
+    else:
+        status = "partial" if run.errors else "ok"
+
+    icons = {"ok": "✅", "partial": "⚠️", "failed": "❌"}
+    final_msg = (
+        f"{icons[status]} Sinxronizatsiya tugadi! ({len(sources)} ta jadval)\n"
+        f"Yangilandi: {run.counts['updated']}\nQo'shildi: {run.counts['created']}"
+    )
+    if run.counts["sheets_skipped"]:
+        final_msg += f"\nO'zgarmagan varaqlar: {run.counts['sheets_skipped']}"
+    if run.errors:
+        final_msg += f"\n⚠️ Xatolar: {len(run.errors)}"
+    for summary in run.spreadsheets:
+        final_msg += (
+            f"\n{icons[summary['status']]} {summary['name']}: {summary['duration']:.1f}s, "
+            f"yangilandi {summary['updated']}, qo'shildi {summary['created']}"
+        )
+        if summary["errors"]:
+            final_msg += f", xatolar {len(summary['errors'])}"
+    if quota.waited >= 1:
+        final_msg += f"\n⏳ Sheets kvotasi uchun {quota.waited:.0f}s kutildi"
+    logger.info(final_msg)
+    shared_callback(final_msg)
+    return status
+
+def _report_result(run, status_callback):
+    final_msg = f"✅ Sinxronizatsiya tugadi!\nYangilandi: {run.counts['updated']}\nQo'shildi: {run.counts['created']}"
+    if run.counts["sheets_skipped"]:
+        final_msg += f"\nO'zgarmagan varaqlar: {run.counts['sheets_skipped']}"
+    if run.errors:
+        final_msg += f"\n⚠️ Xatolar: {len(run.errors)}"
+    logger.info(final_msg)
+    status_callback(final_msg)
+    return "partial" if run.errors else "ok"
+
+# --- Oynali (windowed) sinxronizatsiya ---
+# Varaq sync_window_rows qatorli oynalar bilan o'qiladi va har bir oyna konveyerdan
+# o'tadi: o'qish (alohida oqim) -> tahlil + RPC (joriy oqim) -> UUID'larni yozish
+# (alohida oqim). Bosqichlar orasidagi navbatlar sync_pipeline_depth bilan
+# chegaralangan: xotirada bir necha oyna turadi, tarmoq kutishlari esa
+# qayta ishlash bilan ustma-ust tushadi. Bosqich vaqtlari shu sababli
+# umumiy davomiylikdan ko'p bo'lishi mumkin (ular parallel).
+
+def _window_key(sheet_name, first_row, last_row):
+    """Oyna xeshi sheet_sync_state jadvalida shu kalit bilan saqlanadi."""
+    return f"{sheet_name}!{first_row}:{last_row}"
+
+def _read_windows(spreadsheet, worksheet, window_rows, run, columns=SHEET_COLUMNS_CONFIG):
+    """Varaqni window_rows qatorli oynalar bilan o'qiydi. Yield: (first_row, last_row, rows)."""
+    # row_count - varaq to'ri hajmi (worksheets() metadata'sidan, qo'shimcha so'rovsiz)
+    last_grid_row = worksheet.row_count
+    first_row = START_ROW
+    while first_row <= last_grid_row:
+        last_row = min(first_row + window_rows - 1, last_grid_row)
+        with run.phase("sheets_read"):
+            response = spreadsheet.values_get(_data_range(worksheet.title, first_row, last_row, columns))
+        rows = response.get("values", [])
+        run.add("rows_read", len(rows))
+        yield first_row, last_row, rows
+        first_row = last_row + 1
+
+def _sync_sheet_windows(spreadsheet, worksheet, roster, stored, run, force, source):
+    """
+    Bitta varaqni oynalar bilan sinxronlaydi. O'zgarmagan oynalar (xeshi saqlangani
+    bilan bir xil) bazaga yuborilmaydi. source - varaq tegishli SpreadsheetConfig.
+    Qaytaradi: (o'zgargan oynalar soni, butun varaq xeshi).
+    """
+    sheet_name = worksheet.title
+    sheet_key = _state_key(source, sheet_name)
+    columns = source.column_map
+    depth = settings.sync_pipeline_depth
+    fingerprint = _Fingerprint()
+
+    def write_back(item):
+        first_row, last_row, rows, cells, ok = item
+        if cells:
+            _write_back(worksheet, cells, run)
+            _apply_cells(rows, cells, first_row)
+        # Oyna xeshi (bot yozgan kataklar bilan) - xatosiz oynalar keyingi safar o'tkazib yuboriladi
+        if ok and cells is not None:
+            db.set_sheet_fingerprint(_window_key(sheet_key, first_row, last_row), _sheet_fingerprint(rows))
+        fingerprint.add(rows, last_row - first_row + 1)
+
+    writer = BackgroundWorker(write_back, depth, name="sheet-writer")
+    changed_windows = 0
+    try:
+        for first_row, last_row, rows in prefetch(
+            _read_windows(spreadsheet, worksheet, settings.sync_window_rows, run, columns), depth, name="sheet-reader",
+        ):
+            if not force and stored.get(_window_key(sheet_key, first_row, last_row)) == _sheet_fingerprint(rows):
+                writer.submit((first_row, last_row, rows, None, True))
+                continue
+            changed_windows += 1
+            # Oldingi oynaning UUID'larini yozib bo'lmagan bo'lsa, yangi o'quvchilar yaratilmaydi
+            writer.raise_if_failed()
+            branch_map, db_students_by_uuid = roster.get()
+            logger.debug("Oyna sinxronlanmoqda: %s %d-%d", sheet_name, first_row, last_row)
+            errors_before = len(run.errors)
+            cells = _send_sheet_rows(worksheet, rows, branch_map, db_students_by_uuid, run, first_row, columns)
+            writer.submit((first_row, last_row, rows, cells, len(run.errors) == errors_before))
+    finally:
+        writer.close()
+
+    return changed_windows, fingerprint.hexdigest()
+
+def _run_windowed_sync(run, status_callback, gspread_client, source, force, roster):
+    try:
+        status_callback("⏳ Varaqlar o'qilmoqda...")
+        with run.phase("sheets_read"):
+            spreadsheet = gspread_client.open_by_key(source.id)
+            worksheets = {ws.title: ws for ws in spreadsheet.worksheets()}
+    except Exception as e:
+        run.error(f"Sheets o'qish: {e}")
+        status_callback(f"❌ Google Sheets'dan o'qishda xatolik: {e}")
+        logger.error(f"Sync read error: {e}")
+        return "failed"
+
+    stored = db.get_sheet_fingerprints()
+    sheet_names = []
+    for sheet_name in source.worksheets:
+        if sheet_name not in worksheets:
+            logger.error(f"Varaq topilmadi: {sheet_name}")
+            continue
+        sheet_names.append(sheet_name)
+        try:
+            status_callback(f"⏳ '{sheet_name}' varag'i sinxronlanmoqda...")
+            errors_before = len(run.errors)
+            changed_windows, fingerprint = _sync_sheet_windows(
+                spreadsheet, worksheets[sheet_name], roster, stored, run, force, source,
+            )
+            run.add("sheets_changed" if changed_windows else "sheets_skipped", 1)
+            if len(run.errors) == errors_before:
+                db.set_sheet_fingerprint(_state_key(source, sheet_name), fingerprint)
+        except _RosterUnavailable:
+            return "failed"
+        except Exception as e:
+            logger.error(f"Sheet loop error: {e}", exc_info=True)
+            run.error(f"{sheet_name}: {e}")
+            run.add("sheets_changed", 1)
+            status_callback(f"⚠️ Xatolik varaqda: {e}")
+
+    if not run.counts["sheets_changed"] and not run.errors:
+        final_msg = f"✅ O'zgarish yo'q - {len(sheet_names)} ta varaq o'tkazib yuborildi."
+        logger.info(final_msg)
+        status_callback(final_msg)
+        return "ok"
+    return _report_result(run, status_callback)
+
+# --- Tanlangan varaq / filial sinxronizatsiyasi ---
+def parse_row_range(text):
+    """
+    "12", "5-40" yoki "5-" ko'rinishidagi qatorlar oralig'i.
+    Qaytaradi: ((first_row, last_row), error); last_row=None - varaq oxirigacha.
+    """
+    first, sep, last = (text or "").strip().partition("-")
+    try:
+        first_row = int(first)
+        last_row = (int(last) if last.strip() else None) if sep else first_row
+    except ValueError:
+        return None, "Qatorlar oralig'i noto'g'ri. Masalan: 12, 5-40 yoki 5-"
+    first_row = max(first_row, START_ROW)
+    if last_row is not None and last_row < first_row:
+        return None, f"Qatorlar oralig'i noto'g'ri (ma'lumotlar {START_ROW}-qatordan boshlanadi)."
+    return (first_row, last_row), None
+
+def execute_targeted_sync(status_callback, sheet_name=None, branch=None, row_range=None):
+    """
+    Faqat bitta varaq (ixtiyoriy qatorlar oralig'i bilan) yoki bitta filialni sinxronlaydi.
+    sheet_name: varaq nomi; row_range: parse_row_range() natijasi.
+    branch: payment_pb2.Branch - shu filial qatorlari. Filial nomidagi varaq bo'lsa faqat
+    u o'qiladi, aks holda barcha varaqlardan shu filial qatorlari olinadi.
+
+    Bazadan faqat tegishli filial(lar) o'quvchilari olinadi, yaratish/yangilash va
+    varaqqa yozish shu qatorlar bilan cheklanadi. Tarixga "targeted" sifatida yoziladi.
+    Qaytaradi: SyncRun.to_dict() natijasi.
+    """
+    run = SyncRun("targeted", True)
+    return _finish_run(run, _run_targeted_sync(run, status_callback, sheet_name, branch, row_range))
+
+def _targeted_source():
+    """
+    Tanlangan sinxronizatsiya asosiy jadval (google_spreadsheet_id) bilan ishlaydi.
+    U GOOGLE_SPREADSHEETS ro'yxatida bo'lsa, o'sha yerdagi sozlamalari (ustunlar) olinadi.
+    """
+    for source in settings.spreadsheet_list:
+        if source.id == settings.google_spreadsheet_id:
+            return source
+    return SpreadsheetConfig(id=settings.google_spreadsheet_id, worksheets=settings.google_worksheet_name_list)
+
+def _branches_in_rows(rows, columns=SHEET_COLUMNS_CONFIG):
+    return {normalize_text(safe_get(row, columns["branch_name"])) for row in rows} - {""}
+
+def _moved_students(sheets, branch_map, db_students_by_uuid, columns=SHEET_COLUMNS_CONFIG):
+    """
+    Varaqda UUID'si bor, lekin olingan filial(lar) ro'yxatida yo'q qatorlarning hisob raqamlari:
+    o'quvchi bazada boshqa filialga o'tkazilgan bo'lishi mumkin (to'liq sinxronizatsiyada
+    u butun ro'yxatdan topiladi va yangilanadi - bu yerda ham shunday bo'lishi kerak).
+    """
+    account_ids = []
+    for rows in sheets:
+        for row in rows:
+            uuid_val = safe_get(row, columns["uuid"])
+            account_id = safe_get(row, columns["account_id"]).upper().replace(" ", "")
+            branch_name = normalize_text(safe_get(row, columns["branch_name"]))
+            if uuid_val and account_id and uuid_val not in db_students_by_uuid and branch_name in branch_map:
+                account_ids.append(account_id)
+    return account_ids
+
+def _run_targeted_sync(run, status_callback, sheet_name, branch, row_range):
+    first_row, last_row = row_range or (START_ROW, None)
+    source = _targeted_source()
+    columns = source.column_map
+    if branch is not None:
+        sheet_names = [
+            name for name in source.worksheets
+            if normalize_text(name) == normalize_text(branch.name)
+        ] or source.worksheets
+        target = f"'{branch.name}' filiali"
+    else:
+        sheet_names = [sheet_name]
+        target = f"'{sheet_name}' varag'i" + (f" ({first_row}-{last_row or ''} qatorlar)" if row_range else "")
+
+    gspread_client, err = get_gsheet_client()
+    if err:
+        run.error(f"Google Sheets: {err}")
+        status_callback(f"❌ Google Sheets xatosi: {err}")
+        return "failed"
+
+    # Filial ma'lum bo'lsa uning o'quvchilari, aks holda filiallar ro'yxati
+    # varaq o'qilishi bilan parallel olinadi
+    if branch is not None:
+        roster = aio.submit(aio_client.list_students(branch.id))
+    else:
+        roster = aio.submit(aio_client.list_branches())
+
+    try:
+        status_callback(f"⏳ {target} o'qilmoqda...")
+        with run.phase("sheets_read"):
+            spreadsheet = gspread_client.open_by_key(source.id)
+            sheets = _read_sheets(spreadsheet, sheet_names, first_row, last_row, columns)
+    except Exception as e:
+        run.error(f"Sheets o'qish: {e}")
+        status_callback(f"❌ Google Sheets'dan o'qishda xatolik: {e}")
+        logger.error(f"Sync read error: {e}")
+        return "failed"
+
+    if not sheets:
+        run.error(f"Varaq topilmadi: {', '.join(sheet_names)}")
+        status_callback(f"❌ Varaq topilmadi: {', '.join(sheet_names)}")
+        return "failed"
+    run.add("rows_read", sum(len(rows) for _, rows in sheets.values()))
+    run.add("sheets_changed", len(sheets))
+
+    try:
+        status_callback("⏳ Bazadan ma'lumotlar olinmoqda...")
+        with run.phase("roster_fetch"):
+            if branch is not None:
+                branches = [branch]
+                students, error = roster.result()
+            else:
+                all_branches, error = roster.result()
+                students = None
+                if not error:
+                    present = set()
+                    for _, rows in sheets.values():
+                        present |= _branches_in_rows(rows, columns)
+                    branches = [b for b in all_branches if normalize_text(b.name) in present]
+                    students, error = aio.run(aio_client.list_students_of_branches([b.id for b in branches]))
+
+            if not error:
+                branch_map = {normalize_text(b.name): b.id for b in branches}
+                db_students_by_uuid = {s.id: s for s in students}
+                moved = _moved_students([rows for _, rows in sheets.values()], branch_map, db_students_by_uuid, columns)
+                if moved:
+                    found, error = aio.run(aio_client.get_students_by_account_ids(moved))
+                    for student in found or []:
+                        db_students_by_uuid[student.id] = student
+
+        if error:
+            run.error(f"gRPC: {error}")
+            status_callback(f"❌ Bazadan ma'lumot olib bo'lmadi: {error}")
+            return "failed"
+    except Exception as e:
+        run.error(f"Boshlang'ich xatolik: {e}")
+        status_callback(f"❌ Boshlang'ich xatolik: {e}")
+        logger.error(f"Sync init error: {e}")
+        return "failed"
+
+    if not branch_map:
+        status_callback(f"✅ {target}: bazadagi filiallarga tegishli qator yo'q.")
+        return "ok"
+
+    # Butun varaq (filial filtri va qatorlar oralig'isiz) sinxronlansa, uning xeshi
+    # yangilanadi - keyingi avtomatik tekshiruv uni o'zgargan deb hisoblamaydi
+    whole_sheet = branch is None and row_range is None
+
+    for name, (worksheet, rows) in sheets.items():
+        try:
+            errors_before = len(run.errors)
+            written_cells = _sync_sheet_rows(worksheet, rows, branch_map, db_students_by_uuid, run, first_row, columns)
+            if whole_sheet and len(run.errors) == errors_before:
+                _apply_cells(rows, written_cells)
+                db.set_sheet_fingerprint(_state_key(source, name), _sheet_fingerprint(rows))
+        except Exception as e:
+            logger.error(f"Sheet loop error: {e}", exc_info=True)
+            run.error(f"{name}: {e}")
+            status_callback(f"⚠️ Xatolik varaqda: {e}")
+
+    final_msg = f"✅ {target} sinxronlandi!\nYangilandi: {run.counts['updated']}\nQo'shildi: {run.counts['created']}"
+    if run.errors:
+        final_msg += f"\n⚠️ Xatolar: {len(run.errors)}"
+    logger.info(final_msg)
+    status_callback(final_msg)
+    return "partial" if run.errors else "ok"
+
+def next_sync_interval(previous_interval, changed):
+    """O'zgarish bo'lsa intervalni qisqartiradi, bo'lmasa ikki barobar uzaytiradi."""
+    if changed:
+        return settings.sync_min_interval
+    return min(previous_interval * 2, settings.sync_max_interval)
+
+def _log_auto_sync_status(text):
+    # Faqat muhim xabarlarni logga chiqaramiz
+    if "✅" in text or "❌" in text or "⚠️" in text:
+        logger.info(f"[AUTO-SYNC] {text}")
+
+def run_scheduled_sync(interval, last_full_sync):
+    """
+    Rejalashtirilgan (avtomatik) sinxronizatsiya: JobQueue va alohida sync jarayoni uchun.
+    Baza tomonidagi o'zgarishlarni ham qamrab olish uchun sync_full_interval'da bir marta
+    o'zgarmagan varaqlar ham sinxronlanadi.
+    Qaytaradi: (keyingi_interval, last_full_sync)
+    """
+    force = time.time() - last_full_sync >= settings.sync_full_interval
+    result = execute_sync(_log_auto_sync_status, force=force, trigger="auto")
+    if force and result['status'] == "ok":
+        last_full_sync = time.time()
+
+    changed = result['status'] != "ok" or result['sheets_changed'] > 0
+    return next_sync_interval(interval, changed), last_full_sync
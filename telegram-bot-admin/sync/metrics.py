@@ -0,0 +1,98 @@
+# telegram-bot-admin/sync/metrics.py
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Sinxronizatsiya bosqichlari (hisobotlarda shu tartibda ko'rsatiladi)
+PHASES = ["sheets_read", "roster_fetch", "reconcile", "batch_rpc", "write_back"]
+
+PHASE_LABELS = {
+    "sheets_read": "Sheets o'qish",
+    "roster_fetch": "gRPC ro'yxat",
+    "reconcile": "Solishtirish",
+    "batch_rpc": "Batch RPC",
+    "write_back": "Sheets'ga yozish",
+}
+
+
+class SyncRun:
+    """Bitta sinxronizatsiya jarayonining bosqich vaqtlari, sonlari va xatolari."""
+
+    def __init__(self, trigger: str, forced: bool):
+        self.trigger = trigger
+        self.forced = forced
+        self.started_at = time.time()
+        self.finished_at = None
+        self.status = "running"
+        self.phases = {}
+        self.counts = {
+            "sheets_changed": 0,
+            "sheets_skipped": 0,
+            "rows_read": 0,
+            "created": 0,
+            "updated": 0,
+            "cells_written": 0,
+        }
+        self.errors = []
+        # Bir nechta jadval sinxronlanganda har birining qisqa natijasi (merge())
+        self.spreadsheets = []
+        # Oynali sinxronizatsiyada bosqichlar alohida oqimlarda ishlaydi
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def add(self, counter: str, value: int):
+        with self._lock:
+            self.counts[counter] += value
+
+    def error(self, message: str):
+        self.errors.append(message)
+
+    def merge(self, name: str, other: "SyncRun"):
+        """Bitta jadval sinxronizatsiyasi natijasini (alohida SyncRun) umumiy natijaga qo'shadi."""
+        with self._lock:
+            for phase, elapsed in other.phases.items():
+                self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+            for counter, value in other.counts.items():
+                self.counts[counter] += value
+        self.errors.extend(f"{name}: {message}" for message in other.errors)
+        self.spreadsheets.append({
+            "name": name,
+            "status": other.status,
+            "duration": round(other.duration, 4),
+            "phases": {phase: round(value, 4) for phase, value in other.phases.items()},
+            **other.counts,
+            "errors": list(other.errors),
+        })
+
+    def finish(self, status: str):
+        self.status = status
+        self.finished_at = time.time()
+        return self
+
+    @property
+    def duration(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self) -> dict:
+        return {
+            "trigger": self.trigger,
+            "forced": self.forced,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration": round(self.duration, 4),
+            "phases": {name: round(value, 4) for name, value in self.phases.items()},
+            **self.counts,
+            "errors": list(self.errors),
+            "spreadsheets": list(self.spreadsheets),
+        }
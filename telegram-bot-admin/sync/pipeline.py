@@ -0,0 +1,114 @@
+# telegram-bot-admin/sync/pipeline.py
+"""
+Sinxronizatsiya konveyeri uchun chegaralangan navbatli bosqichlar.
+
+prefetch()        - manba iteratorini alohida oqimda, ko'pi bilan `depth` ta element
+                    oldinda o'qiydi (keyingi oyna tahlil paytida yuklanadi)
+BackgroundWorker  - elementlarni alohida oqimda navbat bilan qayta ishlaydi; navbat
+                    to'lsa submit() kutadi (backpressure)
+
+Ikkalasida ham navbat chegaralangan, shuning uchun xotirada bir vaqtda
+bir necha oynadan ortiq ma'lumot turmaydi.
+"""
+import queue
+import threading
+
+_DONE = object()
+# To'xtatish so'ralganini tekshirish oralig'i (soniya)
+_POLL = 0.5
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def _put(q, item, stop_event):
+    """Navbatga qo'yadi; to'xtatish so'ralsa False (navbat to'la bo'lsa ham osilib qolmaydi)."""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=_POLL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def prefetch(iterable, depth, name="prefetch"):
+    """
+    `iterable` elementlarini alohida oqimda oldindan o'qib, navbat orqali qaytaradi.
+    Manbadagi xatolik iste'molchi tomonida qayta ko'tariladi. Iste'molchi
+    to'xtasa (generator yopilsa), o'qish oqimi ham to'xtaydi.
+    """
+    items = queue.Queue(maxsize=max(depth, 1))
+    stop_event = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                if not _put(items, item, stop_event):
+                    return
+        except Exception as e:
+            _put(items, _Failure(e), stop_event)
+            return
+        _put(items, _DONE, stop_event)
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop_event.set()
+        thread.join()
+
+
+class BackgroundWorker:
+    """
+    handler(item) ni alohida oqimda navbat bilan chaqiradi. Xatolikdan keyin ham
+    navbatdagi (allaqachon topshirilgan) elementlar qayta ishlanadi, lekin yangisi
+    qabul qilinmaydi; birinchi xatolik submit()/close() da ko'tariladi.
+    """
+
+    def __init__(self, handler, depth, name="worker"):
+        self._handler = handler
+        self._items = queue.Queue(maxsize=max(depth, 1))
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._items.get()
+            if item is _DONE:
+                return
+            try:
+                self._handler(item)
+            except Exception as e:
+                if self._error is None:
+                    self._error = e
+
+    def raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, item):
+        """
+        Navbat to'la bo'lsa bo'shaguncha kutadi. Element har doim navbatga qo'yiladi
+        (u allaqachon bajarilgan ishning natijasi bo'lishi mumkin); ishchi avval
+        xatolikka uchragan bo'lsa, xatolik shundan keyin ko'tariladi.
+        """
+        self._items.put(item)
+        self.raise_if_failed()
+
+    def close(self):
+        """Navbatdagi barcha elementlar qayta ishlanishini kutadi."""
+        self._items.put(_DONE)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,50 @@
+# telegram-bot-admin/sync/quota.py
+"""
+Sheets API so'rovlari uchun umumiy daqiqalik byudjet.
+
+Bir nechta jadval parallel sinxronlanganda barcha oqimlar bitta SheetsQuota
+orqali o'tadi: oxirgi `window` soniyada `per_minute` ta so'rov bo'lsa, keyingisi
+eng eski so'rov oynadan chiqquncha kutadi (429 javob kutib o'tirmasdan).
+Boshlanishda shu jarayon va boshqa jarayonlarning (bot, jurnal) so'nggi
+so'rovlari sheets_api_calls jadvalidan hisobga olinadi.
+"""
+import collections
+import threading
+import time
+
+from database import db
+
+
+class SheetsQuota:
+    def __init__(self, per_minute, window=60.0, recent_calls=None):
+        self.per_minute = max(per_minute, 1)
+        self.window = window
+        # Oldingi so'rovlar (time.time()) monotonic vaqtga o'tkaziladi
+        offset = time.monotonic() - time.time()
+        if recent_calls is None:
+            recent_calls = db.get_recent_sheets_api_calls(window)
+        self._calls = collections.deque(at + offset for at in recent_calls[-self.per_minute:])
+        self._lock = threading.Lock()
+        # Kvota tufayli kutilgan jami vaqt (soniya) - hisobot uchun
+        self.waited = 0.0
+
+    def acquire(self):
+        """Byudjetda joy bo'lguncha kutadi va bitta so'rovni qayd etadi."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and self._calls[0] <= now - self.window:
+                    self._calls.popleft()
+                if len(self._calls) < self.per_minute:
+                    self._calls.append(now)
+                    return
+                delay = self._calls[0] + self.window - now
+                self.waited += delay
+            time.sleep(delay)
+
+    def wrap(self, request):
+        """requests.Session.request o'rniga qo'yiladigan, kvotani kutadigan funksiya."""
+        def throttled_request(*args, **kwargs):
+            self.acquire()
+            return request(*args, **kwargs)
+        return throttled_request
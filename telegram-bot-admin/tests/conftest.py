@@ -0,0 +1,60 @@
+# telegram-bot-admin/tests/conftest.py
+
+import os
+import sys
+from concurrent import futures
+
+import grpc
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    """Har bir test alohida SQLite bazada (va alohida ro'yxat nusxasi bilan) ishlaydi."""
+    monkeypatch.setattr(db, "DB_NAME", str(tmp_path / "test.db"))
+    monkeypatch.setattr("roster.service.SNAPSHOT_PATH", str(tmp_path / "roster.snapshot"))
+    db.init_db()
+
+
+def _serve(monkeypatch, add_servicer, servicer):
+    from config import settings
+    from grpc_client import aio_client, client
+    from grpc_client.breaker import CircuitBreaker
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    add_servicer(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+
+    monkeypatch.setattr(settings, "grpc_go_server_address", f"127.0.0.1:{port}")
+    monkeypatch.setattr(client, "_channel", None)
+    monkeypatch.setattr(client, "breaker", CircuitBreaker())
+    monkeypatch.setattr(aio_client, "_stub", None)
+    yield servicer
+
+    if client._channel is not None:
+        client._channel.close()
+    server.stop(None)
+
+
+@pytest.fixture
+def management(monkeypatch):
+    """Shu jarayonda ishlaydigan soxta ManagementService (fakes.FakeManagementService)."""
+    from generated import payment_pb2_grpc
+    from fakes import FakeManagementService
+
+    servicer = FakeManagementService({"b-chilonzor": "Chilonzor", "b-yunusobod": "Yunusobod"})
+    yield from _serve(monkeypatch, payment_pb2_grpc.add_ManagementServiceServicer_to_server, servicer)
+
+
+@pytest.fixture
+def payments(monkeypatch):
+    """Shu jarayonda ishlaydigan soxta PaymentService (fakes.FakePaymentService)."""
+    from generated import payment_pb2_grpc
+    from fakes import FakePaymentService
+
+    yield from _serve(monkeypatch, payment_pb2_grpc.add_PaymentServiceServicer_to_server, FakePaymentService())
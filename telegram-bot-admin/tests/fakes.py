@@ -0,0 +1,203 @@
+# telegram-bot-admin/tests/fakes.py
+"""
+Sinxronizatsiya testlari uchun soxta Google Sheets obyektlari va ManagementService.
+
+FakeSpreadsheet A1 diapazonlarini (`'Varaq'!A3:Q100`) o'zi kesib beradi, shuning
+uchun engine varaqni haqiqiy gspread bilan ishlagandek o'qiydi va yozadi.
+"""
+import re
+import threading
+import time
+
+import grpc
+from generated import payment_pb2, payment_pb2_grpc
+from google.protobuf import empty_pb2
+
+from config import SHEET_COLUMNS_CONFIG
+
+_RANGE = re.compile(r"'(.*)'!A(\d+):[A-Z]+(\d*)$")
+
+
+def sheet_row(branch, name, account_id="", uuid="", columns=SHEET_COLUMNS_CONFIG):
+    """Varaq qatori: filial, F.I.Sh., sinf va (ixtiyoriy) Account ID / UUID."""
+    row = [""] * (max(columns.values()) + 1)
+    row[columns["branch_name"]] = branch
+    row[columns["student_name"]] = name
+    row[columns["class"]] = "7"
+    row[columns["account_id"]] = account_id
+    row[columns["uuid"]] = uuid
+    return row
+
+
+class FakeWorksheet:
+    def __init__(self, title, data_rows, grid_rows=None):
+        self.title = title
+        # 1-2 qatorlar sarlavha, ma'lumotlar START_ROW (3) dan
+        self.rows = [["Sarlavha"], []] + [list(row) for row in data_rows]
+        self.grid_rows = grid_rows
+        self.fail_writes = None
+        self.writes = []
+
+    @property
+    def row_count(self):
+        return max(len(self.rows), self.grid_rows or 0)
+
+    def update_cells(self, cells, value_input_option=None):
+        if self.fail_writes is not None:
+            raise self.fail_writes
+        self.writes.append([(cell.row, cell.col, cell.value) for cell in cells])
+        for cell in cells:
+            while len(self.rows) < cell.row:
+                self.rows.append([])
+            row = self.rows[cell.row - 1]
+            while len(row) < cell.col:
+                row.append("")
+            row[cell.col - 1] = cell.value
+
+    def cell(self, row, column_index):
+        """0 dan boshlangan ustun indeksi bo'yicha katak qiymati."""
+        values = self.rows[row - 1]
+        return values[column_index] if column_index < len(values) else ""
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets):
+        self.sheets = {ws.title: ws for ws in worksheets}
+        self.reads = []
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def _values(self, a1_range):
+        name, first_row, last_row = _RANGE.match(a1_range).groups()
+        self.reads.append(a1_range)
+        rows = self.sheets[name.replace("''", "'")].rows[int(first_row) - 1:int(last_row) if last_row else None]
+        rows = [list(row) for row in rows]
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return {"values": rows}
+
+    def values_get(self, a1_range, params=None):
+        return self._values(a1_range)
+
+    def values_batch_get(self, ranges, params=None):
+        return {"valueRanges": [self._values(r) for r in ranges]}
+
+
+class FakeSheetsClient:
+    """open_by_key: `books` da yo'q jadval uchun (ruxsat yo'q kabi) xatolik."""
+
+    def __init__(self, books):
+        self.books = books
+
+    def open_by_key(self, key):
+        if key not in self.books:
+            raise PermissionError(f"403: {key} jadvaliga ruxsat yo'q")
+        return self.books[key]
+
+
+class FakeManagementService(payment_pb2_grpc.ManagementServiceServicer):
+    """Filiallar va o'quvchilarni xotirada saqlovchi ManagementService."""
+
+    def __init__(self, branches):
+        self.branches = [payment_pb2.Branch(id=branch_id, name=name) for branch_id, name in branches.items()]
+        self.students = {}
+        self.calls = []
+        # SyncStudents oqimining kechikishi (soniya) - konveyer bosqichlari ustma-ust tushishi uchun
+        self.sync_delay = 0.0
+        # Ommaviy paketlar: shu hisob raqamlari bo'lgan paket bitta tranzaksiya kabi butunlay rad etiladi
+        self.fail_accounts = set()
+        # Berilsa (masalan, UNAVAILABLE) barcha ommaviy paketlar shu kod bilan rad etiladi
+        self.batch_error = None
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def _create(self, student):
+        student = payment_pb2.Student(
+            id=f"uuid-{len(self.students) + 1}",
+            account_id=student.account_id or f"ACC{len(self.students) + 1:04d}",
+            branch_id=student.branch_id,
+            full_name=student.full_name,
+            status=student.status,
+        )
+        self.students[student.id] = student
+        return student
+
+    def ListBranches(self, request, context):
+        self.calls.append("ListBranches")
+        return payment_pb2.ListBranchesResponse(branches=self.branches)
+
+    def ListStudents(self, request, context):
+        self.calls.append("ListStudents")
+        with self._lock:
+            students = [s for s in self.students.values() if not request.branch_id or s.branch_id == request.branch_id]
+        return payment_pb2.ListStudentsResponse(students=students)
+
+    def GetStudentByAccountId(self, request, context):
+        self.calls.append("GetStudentByAccountId")
+        with self._lock:
+            for student in self.students.values():
+                if student.account_id == request.account_id:
+                    return student
+        context.abort(grpc.StatusCode.NOT_FOUND, "topilmadi")
+
+    def CreateStudentsBatch(self, request, context):
+        self.calls.append("CreateStudentsBatch")
+        with self._lock:
+            created = [self._create(student) for student in request.students]
+        return payment_pb2.CreateStudentsBatchResponse(students=created)
+
+    def _check_batch(self, account_ids, context):
+        self.batch_sizes.append(len(account_ids))
+        if self.batch_error is not None:
+            context.abort(self.batch_error, "server ishlamayapti")
+        if self.fail_accounts.intersection(account_ids):
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, "violates foreign key constraint")
+
+    def UpdateStudentsBatch(self, request, context):
+        self.calls.append("UpdateStudentsBatch")
+        self._check_batch([s.account_id for s in request.students], context)
+        with self._lock:
+            for student in request.students:
+                self.students[student.id] = student
+        return empty_pb2.Empty()
+
+    def DeleteStudentsBatch(self, request, context):
+        self.calls.append("DeleteStudentsBatch")
+        self._check_batch(list(request.account_ids), context)
+        with self._lock:
+            for student_id, student in list(self.students.items()):
+                if student.account_id in request.account_ids:
+                    del self.students[student_id]
+        return empty_pb2.Empty()
+
+    def SyncStudents(self, request_iterator, context):
+        self.calls.append("SyncStudents")
+        time.sleep(self.sync_delay)
+        for row in request_iterator:
+            with self._lock:
+                if row.student.id:
+                    outcome, student = payment_pb2.SyncStudentResult.UPDATED, row.student
+                else:
+                    outcome, student = payment_pb2.SyncStudentResult.CREATED, self._create(row.student)
+            yield payment_pb2.SyncStudentResult(
+                row_ref=row.row_ref, outcome=outcome, id=student.id, account_id=student.account_id,
+            )
+
+
+class FakePaymentService(payment_pb2_grpc.PaymentServiceServicer):
+    """GetStatement: `transactions` dan create_time bo'yicha [from, to] oralig'idagilarini qaytaradi."""
+
+    def __init__(self, transactions=()):
+        self.transactions = list(transactions)
+        self.requests = []
+        self.error = None
+
+    def GetStatement(self, request, context):
+        first, last = getattr(request, "from"), request.to
+        self.requests.append((first, last))
+        if self.error is not None:
+            context.abort(self.error, "soxta xatolik")
+        return payment_pb2.GetStatementResponse(
+            transactions=[tx for tx in self.transactions if first <= tx.create_time <= last],
+        )
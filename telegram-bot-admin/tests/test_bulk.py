@@ -0,0 +1,65 @@
+# telegram-bot-admin/tests/test_bulk.py
+"""Ommaviy amallar: xato bergan paketni bo'lib, faqat aybdor raqamlarni ajratish."""
+import grpc
+import pytest
+from generated import payment_pb2
+
+from bulk import operations
+from grpc_client import client
+from grpc_client.breaker import CircuitBreaker
+
+
+@pytest.fixture
+def students(management, monkeypatch):
+    monkeypatch.setattr(operations, "BATCH_SIZE", 4)
+    for i in range(1, 9):
+        management._create(payment_pb2.Student(account_id=f"YM{i}", full_name=f"O'quvchi {i}", status=i % 2 == 0))
+    return management
+
+
+def _planned(account_ids, action):
+    result, error = operations.plan(account_ids, action)
+    assert error is None
+    return result
+
+
+def test_delete_bisects_failed_batch_down_to_culprit(students):
+    students.fail_accounts = {"YM5"}
+    planned = _planned([f"YM{i}" for i in range(1, 10)], operations.ACTION_DELETE)
+    assert planned["not_found"] == ["YM9"]
+
+    succeeded, failures = operations.apply(planned["students"], operations.ACTION_DELETE)
+
+    assert failures == {"YM5": "to'lovlar tarixi bor - o'chirib bo'lmaydi"}
+    assert sorted(s.account_id for s in succeeded) == ["YM1", "YM2", "YM3", "YM4", "YM6", "YM7", "YM8"]
+    assert [s.account_id for s in students.students.values()] == ["YM5"]
+    # [1-4] ok, [5-8] xato -> [5,6] xato -> [5] xato, [6] ok -> [7,8] ok
+    assert students.batch_sizes == [4, 4, 2, 1, 1, 2]
+
+
+def test_status_change_skips_unchanged_and_isolates_failures(students):
+    students.fail_accounts = {"YM3", "YM7"}
+    planned = _planned([f"YM{i}" for i in range(1, 9)], operations.ACTION_ACTIVATE)
+    assert planned["unchanged"] == ["YM2", "YM4", "YM6", "YM8"]
+
+    succeeded, failures = operations.apply(planned["students"], operations.ACTION_ACTIVATE)
+
+    assert sorted(failures) == ["YM3", "YM7"]
+    assert sorted(s.account_id for s in succeeded) == ["YM1", "YM5"]
+    assert all(s.status for s in students.students.values() if s.account_id in ("YM1", "YM5"))
+    assert not any(s.status for s in students.students.values() if s.account_id in ("YM3", "YM7"))
+
+
+def test_open_breaker_stops_bisecting(students, monkeypatch):
+    monkeypatch.setattr(client, "breaker", CircuitBreaker(failure_threshold=1))
+    planned = _planned([f"YM{i}" for i in range(1, 9)], operations.ACTION_DELETE)
+    students.batch_error = grpc.StatusCode.UNAVAILABLE
+
+    succeeded, failures = operations.apply(planned["students"], operations.ACTION_DELETE)
+
+    assert succeeded == []
+    assert sorted(failures) == [f"YM{i}" for i in range(1, 9)]
+    assert all("ishlamayapti" in error for error in failures.values())
+    # Zanjir ochilgach qolgan paketlar bo'linmaydi va yuborilmaydi
+    assert students.batch_sizes == [4]
+    assert len(students.students) == 8
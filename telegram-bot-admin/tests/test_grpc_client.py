@@ -0,0 +1,230 @@
+# telegram-bot-admin/tests/test_grpc_client.py
+"""
+gRPC klientining deadline, qayta urinish va zanjir uzgich xatti-harakati.
+
+ManagementService'ning soxta implementatsiyasi shu jarayonda (grpc.server)
+ishga tushadi va kechikish hamda xatolarni talab bo'yicha qaytaradi.
+"""
+import threading
+import time
+from concurrent import futures
+
+import grpc
+import pytest
+from generated import payment_pb2, payment_pb2_grpc
+from google.protobuf import empty_pb2
+
+from config import settings
+from grpc_client import aio_client, client
+from grpc_client.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from runtime import aio
+
+
+class FakeManagementService(payment_pb2_grpc.ManagementServiceServicer):
+    def __init__(self):
+        self.calls = {}
+        self.delay = 0.0
+        # metod -> navbatdagi so'rovlarda qaytariladigan xato kodlari
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def _enter(self, method, context):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            errors = self.errors.get(method)
+            code = errors.pop(0) if errors else None
+        if code is not None:
+            context.abort(code, f"soxta {code.name}")
+        time.sleep(self.delay)
+
+    def ListBranches(self, request, context):
+        self._enter("ListBranches", context)
+        return payment_pb2.ListBranchesResponse(branches=[payment_pb2.Branch(id="b1", name="Markaz")])
+
+    def CreateBranch(self, request, context):
+        self._enter("CreateBranch", context)
+        return payment_pb2.Branch(id="b2", name=request.name)
+
+    def GetStudentByAccountId(self, request, context):
+        self._enter("GetStudentByAccountId", context)
+        return payment_pb2.Student(id="s1", account_id=request.account_id)
+
+    def SyncStudents(self, request_iterator, context):
+        for row in request_iterator:
+            self._enter("SyncStudents", context)
+            yield payment_pb2.SyncStudentResult(
+                row_ref=row.row_ref, outcome=payment_pb2.SyncStudentResult.UPDATED, id=row.student.id,
+            )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Unavailable(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "soxta UNAVAILABLE"
+
+
+@pytest.fixture
+def service(monkeypatch):
+    servicer = FakeManagementService()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    payment_pb2_grpc.add_ManagementServiceServicer_to_server(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+
+    monkeypatch.setattr(settings, "grpc_go_server_address", f"127.0.0.1:{port}")
+    monkeypatch.setattr(client, "_channel", None)
+    monkeypatch.setattr(aio_client, "_stub", None)
+    yield servicer
+
+    if client._channel is not None:
+        client._channel.close()
+    server.stop(None)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock)
+    monkeypatch.setattr(client, "breaker", breaker)
+    return breaker
+
+
+def _trip(breaker, clock):
+    """Zanjirni ochadi va reset_timeout'ni o'tkazib yuboradi: keyingi so'rov half_open sinovi."""
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(Unavailable())
+    assert breaker.snapshot()["state"] == OPEN
+    clock.now += breaker.reset_timeout
+
+
+def test_deadline_expires(service, breaker, monkeypatch):
+    monkeypatch.setitem(client.RPC_DEADLINES, "GetStudentByAccountId", 0.2)
+    service.delay = 1.0
+
+    started_at = time.monotonic()
+    with pytest.raises(grpc.RpcError) as excinfo:
+        client._call(client.get_management_stub(), "GetStudentByAccountId", payment_pb2.ByAccountIdRequest(account_id="A1"))
+
+    assert excinfo.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert time.monotonic() - started_at < 0.9
+    assert breaker.snapshot()["failures"] == 1
+
+
+def test_idempotent_read_retried_on_unavailable(service, breaker):
+    service.errors["ListBranches"] = [grpc.StatusCode.UNAVAILABLE] * 2
+
+    branches, err = client.list_branches()
+
+    assert err is None
+    assert [b.id for b in branches] == ["b1"]
+    assert service.calls["ListBranches"] == 3
+    assert breaker.snapshot()["failures"] == 0
+
+
+def test_write_not_retried_on_unavailable(service, breaker):
+    service.errors["CreateBranch"] = [grpc.StatusCode.UNAVAILABLE]
+
+    branch, err = client.create_branch({
+        "name": "Yangi", "monthly_fee": 1, "mfo_code": "", "account_number": "", "merchant_id": "",
+    })
+
+    assert branch is None and "UNAVAILABLE" in err
+    assert service.calls["CreateBranch"] == 1
+
+
+def test_breaker_open_half_open_closed(service, breaker, clock):
+    stub = client.get_management_stub()
+    request = payment_pb2.CreateBranchRequest(name="Yangi")
+    service.errors["CreateBranch"] = [grpc.StatusCode.UNAVAILABLE] * 3
+
+    for _ in range(2):
+        with pytest.raises(grpc.RpcError):
+            client._call(stub, "CreateBranch", request)
+    assert breaker.snapshot()["state"] == OPEN
+
+    # Ochiq zanjir so'rovni serverga yubormaydi
+    with pytest.raises(CircuitOpenError):
+        client._call(stub, "CreateBranch", request)
+    assert service.calls["CreateBranch"] == 2
+
+    # half_open: sinov so'rovi muvaffaqiyatsiz - zanjir yana ochiladi
+    clock.now += breaker.reset_timeout
+    with pytest.raises(grpc.RpcError) as excinfo:
+        client._call(stub, "CreateBranch", request)
+    assert not isinstance(excinfo.value, CircuitOpenError)
+    assert breaker.snapshot()["state"] == OPEN
+
+    # half_open: sinov so'rovi muvaffaqiyatli - zanjir yopiladi
+    clock.now += breaker.reset_timeout
+    assert client._call(stub, "CreateBranch", request).id == "b2"
+    assert breaker.snapshot()["state"] == CLOSED
+    assert breaker.snapshot()["failures"] == 0
+    assert service.calls["CreateBranch"] == 4
+
+
+def test_half_open_allows_single_probe(breaker, clock):
+    _trip(breaker, clock)
+    breaker.before_call()
+    assert breaker.snapshot()["state"] == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_probe_released_on_non_rpc_error(service, breaker, clock):
+    class BrokenStub:
+        def ListBranches(self, request, timeout=None):
+            raise ValueError("kutilmagan xatolik")
+
+    _trip(breaker, clock)
+    with pytest.raises(ValueError):
+        client._call_once(BrokenStub(), "ListBranches", empty_pb2.Empty())
+
+    # Sinov joyi bo'shagan: keyingi so'rov o'tadi va zanjirni yopadi
+    branches, err = client.list_branches()
+    assert err is None and len(branches) == 1
+    assert breaker.snapshot()["state"] == CLOSED
+
+
+def test_probe_released_when_stream_closed_early(service, breaker, clock):
+    rows = ((row_ref, {"id": f"s{row_ref}", "full_name": "Ali"}) for row_ref in range(5, 10))
+
+    _trip(breaker, clock)
+    results = client.sync_students(rows)
+    assert next(results).row_ref == 5
+    results.close()
+
+    assert breaker.snapshot()["state"] == HALF_OPEN
+    branches, err = client.list_branches()
+    assert err is None and len(branches) == 1
+    assert breaker.snapshot()["state"] == CLOSED
+
+
+def test_aio_probe_released_on_cancel(service, breaker, clock):
+    request = payment_pb2.ByAccountIdRequest(account_id="A1")
+    service.delay = 1.0
+
+    _trip(breaker, clock)
+    pending = aio.submit(aio_client._call_once("GetStudentByAccountId", request))
+    time.sleep(0.2)
+    pending.cancel()
+    with pytest.raises(futures.CancelledError):
+        pending.result(timeout=5)
+
+    service.delay = 0.0
+    student = aio.run(aio_client._call("GetStudentByAccountId", request), timeout=5)
+    assert student.account_id == "A1"
+    assert breaker.snapshot()["state"] == CLOSED
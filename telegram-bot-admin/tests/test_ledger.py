@@ -0,0 +1,124 @@
+# telegram-bot-admin/tests/test_ledger.py
+
+import gspread
+import pytest
+import requests
+from generated import bot_admin_pb2
+
+from config import settings
+from database import db
+from ledger import writer
+
+
+class FakeLedgerSheet:
+    """append_rows'ni yozib boradi; `error` berilsa append'da (yozishdan oldin/keyin) ko'tariladi."""
+
+    def __init__(self):
+        self.rows = [writer.LEDGER_HEADER]
+        self.error = None
+        self.error_after_write = False
+        self.appends = 0
+
+    def col_values(self, col):
+        return [row[col - 1] for row in self.rows]
+
+    def append_rows(self, rows, **kwargs):
+        self.appends += 1
+        if self.error and not self.error_after_write:
+            raise self.error
+        self.rows.extend(rows)
+        if self.error:
+            raise self.error
+
+
+class Crash(BaseException):
+    """Jarayon append'dan keyin o'ldirildi."""
+
+
+def _api_error(status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b'{"error": {"code": %d, "message": "soxta", "status": "X"}}' % status
+    return gspread.exceptions.APIError(response)
+
+
+def _payment(account_id, amount=100000, payment_time="2026-10-19 10:00:00"):
+    return bot_admin_pb2.NotifyPaymentSuccessRequest(
+        account_id=account_id, amount=amount, payment_time=payment_time,
+        student_name="Ali", branch_name="Markaz", group_name="A1", contract_number="C1",
+    )
+
+
+@pytest.fixture(autouse=True)
+def ledger_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "ledger_worksheet_name", "Jurnal")
+    monkeypatch.setattr(settings, "ledger_batch_size", 10)
+
+
+def _keys(sheet):
+    return sheet.col_values(1)[1:]
+
+
+def test_flush_appends_batch_once():
+    sheet = FakeLedgerSheet()
+    writer.enqueue_payment(_payment("A1"))
+    writer.enqueue_payment(_payment("A2"))
+    # Go serveri xabarnomani qayta yubordi
+    writer.enqueue_payment(_payment("A1"))
+
+    assert writer.flush_once(sheet) == (2, None)
+    assert writer.flush_once(sheet) == (0, None)
+    assert len(_keys(sheet)) == 2 and sheet.appends == 1
+
+
+def test_4xx_keeps_rows_pending_without_reading_sheet():
+    sheet = FakeLedgerSheet()
+    writer.enqueue_payment(_payment("A1"))
+    sheet.error = _api_error(429)
+
+    written, error = writer.flush_once(sheet)
+
+    assert written == 0 and "429" in error
+    assert [item["in_doubt"] for item in db.fetch_ledger_rows(10)] == [False]
+    sheet.error = None
+    assert writer.flush_once(sheet) == (1, None)
+    assert len(_keys(sheet)) == 1
+
+
+@pytest.mark.parametrize("error", [_api_error(503), TimeoutError("read timed out")])
+def test_unknown_outcome_is_checked_against_sheet(error):
+    sheet = FakeLedgerSheet()
+    writer.enqueue_payment(_payment("A1"))
+    sheet.error, sheet.error_after_write = error, True
+
+    written, err = writer.flush_once(sheet)
+    assert written == 0 and err
+    assert [item["in_doubt"] for item in db.fetch_ledger_rows(10)] == [True]
+
+    sheet.error = None
+    writer.enqueue_payment(_payment("A2"))
+    assert writer.flush_once(sheet) == (1, None)
+    assert len(_keys(sheet)) == 2
+    assert db.get_ledger_pending()["count"] == 0
+
+
+def test_crash_after_append_does_not_duplicate_rows():
+    sheet = FakeLedgerSheet()
+    writer.enqueue_payment(_payment("A1"))
+    writer.enqueue_payment(_payment("A2"))
+    sheet.error, sheet.error_after_write = Crash(), True
+
+    with pytest.raises(Crash):
+        writer.flush_once(sheet)
+
+    # Qayta ishga tushgandan keyin
+    sheet.error = None
+    assert writer.flush_once(sheet) == (0, None)
+    assert len(_keys(sheet)) == 2 and sheet.appends == 1
+    assert db.get_ledger_pending()["count"] == 0
+
+
+def test_same_second_identical_payments_share_a_key():
+    first = writer.payment_key(_payment("A1"))
+    assert first == writer.payment_key(_payment("A1"))
+    assert first != writer.payment_key(_payment("A1", payment_time="2026-10-19 10:00:01"))
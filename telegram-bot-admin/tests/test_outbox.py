@@ -0,0 +1,95 @@
+# telegram-bot-admin/tests/test_outbox.py
+
+import socket
+import sqlite3
+import threading
+import time
+
+import pytest
+from telegram.error import Unauthorized
+
+from config import settings
+from database import db
+from runtime import outbox
+
+
+class FlakyBot:
+    """`fail_texts` dagi xabarlarni `failures` marta rad etadi."""
+
+    def __init__(self, fail_texts, failures):
+        self.fail_texts = fail_texts
+        self.failures = failures
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        if text in self.fail_texts and self.failures > 0:
+            self.failures -= 1
+            raise Unauthorized("Forbidden: bot was kicked from the group chat")
+        self.sent.append(text)
+
+
+@pytest.fixture(autouse=True)
+def wakeup_port(monkeypatch):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    monkeypatch.setattr(settings, "outbox_wakeup_port", port)
+
+
+def _deliver_until(bot, condition, timeout=5):
+    stop_event = threading.Event()
+    thread = threading.Thread(target=outbox.deliver_forever, args=(bot, stop_event), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stop_event.set()
+    thread.join(timeout=5)
+    assert condition()
+
+
+def _dead_letters():
+    with sqlite3.connect(db.DB_NAME) as conn:
+        return conn.execute("SELECT text, attempts, last_error FROM outbox_dead").fetchall()
+
+
+def test_failed_message_stays_queued_until_sent(monkeypatch):
+    monkeypatch.setattr(outbox, "RETRY_BASE_DELAY", 0)
+    outbox.OutboxBot().send_message(-100, "to'lov")
+    bot = FlakyBot({"to'lov"}, failures=2)
+
+    _deliver_until(bot, lambda: bot.sent)
+
+    assert bot.sent == ["to'lov"]
+    assert db.fetch_outbox_messages() == []
+    assert _dead_letters() == []
+
+
+def test_message_moved_to_dead_letters_after_max_rounds(monkeypatch):
+    monkeypatch.setattr(outbox, "RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(outbox, "MAX_DELIVERY_ROUNDS", 3)
+    sender = outbox.OutboxBot()
+    sender.send_message(-100, "yetmaydi")
+    sender.send_message(-100, "yetadi")
+    bot = FlakyBot({"yetmaydi"}, failures=10)
+
+    _deliver_until(bot, lambda: bot.sent and _dead_letters())
+
+    assert bot.sent == ["yetadi"]
+    assert db.fetch_outbox_messages() == []
+    assert _dead_letters() == [("yetmaydi", 3, "Forbidden: bot was kicked from the group chat")]
+
+
+def test_failed_message_waits_for_next_attempt():
+    outbox.OutboxBot().send_message(-100, "keyinroq")
+    message = db.fetch_outbox_messages()[0]
+
+    outbox._defer_or_bury(message, "Timed out")
+
+    assert db.fetch_outbox_messages() == []
+    with sqlite3.connect(db.DB_NAME) as conn:
+        attempts, next_attempt_at, last_error = conn.execute(
+            "SELECT attempts, next_attempt_at, last_error FROM outbox"
+        ).fetchone()
+    assert attempts == 1 and last_error == "Timed out"
+    assert next_attempt_at >= time.time() + outbox.RETRY_BASE_DELAY - 1
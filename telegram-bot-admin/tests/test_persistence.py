@@ -0,0 +1,54 @@
+# telegram-bot-admin/tests/test_persistence.py
+
+import pytest
+from telegram.ext import ConversationHandler, Updater
+
+from bot import core
+from bot.persistence import SQLitePersistence
+
+
+def _persistent_conversations():
+    updater = Updater("123:test", use_context=True, workers=0, persistence=SQLitePersistence())
+    core.register_handlers(updater, schedule_sync=False)
+    handlers = [handler for group in updater.dispatcher.handlers.values() for handler in group]
+    return [handler for handler in handlers if isinstance(handler, ConversationHandler) and handler.persistent]
+
+
+def test_every_conversation_state_survives_restart():
+    conversations = _persistent_conversations()
+    assert {conv.name for conv in conversations} >= {"add_branch", "add_student", "delete_student"}
+
+    persistence = SQLitePersistence(flush_interval=0)
+    expected = {}
+    for conv in conversations:
+        for user_id, state in enumerate(conv.states, start=1):
+            key = (user_id, user_id)
+            persistence.update_conversation(conv.name, key, state)
+            expected.setdefault(conv.name, {})[key] = state
+    persistence.flush()
+
+    restored = SQLitePersistence(flush_interval=0)
+    for conv in conversations:
+        assert restored.get_conversations(conv.name) == expected[conv.name]
+
+
+def test_unserializable_state_leaves_memory_untouched():
+    persistence = SQLitePersistence(flush_interval=0)
+    persistence.update_conversation("delete_student", (1, 1), 12)
+
+    with pytest.raises(TypeError):
+        persistence.update_conversation("delete_student", (1, 1), range(12, 13))
+
+    assert persistence.get_conversations("delete_student") == {(1, 1): 12}
+    persistence.flush()
+    assert SQLitePersistence().get_conversations("delete_student") == {(1, 1): 12}
+
+
+def test_user_data_round_trip_and_deleted_keys():
+    persistence = SQLitePersistence(flush_interval=0)
+    persistence.update_user_data(7, {"branch": "b1", "ids": [1, 2]})
+    persistence.update_user_data(7, {"branch": "b2"})
+    persistence.flush()
+
+    restored = SQLitePersistence().get_user_data()
+    assert dict(restored) == {7: {"branch": "b2"}}
@@ -0,0 +1,71 @@
+# telegram-bot-admin/tests/test_roster_snapshot.py
+"""Ro'yxat nusxasi: saqlash/o'qish va buzilgan fayllarni rad etish."""
+import pytest
+from generated import payment_pb2
+
+from roster import snapshot
+
+BRANCHES = [payment_pb2.Branch(id="b-1", name="Chilonzor"), payment_pb2.Branch(id="b-2", name="Yunusobod")]
+STUDENTS = [
+    payment_pb2.Student(id=f"uuid-{i}", account_id=f"YM{i}", branch_id="b-1", full_name=f"O'quvchi {i}", status=True)
+    for i in range(50)
+]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "roster.snapshot"
+    snapshot.save(str(path), BRANCHES, STUDENTS, saved_at=1700000000.0)
+    return path
+
+
+def test_save_and_load_round_trip(path):
+    loaded, error = snapshot.load(str(path))
+
+    assert error is None
+    assert (loaded.saved_at, loaded.branch_count, loaded.student_count) == (1700000000.0, 2, 50)
+    assert list(loaded.branches) == BRANCHES
+    assert list(loaded.students) == STUDENTS
+    # Vaqtinchalik fayl qolmaydi
+    assert not list(path.parent.glob("*.tmp"))
+
+
+def test_empty_roster_round_trip(tmp_path):
+    path = str(tmp_path / "empty.snapshot")
+    assert snapshot.save(path, [], []) == snapshot.HEADER.size
+
+    loaded, error = snapshot.load(path)
+    assert error is None
+    assert list(loaded.branches) == [] and list(loaded.students) == []
+
+
+def test_missing_file_is_not_an_error(tmp_path):
+    assert snapshot.load(str(tmp_path / "yo'q.snapshot")) == (None, None)
+
+
+def test_foreign_magic_is_rejected(path):
+    data = path.read_bytes()
+    path.write_bytes(b"XXXX" + data[4:])
+
+    loaded, error = snapshot.load(str(path))
+    assert loaded is None and "noma'lum format" in error
+
+
+@pytest.mark.parametrize("size", [0, 3, snapshot.HEADER.size - 1, snapshot.HEADER.size + 5])
+def test_truncated_header_or_branches_are_rejected_on_load(path, size):
+    path.write_bytes(path.read_bytes()[:size])
+
+    loaded, error = snapshot.load(str(path))
+    assert loaded is None and error
+
+
+def test_truncated_students_are_rejected_on_access(path):
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) - 10])
+
+    loaded, error = snapshot.load(str(path))
+    assert error is None
+    # Sarlavha va filiallar butun; o'quvchilar bo'limi faqat murojaatda tekshiriladi
+    assert list(loaded.branches) == BRANCHES
+    with pytest.raises(snapshot.SnapshotError):
+        loaded.students
@@ -0,0 +1,77 @@
+# telegram-bot-admin/tests/test_search_index.py
+"""StudentIndex.refresh: faqat o'zgargan o'quvchilar qayta indekslanadi."""
+from generated import payment_pb2
+
+from search.index import StudentIndex
+
+
+def _student(student_id, full_name, phone="", contract="", account_id="", parent_name="", status=True):
+    return payment_pb2.Student(
+        id=student_id, full_name=full_name, parent_name=parent_name, phone=phone,
+        contract_number=contract, account_id=account_id, status=status,
+    )
+
+
+STUDENTS = [
+    _student("1", "Ali Valiyev", "+998 90 123-45-67", "C-101", "ACC1", "Vali Karimov"),
+    _student("2", "Olim Karimov", "+998 91 222-33-44", "C-102", "ACC2"),
+    _student("3", "Зарина Юсупова", "+998 93 555-66-77", "C-103", "ACC3"),
+]
+
+
+def _ids(index, query):
+    return [student.id for student, _ in index.search(query)]
+
+
+def _state(index):
+    return (
+        index._keys, index._doc_tokens, index._postings, index._vocabulary,
+        {gram: tokens for gram, tokens in index._trigrams.items() if tokens},
+        index._phones._entries, index._codes._entries,
+    )
+
+
+def test_first_refresh_builds_index():
+    index = StudentIndex()
+    assert index.refresh(STUDENTS) == {"added_or_changed": 3, "removed": 0}
+    assert _ids(index, "zarina") == ["3"]
+    assert _ids(index, "90 123") == ["1"]
+
+
+def test_refresh_applies_only_the_diff():
+    index = StudentIndex()
+    index.build(STUDENTS)
+
+    students = [
+        # Faqat status o'zgargan - qayta indekslanmaydi, lekin obyekt yangilanadi
+        _student("1", "Ali Valiyev", "+998 90 123-45-67", "C-101", "ACC1", "Vali Karimov", status=False),
+        # Ismi va telefoni o'zgargan
+        _student("2", "Olim Rahimov", "+998 94 000-11-22", "C-102", "ACC2"),
+        # Yangi o'quvchi; "3" ro'yxatdan o'chirilgan
+        _student("4", "Bekzod Tursunov", "+998 97 777-88-99", "C-104", "ACC4"),
+    ]
+    assert index.refresh(students) == {"added_or_changed": 2, "removed": 1}
+
+    assert index.students["1"].status is False
+    assert _ids(index, "rahimov") == ["2"]
+    assert _ids(index, "94 000") == ["2"]
+    assert _ids(index, "91 222") == []
+    assert _ids(index, "bekzod") == ["4"]
+    assert _ids(index, "zarina") == [] and _ids(index, "C-103") == []
+    # "karimov" endi faqat 1-o'quvchining ota-onasi ismida qoldi
+    assert _ids(index, "karimov") == ["1"]
+    assert "yusupova" not in index._postings and "yusupova" not in index._vocabulary
+
+    # Farq bo'yicha yangilangan indeks noldan qurilgani bilan bir xil
+    rebuilt = StudentIndex()
+    rebuilt.build(students)
+    assert _state(index) == _state(rebuilt)
+
+
+def test_refresh_with_same_list_changes_nothing():
+    index = StudentIndex()
+    index.build(STUDENTS)
+    before = _state(index)
+
+    assert index.refresh(list(STUDENTS)) == {"added_or_changed": 0, "removed": 0}
+    assert _state(index) == before
@@ -0,0 +1,105 @@
+# telegram-bot-admin/tests/test_statement.py
+"""Ko'chirma hisoboti: so'rov oraliqlari va faqat yopilgan kunlarni keshlash."""
+from datetime import date, timedelta
+
+import grpc
+import pytest
+from generated import payment_pb2
+
+from config import settings
+from database import db
+from reports import statement
+
+
+def _days(first, count):
+    return [first + timedelta(days=i) for i in range(count)]
+
+
+def _tx(day, amount, merchant="m-chilonzor", state=statement.STATE_PERFORMED):
+    return payment_pb2.StatementTransaction(
+        create_time=statement._day_start_ms(day) + 3600 * 1000, amount=amount, state=state,
+        receivers=[payment_pb2.Receiver(id=merchant, amount=amount)],
+    )
+
+
+def test_fetch_ranges_merges_consecutive_days():
+    first = date(2026, 1, 1)
+    days = _days(first, 3) + _days(date(2026, 1, 10), 2)
+    assert statement._fetch_ranges(days) == [
+        [first, date(2026, 1, 3)],
+        [date(2026, 1, 10), date(2026, 1, 11)],
+    ]
+    assert statement._fetch_ranges([]) == []
+
+
+def test_fetch_ranges_splits_at_max_days():
+    first = date(2026, 1, 1)
+    days = _days(first, statement.FETCH_MAX_DAYS * 2 + 1)
+    ranges = statement._fetch_ranges(days)
+
+    assert [(last - start).days + 1 for start, last in ranges] == [statement.FETCH_MAX_DAYS] * 2 + [1]
+    assert ranges[0][0] == first and ranges[-1][1] == days[-1]
+
+
+@pytest.fixture
+def current_day(monkeypatch):
+    # Kun tugashi bilan yopiladi: kechagi kun yopiq, bugungi ochiq
+    monkeypatch.setattr(settings, "report_day_close_hours", 0)
+    return statement.today()
+
+
+def test_report_caches_only_closed_days(payments, current_day):
+    first = current_day - timedelta(days=3)
+    payments.transactions = [
+        _tx(first, 1000),
+        _tx(first, 500, merchant="m-yunusobod"),
+        _tx(first, 700, state=-1),  # bekor qilingan
+        _tx(current_day - timedelta(days=1), 2000),
+        _tx(current_day, 300),
+    ]
+
+    report, error = statement.build_report(first, current_day)
+    assert error is None
+    assert (report["cached_days"], report["fetched_days"], report["fetch_calls"]) == (0, 4, 1)
+    assert report["columns"].total() == (3800, 4)
+    # Bugungi kun keshlanmaydi
+    assert db.get_cached_statement_days(first.isoformat(), current_day.isoformat()) == {
+        d.isoformat() for d in _days(first, 3)
+    }
+
+    # Bugun yangi to'lov keldi; takroriy hisobotda faqat bugun so'raladi
+    payments.transactions.append(_tx(current_day, 200))
+    report, error = statement.build_report(first, current_day)
+    assert error is None
+    assert (report["cached_days"], report["fetched_days"], report["fetch_calls"]) == (3, 1, 1)
+    assert payments.requests[-1] == (
+        statement._day_start_ms(current_day), statement._day_start_ms(current_day) + statement.DAY_MS - 1,
+    )
+    columns = report["columns"]
+    assert columns.total() == (4000, 5)
+    assert columns.by_branch() == {"m-chilonzor": [3500, 4], "m-yunusobod": [500, 1]}
+    assert columns.by_day()[current_day.isoformat()] == [500, 2]
+
+
+def test_report_fetches_gaps_between_cached_days(payments, current_day):
+    first = current_day - timedelta(days=5)
+    payments.transactions = [_tx(day, 100) for day in _days(first, 5)]
+    middle = first + timedelta(days=2)
+    statement.build_report(middle, middle)
+
+    report, error = statement.build_report(first, current_day - timedelta(days=1))
+
+    assert error is None
+    assert (report["cached_days"], report["fetched_days"], report["fetch_calls"]) == (1, 4, 2)
+    assert report["columns"].total() == (500, 5)
+
+
+def test_failed_fetch_caches_nothing(payments, current_day):
+    first = current_day - timedelta(days=2)
+    payments.transactions = [_tx(first, 100)]
+    payments.error = grpc.StatusCode.INTERNAL
+
+    report, error = statement.build_report(first, current_day)
+
+    assert report is None and error
+    assert db.get_cached_statement_days(first.isoformat(), current_day.isoformat()) == set()
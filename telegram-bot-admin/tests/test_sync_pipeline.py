@@ -0,0 +1,131 @@
+# telegram-bot-admin/tests/test_sync_pipeline.py
+"""Konveyer bosqichlari (prefetch, BackgroundWorker) va Sheets kvotasi."""
+import threading
+import time
+
+import pytest
+
+from database import db
+from sync.pipeline import BackgroundWorker, prefetch
+from sync.quota import SheetsQuota
+
+
+def _alive(name):
+    return any(thread.name == name for thread in threading.enumerate())
+
+
+def test_prefetch_yields_items_in_order():
+    assert list(prefetch(range(10), 2, name="t-prefetch")) == list(range(10))
+    assert not _alive("t-prefetch")
+
+
+def test_prefetch_reraises_source_error_after_items():
+    def source():
+        yield 1
+        yield 2
+        raise ValueError("varaq o'qilmadi")
+
+    received = []
+    with pytest.raises(ValueError, match="o'qilmadi"):
+        for item in prefetch(source(), 1, name="t-failing"):
+            received.append(item)
+
+    assert received == [1, 2]
+    assert not _alive("t-failing")
+
+
+def test_prefetch_stops_producer_when_consumer_closes():
+    produced = []
+
+    def source():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    items = prefetch(source(), 1, name="t-closed")
+    assert next(items) == 0
+    items.close()
+
+    # O'qish oqimi to'xtadi va manbani oxirigacha o'qimadi
+    assert not _alive("t-closed")
+    assert len(produced) <= 3
+
+
+def test_worker_handles_queued_items_after_failure():
+    handled = []
+    release = threading.Event()
+
+    def handler(item):
+        release.wait(5)
+        if item == 2:
+            raise ConnectionError("yozib bo'lmadi")
+        handled.append(item)
+
+    worker = BackgroundWorker(handler, 4, name="t-worker")
+    for item in (1, 2, 3):
+        worker.submit(item)
+    release.set()
+
+    with pytest.raises(ConnectionError):
+        worker.close()
+    # Xatolikdan keyin ham allaqachon topshirilgan element qayta ishlangan
+    assert handled == [1, 3]
+    assert not _alive("t-worker")
+
+
+def test_worker_raises_first_error_on_submit():
+    handled = []
+
+    def handler(item):
+        handled.append(item)
+        raise ValueError(f"xato {item}")
+
+    worker = BackgroundWorker(handler, 1, name="t-submit")
+    worker.submit(1)
+    deadline = time.monotonic() + 5
+    while worker._error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(ValueError, match="xato 1"):
+        worker.raise_if_failed()
+    # Element baribir navbatga qo'yiladi, lekin birinchi xatolik ko'tariladi
+    with pytest.raises(ValueError, match="xato 1"):
+        worker.submit(2)
+    with pytest.raises(ValueError, match="xato 1"):
+        worker.close()
+    assert handled == [1, 2]
+
+
+def test_quota_waits_for_oldest_call_to_leave_window():
+    quota = SheetsQuota(3, window=0.3, recent_calls=[])
+
+    started = time.monotonic()
+    for _ in range(3):
+        quota.acquire()
+    assert time.monotonic() - started < 0.1 and quota.waited == 0
+
+    quota.acquire()
+    assert time.monotonic() - started >= 0.25
+    assert quota.waited > 0
+
+
+def test_quota_counts_recent_calls_from_other_processes():
+    db.record_sheets_api_call(200)
+    db.record_sheets_api_call(429)
+
+    quota = SheetsQuota(2, window=0.3)
+
+    started = time.monotonic()
+    quota.acquire()
+    assert time.monotonic() - started >= 0.2
+
+
+def test_quota_wrap_throttles_requests():
+    sent = []
+    quota = SheetsQuota(1, window=0.2, recent_calls=[])
+    request = quota.wrap(lambda method, url, **kwargs: sent.append((method, url, time.monotonic())) or "javob")
+
+    assert request("GET", "/a") == "javob"
+    assert request("GET", "/b", timeout=5) == "javob"
+
+    assert [(method, url) for method, url, _ in sent] == [("GET", "/a"), ("GET", "/b")]
+    assert sent[1][2] - sent[0][2] >= 0.15
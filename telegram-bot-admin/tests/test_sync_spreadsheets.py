@@ -0,0 +1,72 @@
+# telegram-bot-admin/tests/test_sync_spreadsheets.py
+"""Bir nechta jadval: har bir jadvalning o'z ustunlari va xatolikni ajratish."""
+import pytest
+from fakes import FakeSheetsClient, FakeSpreadsheet, FakeWorksheet, sheet_row
+
+from config import SHEET_COLUMNS_CONFIG, SpreadsheetConfig, settings
+from sync import engine
+
+# Asosiy jadvalda A ustuni qo'shilgan: barcha ustunlar bittaga suriladi
+SHIFTED = {key: index + 1 for key, index in SHEET_COLUMNS_CONFIG.items()}
+
+
+@pytest.fixture
+def books(monkeypatch):
+    books = {}
+    monkeypatch.setattr(engine, "get_gsheet_client", lambda *args, **kwargs: (FakeSheetsClient(books), None))
+    monkeypatch.setattr(settings, "google_spreadsheet_id", "main")
+    monkeypatch.setattr(settings, "google_worksheet_names", "Chilonzor")
+    return books
+
+
+def test_targeted_sync_uses_main_spreadsheet_columns(management, books, monkeypatch):
+    monkeypatch.setattr(settings, "google_spreadsheets", [
+        SpreadsheetConfig(id="main", worksheets=["Chilonzor"], columns=SHIFTED),
+    ])
+    worksheet = FakeWorksheet("Chilonzor", [
+        sheet_row("Chilonzor", "Ali Valiyev", columns=SHIFTED),
+        sheet_row("Chilonzor", "Vali Aliyev", account_id="CH7", columns=SHIFTED),
+    ])
+    books["main"] = FakeSpreadsheet([worksheet])
+
+    result = engine.execute_targeted_sync(lambda text: None, sheet_name="Chilonzor")
+
+    assert result["status"] == "ok" and result["created"] == 2
+    assert sorted(s.full_name for s in management.students.values()) == ["Ali Valiyev", "Vali Aliyev"]
+    assert all(worksheet.cell(row, SHIFTED["uuid"]).startswith("uuid-") for row in (3, 4))
+    assert worksheet.cell(4, SHIFTED["account_id"]) == "CH7"
+    # Faqat jadvalning o'z UUID / Account ID ustunlariga yoziladi
+    written_columns = {col - 1 for cells in worksheet.writes for _, col, _ in cells}
+    assert written_columns == {SHIFTED["uuid"], SHIFTED["account_id"]}
+
+    # Qayta sinxronlashda o'quvchilar UUID orqali topiladi va yangilanadi
+    result = engine.execute_targeted_sync(lambda text: None, sheet_name="Chilonzor")
+    assert (result["created"], result["updated"]) == (0, 2)
+    assert len(management.students) == 2
+
+
+@pytest.mark.parametrize("window_rows", [0, 1000])
+def test_parallel_sync_isolates_failing_spreadsheet(management, books, monkeypatch, window_rows):
+    monkeypatch.setattr(settings, "sync_window_rows", window_rows)
+    monkeypatch.setattr(settings, "google_spreadsheets", [
+        SpreadsheetConfig(id="main", name="Asosiy", worksheets=["Chilonzor"]),
+        SpreadsheetConfig(id="closed", name="Yopiq", worksheets=["Sheet1"]),
+        SpreadsheetConfig(id="s2", name="2-maktab", worksheets=["Sheet1"], columns=SHIFTED),
+    ])
+    main = FakeWorksheet("Chilonzor", [sheet_row("Chilonzor", f"A{i}") for i in range(3)])
+    second = FakeWorksheet("Sheet1", [sheet_row("Yunusobod", f"B{i}", columns=SHIFTED) for i in range(2)])
+    books.update(main=FakeSpreadsheet([main]), s2=FakeSpreadsheet([second]))
+    messages = []
+
+    result = engine.execute_sync(messages.append, force=True)
+
+    assert result["status"] == "partial"
+    assert result["created"] == 5
+    summaries = {summary["name"]: summary for summary in result["spreadsheets"]}
+    assert summaries["Yopiq"]["status"] == "failed" and summaries["Yopiq"]["errors"]
+    assert (summaries["Asosiy"]["status"], summaries["Asosiy"]["created"]) == ("ok", 3)
+    assert (summaries["2-maktab"]["status"], summaries["2-maktab"]["created"]) == ("ok", 2)
+    assert all(second.cell(row, SHIFTED["uuid"]) for row in (3, 4))
+    # Baza ro'yxati barcha jadvallar uchun bir marta olinadi
+    assert management.calls.count("ListBranches") == 1
+    assert "2-maktab" in messages[-1]
@@ -0,0 +1,99 @@
+# telegram-bot-admin/tests/test_sync_windows.py
+"""Oynali sinxronizatsiya: o'zgarmagan oynalarni o'tkazib yuborish va UUID yozish xatolari."""
+import time
+
+import pytest
+from fakes import FakeSheetsClient, FakeSpreadsheet, FakeWorksheet, sheet_row
+
+from config import SHEET_COLUMNS_CONFIG, START_ROW, settings
+from sync import engine
+
+UUID = SHEET_COLUMNS_CONFIG["uuid"]
+
+
+class FailOnceWorksheet(FakeWorksheet):
+    """
+    Birinchi update_cells (1-oynaning UUID'lari) xato bilan tugaydi - lekin faqat
+    2-oyna bazaga yuborila boshlagandan keyin, shunda tartib har doim bir xil.
+    """
+
+    def __init__(self, title, data_rows, management):
+        super().__init__(title, data_rows)
+        self.management = management
+        self.failed_once = False
+
+    def update_cells(self, cells, value_input_option=None):
+        if not self.failed_once:
+            self.failed_once = True
+            deadline = time.monotonic() + 5
+            while self.management.calls.count("SyncStudents") < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            raise ConnectionError("Sheets API javob bermadi")
+        super().update_cells(cells, value_input_option)
+
+
+@pytest.fixture
+def sheet(management, monkeypatch):
+    monkeypatch.setattr(settings, "google_spreadsheet_id", "main")
+    monkeypatch.setattr(settings, "google_worksheet_names", "Chilonzor")
+    monkeypatch.setattr(settings, "google_spreadsheets", [])
+    monkeypatch.setattr(settings, "sync_window_rows", 2)
+    monkeypatch.setattr(settings, "sync_pipeline_depth", 1)
+
+    def use(worksheet):
+        client = FakeSheetsClient({"main": FakeSpreadsheet([worksheet])})
+        monkeypatch.setattr(engine, "get_gsheet_client", lambda *args, **kwargs: (client, None))
+        return worksheet
+
+    return use
+
+
+def _rows(count):
+    return [sheet_row("Chilonzor", f"O'quvchi {i}") for i in range(count)]
+
+
+def test_unchanged_windows_are_skipped(management, sheet):
+    # 6 qator, 2 qatorli oynalar: 3-4, 5-6, 7-8
+    worksheet = sheet(FakeWorksheet("Chilonzor", _rows(6)))
+
+    result = engine.execute_sync(lambda text: None, force=False)
+    assert (result["status"], result["created"]) == ("ok", 6)
+    assert management.calls.count("SyncStudents") == 3
+    assert all(worksheet.cell(row, UUID) for row in range(START_ROW, START_ROW + 6))
+
+    # Bot yozgan UUID'lar o'zgarish sanalmaydi
+    messages = []
+    result = engine.execute_sync(messages.append, force=False)
+    assert result["sheets_skipped"] == 1 and result["created"] == 0
+    assert management.calls.count("SyncStudents") == 3
+    assert "O'zgarish yo'q" in messages[-1]
+
+    # Faqat o'zgargan oyna (5-6 qatorlar) qayta yuboriladi
+    worksheet.rows[5 - 1] = sheet_row("Chilonzor", "Yangi o'quvchi")
+    result = engine.execute_sync(lambda text: None, force=False)
+    assert (result["created"], result["updated"]) == (1, 1)
+    assert management.calls.count("SyncStudents") == 4
+
+    # force - barcha oynalar yuboriladi
+    result = engine.execute_sync(lambda text: None, force=True)
+    assert (result["created"], result["updated"]) == (0, 6)
+
+
+def test_write_back_failure_stops_creates_but_writes_sent_windows(management, sheet):
+    # 2-oyna yuborilayotganda 1-oynaning yozish xatosi aniqlanadi
+    management.sync_delay = 0.2
+    worksheet = sheet(FailOnceWorksheet("Chilonzor", _rows(8), management))
+
+    result = engine.execute_sync(lambda text: None, force=False)
+
+    assert result["status"] == "partial"
+    assert any("Sheets API javob bermadi" in error for error in result["errors"])
+    # 1-oyna yaratildi, lekin UUID'lari yozilmadi; xatodan keyin yangi oynalar yuborilmaydi
+    assert result["created"] == 4 and len(management.students) == 4
+    written = [worksheet.cell(row, UUID) for row in range(START_ROW, START_ROW + 8)]
+    assert written[:2] == ["", ""]
+    # Allaqachon yuborilgan 2-oynaning UUID'lari baribir yozilgan
+    assert all(uuid.startswith("uuid-") for uuid in written[2:4])
+    assert written[4:] == ["", "", "", ""]
+    # Xatoli varaq xeshi saqlanmaydi - keyingi safar qayta tekshiriladi
+    assert "Chilonzor" not in engine.db.get_sheet_fingerprints()
@@ -0,0 +1,151 @@
+# telegram-bot-admin/tests/test_webhook.py
+"""
+Webhook rejimi: secret token tekshiruvi va port band bo'lganda polling'ga o'tish.
+
+Telegram Bot API o'rniga shu jarayondagi soxta HTTP server ishlatiladi
+(settings.telegram_api_base_url orqali).
+"""
+import json
+import queue
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from telegram.ext import Filters, MessageHandler
+
+from bot import core
+from bot.webhook import SECRET_TOKEN_HEADER
+from config import settings
+
+SECRET = "test-secret"
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Test", "username": "test_bot"}
+
+
+class FakeBotApi(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeBotApiHandler)
+        # (metod, parametrlar) ro'yxati
+        self.requests = []
+
+    def methods(self):
+        return [method for method, _ in self.requests]
+
+
+class FakeBotApiHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        method = self.path.rsplit("/", 1)[-1]
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            params = json.loads(body or "{}")
+        else:
+            params = dict(urllib.parse.parse_qsl(body))
+        self.server.requests.append((method, params))
+
+        if method == "getMe":
+            result = BOT_USER
+        elif method == "getUpdates":
+            # Polling tsikli bo'sh javoblar bilan aylanib ketmasin
+            time.sleep(0.05)
+            result = []
+        else:
+            result = True
+        payload = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def bot_api(monkeypatch):
+    api = FakeBotApi()
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(settings, "telegram_api_base_url", f"http://127.0.0.1:{api.server_address[1]}/bot")
+    monkeypatch.setattr(settings, "telegram_update_mode", "webhook")
+    monkeypatch.setattr(settings, "telegram_webhook_url", "https://bot.example.uz/telegram")
+    monkeypatch.setattr(settings, "telegram_webhook_listen", "127.0.0.1")
+    monkeypatch.setattr(settings, "telegram_webhook_port", 0)
+    monkeypatch.setattr(settings, "telegram_webhook_path", "telegram")
+    monkeypatch.setattr(settings, "telegram_webhook_secret", SECRET)
+    yield api
+
+    api.shutdown()
+    api.server_close()
+
+
+@pytest.fixture
+def updater(bot_api):
+    updater = core.create_updater()
+    yield updater
+    updater.stop()
+
+
+def _update(update_id, text):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": int(time.time()), "text": text,
+            "chat": {"id": 42, "type": "private"},
+            "from": {"id": 42, "is_bot": False, "first_name": "Admin"},
+        },
+    }
+
+
+def _post(url, update, secret):
+    request = urllib.request.Request(
+        url, data=json.dumps(update).encode(), method="POST",
+        headers={"Content-Type": "application/json", SECRET_TOKEN_HEADER: secret},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_webhook_checks_secret_token(bot_api, updater):
+    received = queue.Queue()
+    updater.dispatcher.add_handler(MessageHandler(Filters.text, lambda update, context: received.put(update.message.text)))
+
+    assert core.start_updates(updater) == "webhook"
+    set_webhook = [params for method, params in bot_api.requests if method == "setWebhook"]
+    assert set_webhook and set_webhook[0]["secret_token"] == SECRET
+
+    url = f"http://127.0.0.1:{updater.httpd.port}/telegram"
+    assert _post(url, _update(1, "noto'g'ri"), "boshqa-secret") == 403
+    assert _post(url, _update(2, "salom"), SECRET) == 200
+
+    assert received.get(timeout=5) == "salom"
+    time.sleep(0.2)
+    assert received.empty()
+
+
+def test_busy_port_falls_back_to_polling(bot_api, updater, monkeypatch):
+    busy = socket.socket()
+    busy.bind(("127.0.0.1", 0))
+    busy.listen()
+    monkeypatch.setattr(settings, "telegram_webhook_port", busy.getsockname()[1])
+    try:
+        assert core.start_updates(updater) == "polling"
+
+        deadline = time.monotonic() + 5
+        while "getUpdates" not in bot_api.methods() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert "getUpdates" in bot_api.methods()
+        # Polling'dan oldin o'rnatilgan webhook o'chiriladi
+        assert "deleteWebhook" in bot_api.methods()
+    finally:
+        busy.close()